@@ -0,0 +1,67 @@
+"""应用缓存目录中的持久化缓存：目录扫描缓存、逐文件结果缓存与标签索引共用的配置、路径与读写。
+
+- 每类缓存一个子目录，按扫描根目录的路径哈希区分文件；缓存目录不可用时返回 None，调用方退化为不缓存。
+- 缓存文件记录 `version` 与 `root`，两者与当前不一致时整体作废；写入先写临时文件再原子替换。
+- 与当前时刻过近的修改时间（`RACY_WINDOW_NS` 以内）不作为有效签名：同一时间粒度内的后续修改无法被察觉。
+"""
+import os
+import json
+import time
+import hashlib
+from typing import Dict, Optional
+
+from .json_backend import loads
+
+RACY_WINDOW_NS = 2_000_000_000
+
+def racy_horizon() -> int:
+    """修改时间早于该时刻（ns）的签名才可写入缓存。"""
+    return time.time_ns() - RACY_WINDOW_NS
+
+def scan_settings() -> Dict:
+    """配置 `dataset.scan`（`workers`、`cache`）；读取失败时为空。"""
+    try:
+        from tools.sys_config_tools import get_dataset_config
+        return get_dataset_config().get("scan", {}) or {}
+    except Exception:
+        return {}
+
+def cache_file(name: str, root: str, ext: str = ".json") -> Optional[str]:
+    """`<缓存目录>/<name>/<根目录路径哈希><ext>`；缓存目录不可用时返回 None。"""
+    try:
+        from tools.sys_config_tools import get_cache_dir
+        d = get_cache_dir(name)
+    except Exception:
+        return None
+    key = hashlib.blake2b(os.path.normcase(root).encode("utf-8"), digest_size=12).hexdigest()
+    return os.path.join(d, f"{key}{ext}")
+
+def load_cache(path: Optional[str], version: int, root: str) -> Optional[Dict]:
+    """读取缓存文件；不存在、损坏或 `version`/`root` 不一致时返回 None。"""
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as f:
+            data = loads(f.read())
+        if data.get("version") != version or data.get("root") != root:
+            return None
+        return data
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def save_cache(path: Optional[str], data: Dict) -> bool:
+    """写入缓存文件（临时文件 + 原子替换），返回是否成功。"""
+    if not path:
+        return False
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
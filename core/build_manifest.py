@@ -0,0 +1,132 @@
+"""构建清单：记录每组图片/标注的来源签名与输出位置，用于增量重建。
+
+清单 `build_manifest.json` 与 `dataset_config.yaml` 位于同一目录，按行存储（JSON Lines），
+构建时边处理边写入，不在内存中累积：
+
+    {"version": 2, "params": {...}}
+    {"key": <图片绝对路径>, "json": ..., "img_size": ..., "hash": ..., "image": ..., "label": ...}
+    ...
+
+每个条目记录图片与 JSON 的大小、修改时间（纳秒）、内容哈希以及输出的图片/标签相对路径。
+切片构建时输出为多个切片，记录在 `tiles` 中（`[图片, 标签, x0, y0, x1, y1]`），`image`/`label` 只作为输出位置的标识。
+"""
+import os
+import json
+import hashlib
+from typing import Dict, List, Optional
+
+MANIFEST_NAME = "build_manifest.json"
+MANIFEST_VERSION = 2
+_HASH_BLOCK = 1 << 20
+
+# plan_item 的返回值
+REUSE = "reuse"
+VERIFY = "verify"
+BUILD = "build"
+
+def manifest_path(root: str) -> str:
+    return os.path.join(root, MANIFEST_NAME)
+
+def load_manifest(root: str) -> Dict:
+    """读取清单；不存在、损坏或版本不一致时返回空清单。"""
+    p = manifest_path(root)
+    try:
+        with open(p, "r", encoding="utf-8") as f:
+            head = json.loads(f.readline())
+            if head.get("version") != MANIFEST_VERSION:
+                raise ValueError("manifest version mismatch")
+            items = {}
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    items[entry.pop("key")] = entry
+        return {"version": MANIFEST_VERSION, "params": head.get("params", {}), "items": items}
+    except Exception:
+        return {"version": MANIFEST_VERSION, "params": {}, "items": {}}
+
+class ManifestWriter:
+    """流式写入清单：先写临时文件，`commit` 时原子替换，构建中断不会破坏旧清单。"""
+    def __init__(self, root: str, params: Dict):
+        self.path = manifest_path(root)
+        self.tmp = self.path + ".tmp"
+        self.f = open(self.tmp, "w", encoding="utf-8")
+        self.f.write(json.dumps({"version": MANIFEST_VERSION, "params": params}, ensure_ascii=False) + "\n")
+
+    def add(self, key: str, entry: Dict):
+        d = {"key": key}
+        d.update(entry)
+        self.f.write(json.dumps(d, ensure_ascii=False) + "\n")
+
+    def commit(self):
+        self.f.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        try:
+            self.f.close()
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+def source_signature(img: str, js: str) -> Dict:
+    si = os.stat(img)
+    sj = os.stat(js)
+    return {
+        "json": js,
+        "img_size": si.st_size, "img_mtime": si.st_mtime_ns,
+        "json_size": sj.st_size, "json_mtime": sj.st_mtime_ns,
+    }
+
+def content_hash(img: str, js: str) -> str:
+    """图片与 JSON 内容的联合哈希（blake2b-128）。"""
+    h = hashlib.blake2b(digest_size=16)
+    for p in (js, img):
+        with open(p, "rb") as f:
+            while True:
+                b = f.read(_HASH_BLOCK)
+                if not b:
+                    break
+                h.update(b)
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _same_stat(old: Dict, sig: Dict) -> bool:
+    return all(old.get(k) == sig[k] for k in ("json", "img_size", "img_mtime", "json_size", "json_mtime"))
+
+def output_paths(entry: Dict) -> List[str]:
+    """条目实际占用的输出相对路径：切片构建时为全部切片的图片与标签。"""
+    if entry.get("tiles"):
+        return [p for t in entry["tiles"] for p in t[:2]]
+    return [p for p in (entry.get("image"), entry.get("label")) if p]
+
+def same_outputs(prev: Dict, cur: Dict) -> bool:
+    return prev.get("image") == cur["image"] and prev.get("label") == cur["label"]
+
+def plan_item(prev: Optional[Dict], cur: Dict, root: str) -> str:
+    """
+    对比旧条目与本次条目，决定处理方式。
+
+    参数:
+        prev (Dict): 旧清单中的条目；没有时为 None。
+        cur (Dict): 本次条目，含 `source_signature` 字段与 `image`/`label` 输出路径。
+        root (str): 数据集根目录。
+
+    返回:
+        str: `REUSE`（签名一致且输出完好）、`VERIFY`（仅大小或修改时间变化，需比对内容哈希）
+        或 `BUILD`（新增、输出位置变化或输出缺失，需要重新转换与落盘）。
+    """
+    if prev is None or not same_outputs(prev, cur):
+        return BUILD
+    if not all(os.path.exists(os.path.join(root, p)) for p in output_paths(prev)):
+        return BUILD
+    return REUSE if _same_stat(prev, cur) else VERIFY
+
+def remove_outputs(root: str, entry: Dict, keep: Optional[set] = None):
+    """删除旧条目对应的图片与标签输出；`keep` 中的相对路径仍被本次构建占用，不删除。"""
+    for rel in output_paths(entry):
+        if keep and rel in keep:
+            continue
+        try:
+            os.remove(os.path.join(root, rel))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,72 @@
+"""构建问题报告与隔离区。
+
+容错构建时，解析或检查失败的标注对不会中断构建：问题逐条记录为 `(文件, 形状下标, 原因)`，
+对应的图片与 JSON 按来源内的相对路径放入数据集下的 `quarantine/` 目录（多来源时以来源目录名为第一级），
+其余样本照常构建。
+报告写入数据集根目录的 `build_report.json`；严格模式下出现任何问题时构建失败，但同样先写出完整报告。
+尺寸检查自动修正的标注（图片在标注后被等比缩放）不算问题，单独记录在 `corrected` 中。
+"""
+import os
+import json
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+REPORT_NAME = "build_report.json"
+QUARANTINE_DIR = "quarantine"
+ERROR_MODES = ("quarantine", "strict")
+
+def reset_quarantine(root: str) -> str:
+    """清空并重建隔离目录；被隔离的样本不进入构建清单，每次构建都会重新检查。"""
+    d = os.path.join(root, QUARANTINE_DIR)
+    shutil.rmtree(d, ignore_errors=True)
+    return d
+
+class BuildReport:
+    """收集构建过程中的标注问题。"""
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.problems: List[Dict] = []
+        self.quarantined: List[Dict] = []
+        self.corrected: List[Dict] = []
+
+    def add(self, js: str, img: str, problems: List[Tuple[int, str]], quarantine: Optional[List[str]] = None):
+        """记录一个有问题的标注对；`quarantine` 为图片与 JSON 在隔离区中的相对路径（严格模式不隔离时为空）。"""
+        for shape_index, reason in problems:
+            self.problems.append({"file": js, "shape_index": shape_index, "reason": reason})
+        item = {"json": js, "image": img}
+        if quarantine:
+            item["quarantine"] = [f"{QUARANTINE_DIR}/{rel}" for rel in quarantine]
+        self.quarantined.append(item)
+
+    def add_corrected(self, js: str, labeled: Tuple[int, int], actual: Tuple[int, int]):
+        """记录按真实图片尺寸修正的标注：`labeled` 为 JSON 记录的 `(宽, 高)`，`actual` 为图片实际尺寸。"""
+        self.corrected.append({"file": js, "labeled": list(labeled), "actual": list(actual)})
+
+    def write(self, root: str) -> str:
+        path = os.path.join(root, REPORT_NAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"mode": self.mode, "problem_count": len(self.problems),
+                       "quarantined_count": len(self.quarantined),
+                       "corrected_count": len(self.corrected),
+                       "problems": self.problems, "quarantined": self.quarantined, "corrected": self.corrected}, f, ensure_ascii=False, indent=2)
+        return path
+
+    def summary_lines(self, limit: int = 10) -> List[str]:
+        """日志摘要：问题总数、按原因分组的计数与前若干条明细，以及尺寸修正的数量。"""
+        lines = []
+        if self.corrected:
+            lines.append(f"{len(self.corrected)} 个样本的图片在标注后被等比缩放，已按真实尺寸记录（归一化框坐标不变）")
+        if not self.problems:
+            return lines
+        by_reason: Dict[str, int] = {}
+        for p in self.problems:
+            key = p["reason"].split(":", 1)[0]
+            by_reason[key] = by_reason.get(key, 0) + 1
+        lines.append(f"标注问题 {len(self.problems)} 条，涉及 {len(self.quarantined)} 个文件: "
+                     + ", ".join(f"{k} {v}" for k, v in by_reason.items()))
+        for p in self.problems[:limit]:
+            where = "文件" if p["shape_index"] < 0 else f"形状 #{p['shape_index']}"
+            lines.append(f"  {p['file']} [{where}] {p['reason']}")
+        if len(self.problems) > limit:
+            lines.append(f"  ... 其余 {len(self.problems) - limit} 条见 {REPORT_NAME}")
+        return lines
@@ -0,0 +1,114 @@
+"""类别映射表：合并多个来源时把写法不同的类别名（如 `scratch`、`Scratch`、`划痕`）统一到 classes.txt 中的名称。
+
+映射在转换阶段于内存中完成，不改写磁盘上的 JSON。映射表为 YAML/JSON 文件，支持两种写法：
+
+    # 简写：精确匹配
+    scratch: 划痕
+    # 或规则列表
+    - {from: scratch, to: 划痕}                     # 精确匹配
+    - {from: Scratch, to: 划痕, ignore_case: true}  # 忽略大小写
+    - {regex: "^dent[_-]?\\d*$", to: 凹坑}          # 正则（整体匹配，`to` 可引用分组，如 `\\1`）
+
+查找顺序为精确匹配 -> 忽略大小写 -> 正则（按表中顺序），命中第一条即止；都不命中时保留原名。
+每个类别名只解析一次，结果按名称缓存，逐形状的开销等同于一次字典查找。
+"""
+import re
+from typing import Dict, List, Optional, Union
+
+from .json_backend import load_file
+
+RULE_EXACT = "exact"
+RULE_IGNORE_CASE = "ignore_case"
+RULE_REGEX = "regex"
+
+class ClassRemap:
+    """
+    类别映射规则，可被 pickle 后交给进程池中的转换任务。
+
+    参数:
+        rules (List[Dict]): 规则列表，每条为 `{"from": 名称, "to": 目标}`（可带 `"ignore_case": true`）
+            或 `{"regex": 模式, "to": 目标}`。
+    """
+    def __init__(self, rules: List[Dict]):
+        self.exact: Dict[str, str] = {}
+        self.folded: Dict[str, str] = {}
+        self.regex: List[tuple] = []
+        for i, r in enumerate(rules):
+            if not isinstance(r, dict) or "to" not in r or ("from" in r) == ("regex" in r):
+                raise ValueError(f"invalid remap rule #{i}: {r}")
+            to = str(r["to"])
+            if "regex" in r:
+                self.regex.append((re.compile(str(r["regex"])), to))
+            elif r.get("ignore_case"):
+                self.folded.setdefault(str(r["from"]).casefold(), to)
+            else:
+                self.exact.setdefault(str(r["from"]), to)
+        self._memo: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.exact) + len(self.folded) + len(self.regex)
+
+    def map(self, label: str) -> str:
+        """返回映射后的类别名；非字符串（缺失的 label）原样返回，由检查阶段报告。"""
+        if not isinstance(label, str):
+            return label
+        out = self._memo.get(label)
+        if out is None:
+            out = self._resolve(label)
+            self._memo[label] = out
+        return out
+
+    def _resolve(self, label: str) -> str:
+        if label in self.exact:
+            return self.exact[label]
+        folded = label.casefold()
+        if folded in self.folded:
+            return self.folded[folded]
+        for pattern, to in self.regex:
+            m = pattern.fullmatch(label)
+            if m:
+                return m.expand(to)
+        return label
+
+    def class_index(self, class_index: Dict[str, int]) -> "RemappedIndex":
+        return RemappedIndex(class_index, self)
+
+    def to_list(self) -> List[Dict]:
+        """规则的规范形式，写入构建参数（规则变化时增量构建整体重建）。"""
+        return ([{"from": k, "to": v} for k, v in self.exact.items()]
+                + [{"from": k, "to": v, "ignore_case": True} for k, v in self.folded.items()]
+                + [{"regex": p.pattern, "to": v} for p, v in self.regex])
+
+class RemappedIndex:
+    """在类别编号字典前加一层映射，提供转换与检查所用的 `get`/`in` 接口。"""
+    def __init__(self, class_index: Dict[str, int], remap: ClassRemap):
+        self.index = class_index
+        self.remap = remap
+
+    def get(self, label, default=None):
+        return self.index.get(self.remap.map(label), default)
+
+    def __contains__(self, label) -> bool:
+        return self.remap.map(label) in self.index
+
+def load_remap(path: str) -> ClassRemap:
+    """读取映射表文件（`.json` 或 YAML）；顶层为字典时视为精确匹配的简写。"""
+    if path.lower().endswith(".json"):
+        data = load_file(path)
+    else:
+        import yaml
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+    if data is None:
+        data = []
+    if isinstance(data, dict):
+        data = [{"from": k, "to": v} for k, v in data.items()]
+    if not isinstance(data, list):
+        raise ValueError(f"invalid remap table: {path}")
+    return ClassRemap(data)
+
+def resolve_remap(remap: Union[None, str, ClassRemap]) -> Optional[ClassRemap]:
+    """构建参数中的映射表可以是文件路径或 `ClassRemap`；空表视为不映射。"""
+    if isinstance(remap, str):
+        remap = load_remap(remap) if remap.strip() else None
+    return remap if remap else None
@@ -0,0 +1,118 @@
+"""COCO 格式导出：按划分流式写出 `annotations/instances_<split>.json`。
+
+- 与 YOLO 路径共用同一条解析流水线与类别编号（`category_id = 类别下标 + 1`），输入为归一化的 `(cls, boxes)`
+  与图片 `(高, 宽)`，换算为像素坐标的 `[x, y, w, h]`。
+- `file_name` 为相对 `images/<split>/` 的路径，按 `images/<split>/<file_name>` 即可找到图片。
+- 写出过程不在内存中累积标注列表：每个划分的 `images` 与 `annotations` 各自逐条追加到临时文件，
+  结束时按 COCO 结构拼接为最终文件，内存占用与标注数量无关。
+"""
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+from typing import Dict, List, Sequence
+
+ANNOTATION_DIR = "annotations"
+_COPY_BUF = 1 << 20
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+class _SplitStream:
+    """单个划分的流式写出状态。"""
+    def __init__(self, tmp_dir: str, split: str):
+        self.images = open(os.path.join(tmp_dir, f"{split}.images"), "w+", encoding="utf-8")
+        self.annotations = open(os.path.join(tmp_dir, f"{split}.annotations"), "w+", encoding="utf-8")
+        self.n_images = 0
+        self.n_annotations = 0
+
+    def close(self):
+        self.images.close()
+        self.annotations.close()
+
+class CocoWriter:
+    """
+    流式 COCO 写出器。
+
+    用法：`add()` 逐张图片追加，全部完成后 `commit()` 生成最终文件；出错时 `abort()` 丢弃临时数据。
+    图片与标注编号在每个划分内从 1 开始递增。
+    """
+    def __init__(self, root: str, names: List[str], splits: Sequence[str]):
+        self.root = root
+        self.names = names
+        self.out_dir = os.path.join(root, ANNOTATION_DIR)
+        os.makedirs(self.out_dir, exist_ok=True)
+        self._tmp = tempfile.mkdtemp(prefix=".coco_", dir=self.out_dir)
+        self._streams: Dict[str, _SplitStream] = {s: _SplitStream(self._tmp, s) for s in splits}
+
+    def add(self, split: str, image: str, shape: Sequence[int], cls: np.ndarray, boxes: np.ndarray):
+        """
+        追加一张图片及其标注。
+
+        参数:
+            split (str): 划分名称。
+            image (str): 数据集内图片相对路径，如 `images/train/sub/a.jpg`；`file_name` 记录为相对划分图片目录的路径
+                （`sub/a.jpg`），保留源目录层级，不同子目录中的同名图片不会混淆。
+            shape (Sequence[int]): 图片 `(高, 宽)`。
+            cls (np.ndarray): 类别下标，形状 (n,)。
+            boxes (np.ndarray): 归一化 `x_center, y_center, width, height`，形状 (n, 4)。
+        """
+        st = self._streams[split]
+        h, w = int(shape[0]), int(shape[1])
+        st.n_images += 1
+        image_id = st.n_images
+        sep = "," if image_id > 1 else ""
+        prefix = f"images/{split}/"
+        file_name = image[len(prefix):] if image.startswith(prefix) else os.path.basename(image)
+        st.images.write(sep + _dumps({"id": image_id, "file_name": file_name, "width": w, "height": h}))
+        if len(cls) == 0:
+            return
+        b = np.asarray(boxes, dtype=np.float64)
+        bw = b[:, 2] * w
+        bh = b[:, 3] * h
+        x0 = b[:, 0] * w - bw / 2.0
+        y0 = b[:, 1] * h - bh / 2.0
+        rows = np.round(np.stack([x0, y0, bw, bh, bw * bh], axis=1), 2).tolist()
+        parts = []
+        for c, (x, y, ww, hh, area) in zip(np.asarray(cls).tolist(), rows):
+            st.n_annotations += 1
+            parts.append(_dumps({"id": st.n_annotations, "image_id": image_id, "category_id": int(c) + 1,
+                                 "bbox": [x, y, ww, hh], "area": area, "iscrowd": 0, "segmentation": []}))
+        sep = "," if st.n_annotations > len(parts) else ""
+        st.annotations.write(sep + ",".join(parts))
+
+    def commit(self) -> Dict[str, str]:
+        """拼接并原子替换各划分的 `instances_<split>.json`，返回 `{划分: 文件路径}`。"""
+        categories = _dumps([{"id": i + 1, "name": n, "supercategory": ""} for i, n in enumerate(self.names)])
+        out = {}
+        try:
+            for split, st in self._streams.items():
+                path = os.path.join(self.out_dir, f"instances_{split}.json")
+                tmp = path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write('{"info":{"description":"oneST"},"licenses":[],"categories":' + categories + ',"images":[')
+                    st.images.seek(0)
+                    shutil.copyfileobj(st.images, f, _COPY_BUF)
+                    f.write('],"annotations":[')
+                    st.annotations.seek(0)
+                    shutil.copyfileobj(st.annotations, f, _COPY_BUF)
+                    f.write("]}\n")
+                os.replace(tmp, path)
+                out[split] = path
+        finally:
+            self.abort()
+        return out
+
+    def abort(self):
+        for st in self._streams.values():
+            st.close()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def counts(self) -> Dict[str, tuple]:
+        """各划分的 `(图片数, 标注数)`。"""
+        return {s: (st.n_images, st.n_annotations) for s, st in self._streams.items()}
+
+def remove_coco(root: str):
+    """删除 COCO 标注目录，切回 TXT 构建时调用。"""
+    shutil.rmtree(os.path.join(root, ANNOTATION_DIR), ignore_errors=True)
@@ -1,62 +1,583 @@
 import os
-import shutil
-import random
 import yaml
-import tempfile
-from typing import List, Tuple
-from .dataset_converter import load_classes, json_to_yolo_lines, pair_images_and_jsons
+import numpy as np
+import argparse
+from functools import partial
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Tuple, Optional, Callable, Dict, Iterator, Sequence, Union
+from .dataset_converter import load_classes, convert_json_batch_checked, yolo_text, iter_pairs
+from .dataset_split import SPLITS, SPLIT_MODES, assign_splits, group_assignment, fold_assignment, hash_split
+from .materialize import LINK_MODES, materialize, link_mode_supported
+from .image_resize import resize_image, target_size, image_size
+from .label_cache import LabelCache, write_label_cache, parse_yolo_text
+from .build_manifest import (load_manifest, ManifestWriter, source_signature, content_hash, plan_item,
+                             same_outputs, remove_outputs, output_paths, REUSE, VERIFY, BUILD)
+from .pipeline import prefetch, ordered_map, chunked, PipelineProgress, log_event_callback
 from .wsl_runner import win_to_wsl_path
+from . import dataset_store
+from .coco_export import CocoWriter, remove_coco
+from .dataset_stats import StatsCollector, write_stats, summary_lines
+from .build_report import BuildReport, ERROR_MODES, QUARANTINE_DIR, REPORT_NAME, reset_quarantine
+from .image_probe import ProbeCache, compare_size, SIZE_OK, SIZE_SCALED
+from .file_cache import FileCache
+from .kfold import write_folds, remove_folds, list_name
+from .class_remap import ClassRemap, resolve_remap
+from .tiling import (tile_grid, clip_boxes, write_tiles, TileIndexWriter, TILE_INDEX_NAME,
+                     DEFAULT_OVERLAP, DEFAULT_MIN_VISIBILITY)
+from .dup_index import (image_hashes, find_clusters, exact_duplicates, write_duplicates,
+                        DEDUP_MODES, DEFAULT_DISTANCE, DUPLICATES_NAME, CACHE_VERSION as PHASH_VERSION)
+
+# 每个进程任务携带的 JSON 数量，减少进程间通信次数
+_CONVERT_CHUNK = 64
+# 目录发现阶段的预取队列长度
+_DISCOVER_QUEUE = 4096
+
+# 流水线阶段名称，依次为：发现 -> 解析/转换 -> 落盘 -> 写出
+STAGE_DISCOVER = "发现"
+STAGE_CONVERT = "转换"
+STAGE_MATERIALIZE = "落盘"
+STAGE_WRITE = "写出"
+STAGES = [STAGE_DISCOVER, STAGE_CONVERT, STAGE_MATERIALIZE, STAGE_WRITE]
+
+# 数据集格式：TXT 为 YOLO 标签；COCO 在 YOLO 标签之外额外写出 annotations/instances_<split>.json
+DATASET_FORMATS = ("TXT", "COCO")
+# 标注检查未通过、被放入隔离区的条目
+QUARANTINE = "quarantine"
+# 标注尺寸检查：fix 接受等比缩放并按真实尺寸记录，其余不一致隔离；flag 任何不一致都隔离；off 不检查
+SIZE_CHECK_MODES = ("fix", "flag", "off")
 
 def _ensure_dirs(root: str):
-    for split in ["train", "val", "test"]:
+    for split in SPLITS:
         os.makedirs(os.path.join(root, "images", split), exist_ok=True)
         os.makedirs(os.path.join(root, "labels", split), exist_ok=True)
 
-def _write_label(label_path: str, lines: List[str]):
+def _write_label(label_path: str, text: str):
     with open(label_path, "w", encoding="utf-8") as f:
-        for ln in lines:
-            f.write(ln + "\n")
-
-def _split_indices(n: int, ratios: Tuple[int, int, int]) -> Tuple[List[int], List[int], List[int]]:
-    a, b, c = ratios
-    total = a + b + c
-    if total == 0:
-        raise ValueError("invalid ratios")
-    idxs = list(range(n))
-    random.shuffle(idxs)
-    n_train = round(n * a / total)
-    n_val = round(n * b / total)
-    train = idxs[:n_train]
-    val = idxs[n_train:n_train + n_val]
-    test = idxs[n_train + n_val:]
-    return train, val, test
-
-def build_yolo_dataset(src_dir: str, classes_path: str, ratios: Tuple[int, int, int], persist: bool, output_dir: str, seed: int = 42):
-    """构建 YOLO 数据集并返回 `(root, yaml_path)`。"""
-    random.seed(seed)
+        f.write(text)
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """将配置的并行数转换为实际进程/线程数：`0` 或 `None` 表示使用全部 CPU 核心。"""
+    if not workers or workers < 0:
+        return os.cpu_count() or 1
+    return int(workers)
+
+def _source_prefixes(sources: List[str]) -> List[str]:
+    """多来源构建时各来源输出文件名的前缀（来源目录名，重名时追加序号），避免不同来源的同名图片互相覆盖；
+    单一来源不加前缀。"""
+    if len(sources) == 1:
+        return [""]
+    out, seen = [], set()
+    for i, src in enumerate(sources):
+        tag = os.path.basename(os.path.normpath(src)) or f"src{i}"
+        if tag in seen:
+            tag = f"{tag}{i}"
+        seen.add(tag)
+        out.append(tag + "_")
+    return out
+
+def _tagged_pairs(src: str, prefix: str) -> Iterator[Tuple[str, str, str]]:
+    for img, js in iter_pairs(src):
+        yield img, js, prefix
+
+def _convert_chunk(json_paths: List[Optional[str]], classes: List[str],
+                   remap: Optional[ClassRemap] = None) -> List[Optional[Tuple]]:
+    """进程池任务：检查并向量化转换一批 JSON，返回与输入顺序一致的 `(标签文本, cls, boxes, (宽, 高), 问题列表)`；
+    有问题的文件前四项为 None；输入为 None 的位置原样返回 None。"""
+    todo = [p for p in json_paths if p is not None]
+    if not todo:
+        return [None] * len(json_paths)
+    results = iter([(yolo_text(*labels), labels[0], labels[1], size, problems) if labels is not None
+                    else (None, None, None, None, problems)
+                    for labels, size, problems in convert_json_batch_checked(todo, classes, remap)])
+    return [next(results) if p is not None else None for p in json_paths]
+
+def _check_size(labeled: Tuple[int, int], actual: Optional[Tuple[int, int]], mode: str) -> Tuple[Tuple[int, int], List[Tuple[int, str]], bool]:
+    """比对 JSON 记录的 `(宽, 高)` 与图片真实尺寸，返回 `(采用的尺寸, 问题列表, 是否修正)`。"""
+    if actual is None:
+        return labeled, [(-1, "unreadable image header")], False
+    kind = compare_size(labeled, actual)
+    if kind == SIZE_OK:
+        return labeled, [], False
+    if kind == SIZE_SCALED and mode == "fix":
+        return actual, [], True
+    return labeled, [(-1, f"image size {kind}: json {labeled[0]}x{labeled[1]}, image {actual[0]}x{actual[1]}")], False
+
+def _dedup_pairs(pairs: List[Tuple[str, str, str]], src_dir: str, dedup: str, distance: int, workers: int,
+                 ratios: Tuple[int, int, int], split_mode: str, keys: List[str], seed: int,
+                 log: Callable[[str], None]) -> Tuple[List[int], set, Dict, List[List[int]]]:
+    """对全部样本做重复检测，返回 `(划分编号, 丢弃的下标集合, duplicates.json 内容, 重复簇)`。"""
+    log(f"重复检测: 计算 {len(pairs)} 张图片的感知哈希")
+    cache = FileCache("phash", src_dir, PHASH_VERSION)
+    hashes = image_hashes([p[0] for p in pairs], cache, workers)
+    cache.save()
+    clusters = find_clusters(hashes, distance)
+    assign = group_assignment(len(pairs), clusters, ratios, split_mode, keys, seed)
+    # 不分组时会跨划分的簇数，即原本存在的验证集泄漏
+    plain = assign_splits(len(pairs), ratios, split_mode, keys, seed)
+    leaks = sum(1 for c in clusters if len({plain[i] for i in c}) > 1)
+    dropped = set()
+    out = []
+    for c in clusters:
+        exact = exact_duplicates(c, hashes)
+        if dedup == "drop":
+            dropped.update(exact)
+        out.append({"split": SPLITS[assign[c[0]]],
+                    "images": [pairs[i][0] for i in c],
+                    "exact_duplicates": [pairs[i][0] for i in exact]})
+    n_dup = sum(len(c) for c in clusters)
+    n_exact = sum(len(c["exact_duplicates"]) for c in out)
+    log(f"重复检测: 计算哈希 {cache.misses} 张，缓存命中 {cache.hits} 张，"
+        f"发现 {len(clusters)} 个重复簇 (共 {n_dup} 张，其中完全相同 {n_exact} 张)")
+    if leaks:
+        log(f"若不分组，{leaks} 个重复簇会跨划分（验证集泄漏），已整体分入同一划分")
+    if dropped:
+        log(f"丢弃完全相同的重复图片 {len(dropped)} 张")
+    unreadable = [pairs[i][0] for i, h in enumerate(hashes) if h is None]
+    report = {"distance": distance, "mode": dedup, "cluster_count": len(clusters), "duplicate_images": n_dup,
+              "exact_duplicates": n_exact, "dropped": len(dropped), "leaks_prevented": leaks,
+              "unhashed": unreadable, "clusters": out}
+    return assign, dropped, report, clusters
+
+def _plan_one(rec: Dict, root: str, probe: Optional[ProbeCache] = None) -> Dict:
+    """线程池任务：读取来源签名并决定复用或重建；仅修改时间变化的条目比对内容哈希。
+    需要重建的条目在传入 `probe` 时顺带读取图片文件头尺寸。"""
+    rec["entry"].update(source_signature(rec["img"], rec["js"]))
+    prev = rec["prev"]
+    action = plan_item(prev, rec["entry"], root)
+    if action == VERIFY:
+        h = content_hash(rec["img"], rec["js"])
+        rec["entry"]["hash"] = h
+        action = REUSE if h == prev.get("hash") else BUILD
+    if action == REUSE:
+        for k in ("hash", "orig_size", "shape", "tiles"):
+            if k in prev:
+                rec["entry"][k] = prev[k]
+    elif probe is not None:
+        rec["probed"] = probe.size(rec["img"], rec["entry"]["img_size"], rec["entry"]["img_mtime"])
+    rec["action"] = action
+    return rec
+
+def _write_tiles(rec: Dict, root: str, tile: Tuple[int, float, float]):
+    """切片落盘：按网格裁剪写出切片图片与各自的标签，切片列表记入条目，切片标签数组随记录返回主进程。"""
+    size, overlap, min_visibility = tile
+    entry = rec["entry"]
+    h, w = entry["shape"]
+    cls, boxes = rec.pop("labels")
+    grid = tile_grid(w, h, size, overlap)
+    image_dir, label_dir = os.path.dirname(entry["image"]), os.path.dirname(entry["label"])
+    stem, ext = os.path.splitext(os.path.basename(entry["image"]))
+    names = write_tiles(rec["img"], os.path.join(root, image_dir), stem, grid, ext)
+    parts = clip_boxes(cls, boxes, w, h, grid, min_visibility)
+    tiles = []
+    for name, (x0, y0, x1, y1), (c, b) in zip(names, grid.tolist(), parts):
+        label = f"{label_dir}/{os.path.splitext(name)[0]}.txt"
+        _write_label(os.path.join(root, label), yolo_text(c, b))
+        tiles.append([f"{image_dir}/{name}", label, x0, y0, x1, y1])
+    entry["tiles"] = tiles
+    rec["tile_labels"] = parts
+    rec["used"] = "tile"
+    rec.pop("text", None)
+
+def _materialize_one(rec: Dict, root: str, link_mode: str, imgsz: Optional[int] = None,
+                     tile: Optional[Tuple[int, float, float]] = None) -> Dict:
+    """落盘任务：按策略落盘图片（或预缩放到 `imgsz`、或切片）、写出标签并补齐内容哈希；被隔离的条目复制到隔离区。"""
+    if rec["action"] == QUARANTINE:
+        # 保留来源内的相对路径，不同子目录或来源的同名文件互不覆盖
+        for p, rel in zip((rec["img"], rec["js"]), rec["quarantine"]):
+            dst = os.path.join(root, QUARANTINE_DIR, *rel.split("/"))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            materialize(p, dst, link_mode)
+        return rec
+    if rec["action"] != BUILD:
+        return rec
+    entry = rec["entry"]
+    if tile:
+        _write_tiles(rec, root, tile)
+        if not entry.get("hash"):
+            entry["hash"] = content_hash(rec["img"], rec["js"])
+        return rec
+    dst = os.path.join(root, entry["image"])
+    orig = resize_image(rec["img"], dst, imgsz) if imgsz else None
+    if orig is None:
+        rec["used"] = materialize(rec["img"], dst, link_mode)
+    else:
+        rec["used"] = "resize"
+        entry["orig_size"] = list(orig)
+        w, h = target_size(orig[0], orig[1], imgsz)
+        entry["shape"] = [h, w]
+    _write_label(os.path.join(root, entry["label"]), rec.pop("text"))
+    if not entry.get("hash"):
+        entry["hash"] = content_hash(rec["img"], rec["js"])
+    return rec
+
+def build_yolo_dataset(src_dir: Union[str, Sequence[str]], classes_path: str, ratios: Tuple[int, int, int], persist: bool, output_dir: str, seed: int = 42,
+                       workers: int = 1,
+                       split_mode: str = "random",
+                       link_mode: str = "copy",
+                       imgsz: Optional[int] = None,
+                       fmt: str = "TXT",
+                       on_error: str = "quarantine",
+                       size_check: str = "fix",
+                       dedup: str = "off",
+                       dedup_distance: int = DEFAULT_DISTANCE,
+                       tile_size: Optional[int] = None,
+                       tile_overlap: float = DEFAULT_OVERLAP,
+                       tile_min_visibility: float = DEFAULT_MIN_VISIBILITY,
+                       kfold: int = 0,
+                       remap: Union[None, str, ClassRemap] = None,
+                       progress_callback: Optional[Callable[[float], None]] = None,
+                       log_callback: Optional[Callable[[str], None]] = None,
+                       event_callback: Optional[Callable[[Dict], None]] = None):
+    """构建 YOLO 数据集并返回 `(root, yaml_path)`。
+
+    构建过程是一条流式流水线：发现 -> 解析/转换 -> 落盘 -> 写出，阶段之间只保留有界的在途数据。
+    `hash` 划分下目录遍历与转换、落盘同时进行；`random` 划分需要先得到样本总数，因此先完成发现阶段。
+
+    - `src_dir`：标注目录，或多个目录的列表。多来源时每个目录由各自的后台线程并行遍历，合并后走同一条流水线；
+      输出文件名加上来源目录名前缀（如 `lineA_0001.jpg`），不同来源的同名图片互不覆盖。
+    - `remap`：类别映射表（文件路径或 `ClassRemap`，见 `core.class_remap`），支持精确、忽略大小写与正则规则。
+      映射在转换阶段于内存中完成，不改写来源 JSON；规则变化时整体重建。
+
+    - `workers`：并行数，`1` 为串行；`0` 表示使用全部 CPU 核心。JSON 转换走进程池，图片落盘走线程池，
+      输出与串行路径完全一致。
+    - `split_mode`：`random` 按种子打乱切分；`hash` 按文件 stem 哈希切分，新增图片不影响已有样本的归属。
+    - `link_mode`：图片落盘策略 `copy`/`hardlink`/`symlink`/`reflink`，不支持时（如跨文件系统）自动回退为复制。
+    - `imgsz`：训练分辨率（如 640）。设置后长边超过 `imgsz` 的图片在落盘阶段用进程池预缩放，
+      原图尺寸记录在清单的 `orig_size` 中（见 `core.image_resize`）；标签为归一化坐标，无需改动。
+    - 除逐图片的 `.txt` 标签外，还会写出合并标签缓存 `label_cache.bin`（见 `core.label_cache`），
+      一次读取即可获得全部标签与图片尺寸。
+    - 未提供 `output_dir` 时构建到托管数据集仓库（见 `core.dataset_store`），来源与参数相同则复用并增量更新，
+      仓库超出磁盘预算时按最近最少使用淘汰。
+    - `fmt`：`TXT` 或 `COCO`。`COCO` 时复用同一解析阶段与类别编号，流式写出 `annotations/instances_<split>.json`
+      （见 `core.coco_export`）；YOLO 标签照常写出，训练仍使用 YOLO 格式。
+    - 构建过程中顺带统计类别、框数与框尺寸分布，写出 `dataset_stats.json` 并给出建议的 `imgsz`（见 `core.dataset_stats`）。
+    - `on_error`：`quarantine`（默认）在同一并行解析阶段检查全部标注，问题汇总到 `build_report.json`
+      （文件、形状下标、原因），有问题的样本放入 `quarantine/` 后用其余样本继续构建；
+      `strict` 同样检查全部标注并写出报告，但只要有问题就以 ValueError 失败，适合 CI；
+      严格模式在全部标注检查完成之后才开始落盘，失败时不改动已有的图片、标签与清单。
+    - `size_check`：用图片文件头的真实尺寸（见 `core.image_probe`，结果按 mtime 缓存）核对 JSON 的
+      `imageWidth`/`imageHeight`。`fix`（默认）时等比缩放过的图片按真实尺寸记录（归一化坐标不受影响），
+      旋转或宽高比不同的按标注问题处理；`flag` 时任何不一致都是标注问题；`off` 不检查。
+    - `dedup`：`group` 用感知哈希（见 `core.dup_index`）找出汉明距离不超过 `dedup_distance` 的重复图片簇，
+      同一簇整体分到同一划分，避免同一画面同时出现在 train 与 val；`drop` 另外丢弃内容完全相同的图片。
+      重复簇写入 `duplicates.json`。开启后 `hash` 划分也需要先完成发现阶段。
+    - `tile_size`：切片边长（像素）。设置后每张图片按 `tile_overlap` 重叠切成切片写出（进程池并行），
+      框按切片裁剪并重新归一化，裁剪后可见面积不足 `tile_min_visibility` 的框丢弃（见 `core.tiling`）；
+      切片到原图的映射写入 `tile_index.jsonl`，用于把预测结果拼回原图。不能与 `imgsz` 同时使用。
+    - `kfold`：k 折交叉验证（k >= 2）。test 按比例照常划出，train+val 样本只落盘一次到 `images/train` 作为共享池，
+      按 `split_mode` 分成 k 折（重复簇同折），写出各折列表、`folds/fold_<i>/dataset_config.yaml` 与依次训练各折的
+      `run_folds.sh`（见 `core.kfold`）；根目录配置对应第 0 折。开启后需要先完成发现阶段。
+    - 输出目录中会写入 `build_manifest.json`；再次构建到同一 `output_dir` 时只转换、复制新增或变更的样本，
+      并删除来源已消失的输出。
+    - `event_callback`：接收流水线进度事件（见 `core.pipeline`）；未提供时事件被格式化后交给
+      `log_callback`（缺省 print），落盘进度换算为 0~1 交给 `progress_callback`。
+    """
     if persist and not output_dir:
         raise ValueError("persist 模式下必须提供 output_dir")
+    if split_mode not in SPLIT_MODES:
+        raise ValueError(f"unknown split mode: {split_mode}")
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"unknown link mode: {link_mode}")
+    if fmt not in DATASET_FORMATS:
+        raise ValueError(f"unknown dataset format: {fmt}")
+    if on_error not in ERROR_MODES:
+        raise ValueError(f"unknown error mode: {on_error}")
+    if size_check not in SIZE_CHECK_MODES:
+        raise ValueError(f"unknown size check mode: {size_check}")
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"unknown dedup mode: {dedup}")
+    if tile_size and imgsz:
+        raise ValueError("tile_size 与 imgsz 不能同时使用")
+    if tile_size and not 0 <= tile_overlap < 1:
+        raise ValueError(f"invalid tile overlap: {tile_overlap}")
+    tile = (int(tile_size), float(tile_overlap), float(tile_min_visibility)) if tile_size else None
+    if kfold and (kfold < 2 or ratios[0] + ratios[1] <= 0):
+        raise ValueError(f"invalid kfold: {kfold}")
+    sources = [src_dir] if isinstance(src_dir, str) else list(src_dir)
+    if not sources:
+        raise ValueError("src_dir 不能为空")
+    # 按源目录区分的缓存（尺寸探测、感知哈希）在多来源时放在公共父目录下
+    try:
+        cache_root = os.path.commonpath([os.path.abspath(s) for s in sources])
+    except ValueError:
+        cache_root = sources[0]
+    remap = resolve_remap(remap)
+    workers = resolve_workers(workers)
     names = load_classes(classes_path)
-    pairs = pair_images_and_jsons(src_dir)
-    if not pairs:
+    emit = event_callback or log_event_callback(log_callback, progress_callback, STAGE_MATERIALIZE)
+    progress = PipelineProgress(STAGES, emit)
+
+    # 发现阶段：每个来源一个后台线程遍历目录，通过有界队列向下游供给；各来源按顺序合并
+    streams, first = [], None
+    prefixes = _source_prefixes(sources)
+    # 隔离区中按来源分目录（多来源时以来源目录名为第一级）
+    source_of = dict(zip(prefixes, sources))
+    for src, prefix in zip(sources, prefixes):
+        discovered = prefetch(_tagged_pairs(src, prefix), _DISCOVER_QUEUE)
+        # 取首项即启动该来源的遍历线程，各来源的目录遍历同时进行
+        head = next(discovered, None)
+        if head is None:
+            progress.log(f"来源 {src} 中没有找到图片-标注对")
+            continue
+        first = first or head
+        streams.append(chain([head], discovered))
+    if not streams:
         raise FileNotFoundError("no image-json pairs found")
-    root = output_dir or tempfile.mkdtemp(prefix="yolo_ds_")
+    pairs: Iterator[Tuple[str, str, str]] = chain.from_iterable(streams)
+
+    params = {"classes": names, "ratios": list(ratios), "seed": seed, "split_mode": split_mode, "link_mode": link_mode,
+              "size_check": size_check}
+    if fmt != "TXT":
+        params["fmt"] = fmt
+    if imgsz:
+        params["imgsz"] = int(imgsz)
+    if tile:
+        params["tile"] = list(tile)
+    if dedup != "off":
+        params["dedup"] = dedup
+        params["dedup_distance"] = int(dedup_distance)
+    if remap is not None:
+        params["remap"] = remap.to_list()
+    if kfold:
+        params["kfold"] = int(kfold)
+    # 未指定输出目录时放入托管仓库：来源与参数相同的构建复用同一目录
+    in_store = not output_dir
+    root = output_dir or dataset_store.acquire(sources[0] if len(sources) == 1 else sources, params)
     _ensure_dirs(root)
-    train_idx, val_idx, test_idx = _split_indices(len(pairs), ratios)
-    for i, (img, js) in enumerate(pairs):
-        lines = json_to_yolo_lines(js, names)
-        base = os.path.splitext(os.path.basename(img))[0] + ".txt"
-        if i in train_idx:
-            dst_img = os.path.join(root, "images", "train", os.path.basename(img))
-            dst_lbl = os.path.join(root, "labels", "train", base)
-        elif i in val_idx:
-            dst_img = os.path.join(root, "images", "val", os.path.basename(img))
-            dst_lbl = os.path.join(root, "labels", "val", base)
+    progress.log(f"开始构建 {' + '.join(sources)} -> {root}, 并行数 {workers}, 划分 {split_mode}, 落盘 {link_mode}"
+                 + (f", 预缩放 {imgsz}" if imgsz else "") + (f", 切片 {tile[0]} (重叠 {tile[1]:g})" if tile else "")
+                 + (f", 类别映射 {len(remap)} 条" if remap is not None else ""))
+    if link_mode_supported(os.path.dirname(first[0]), root, link_mode) is False:
+        progress.log(f"源目录与输出目录不在同一文件系统，{link_mode} 将回退为复制")
+    reset_quarantine(root)
+    old = load_manifest(root)
+    # 本次遍历到的条目从 remaining 中取出，结束时剩余的即为来源已消失的条目；
+    # 参数变化时全部重建，旧条目只用于清理不再被占用的输出
+    remaining = old.get("items", {})
+    params_match = old.get("params") == params
+
+    def stem_of(img: str) -> str:
+        return os.path.splitext(os.path.basename(img))[0]
+
+    def counted(it):
+        for pair in it:
+            progress.add(STAGE_DISCOVER)
+            yield pair
+        progress.set_total(progress.done[STAGE_DISCOVER])
+
+    dup_report = None
+    # k 折时 train+val 合为共享池（落盘在 train），验证集由折决定
+    split_ratios = (ratios[0] + ratios[1], 0, ratios[2]) if kfold else ratios
+    if dedup != "off" or kfold or split_mode == "random":
+        pair_list = list(counted(pairs))
+        keys = [stem_of(p[0]) for p in pair_list]
+        clusters: List[List[int]] = []
+        dropped: set = set()
+        if dedup != "off":
+            assign, dropped, dup_report, clusters = _dedup_pairs(pair_list, cache_root, dedup, int(dedup_distance), workers,
+                                                                 split_ratios, split_mode, keys, seed, progress.log)
         else:
-            dst_img = os.path.join(root, "images", "test", os.path.basename(img))
-            dst_lbl = os.path.join(root, "labels", "test", base)
-        shutil.copy2(img, dst_img)
-        _write_label(dst_lbl, lines)
+            assign = assign_splits(len(pair_list), split_ratios, split_mode, keys, seed)
+        folds = [None] * len(pair_list)
+        if kfold:
+            pool = [i for i, s in enumerate(assign) if s == 0 and i not in dropped]
+            folds = fold_assignment(len(pair_list), pool, kfold, split_mode, keys, seed, clusters)
+        labeled = ((*pair, SPLITS[assign[i]], folds[i]) for i, pair in enumerate(pair_list) if i not in dropped)
+    else:
+        labeled = ((img, js, prefix, SPLITS[hash_split(stem_of(img), ratios, seed)], None)
+                   for img, js, prefix in counted(pairs))
+
+    def records():
+        for img, js, prefix, split, fold in labeled:
+            key = os.path.abspath(img)
+            old_entry = remaining.pop(key, None)
+            entry = {
+                "split": split,
+                "image": f"images/{split}/{prefix}{os.path.basename(img)}",
+                "label": f"labels/{split}/{prefix}{stem_of(img)}.txt",
+            }
+            if fold is not None:
+                entry["fold"] = fold
+            src = source_of[prefix]
+            quarantine = [(prefix[:-1] + "/" if prefix else "") + os.path.relpath(p, src).replace(os.sep, "/")
+                          for p in (img, js)]
+            yield {
+                "img": img, "js": js, "key": key, "quarantine": quarantine,
+                "old": old_entry,
+                "prev": old_entry if params_match else None,
+                "entry": entry,
+            }
+
+    thread_ex = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    proc_ex = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    writer = ManifestWriter(root, params)
+    coco = CocoWriter(root, names, SPLITS) if fmt == "COCO" else None
+    stats = StatsCollector(names, SPLITS)
+    report = BuildReport(on_error)
+    probe = ProbeCache(cache_root) if size_check != "off" else None
+    tile_index = TileIndexWriter(root) if tile else None
+    fold_members: List[List[str]] = [[] for _ in range(kfold)]
+    n_tiles = 0
+    counts = {REUSE: 0, BUILD: 0, QUARANTINE: 0}
+    n_new = 0
+    used_modes: Dict[str, int] = {}
+    stale: List[Dict] = []
+    claimed = set()
+    # 合并标签缓存：新转换的数组暂存在 arrays 中；复用的条目从旧缓存读取，缺失时回退解析 .txt
+    arrays: Dict[str, Tuple] = {}
+    old_cache = LabelCache.open(root) if params_match else None
+    cache_images: List[str] = []
+    cache_shapes: List[List[int]] = []
+    cache_labels: List[Tuple] = []
+
+    def reused_labels(image: str, label: str) -> Tuple[Tuple, Optional[List[int]]]:
+        """复用输出的标签数组与缓存记录的图片 `[高, 宽]`；旧缓存中没有时解析 .txt，尺寸为 None。"""
+        i = old_cache.find(image) if old_cache is not None else None
+        if i is not None:
+            cls, boxes = old_cache.labels(i)
+            return (np.array(cls), np.array(boxes)), [int(v) for v in old_cache.shapes[i]]
+        with open(os.path.join(root, label), "r", encoding="utf-8") as f:
+            return parse_yolo_text(f.read()), None
+
+    try:
+        planned = (r for r, _ in ordered_map(partial(_plan_one, root=root, probe=probe), records(), thread_ex, workers * 4))
+
+        def converted():
+            chunks = chunked(planned, _CONVERT_CHUNK)
+            arg = lambda chunk: [r["js"] if r["action"] == BUILD else None for r in chunk]
+            for chunk, results in ordered_map(partial(_convert_chunk, classes=names, remap=remap), chunks, proc_ex, workers * 2, arg=arg):
+                nbytes = 0
+                for r, res in zip(chunk, results):
+                    if res is not None and not res[4] and probe is not None:
+                        size, problems, fixed = _check_size(res[3], r.pop("probed"), size_check)
+                        if problems:
+                            res = (None, None, None, None, problems)
+                        else:
+                            if fixed:
+                                report.add_corrected(r["js"], res[3], size)
+                            res = res[:3] + (size, res[4])
+                    if res is not None and res[4]:
+                        r["action"] = QUARANTINE
+                        r["problems"] = res[4]
+                    elif res is not None:
+                        r["text"], cls, boxes, (w, h), _ = res
+                        r["entry"]["shape"] = [h, w]
+                        if tile:
+                            # 切片需要在落盘任务中裁剪标签
+                            r["labels"] = (cls, boxes)
+                        else:
+                            # 标签数组留在主进程，不随记录进入落盘任务
+                            arrays[r["key"]] = (cls, boxes)
+                        nbytes += r["entry"]["json_size"]
+                progress.add(STAGE_CONVERT, len(chunk), nbytes)
+                yield from chunk
+
+        stream = converted()
+        if on_error == "strict":
+            # 严格模式先完成全部解析与检查，有问题时在任何输出落盘之前失败，已有的数据集与清单保持原样
+            stream = list(stream)
+            bad = [r for r in stream if r["action"] == QUARANTINE]
+            if bad:
+                for r in bad:
+                    report.add(r["js"], r["img"], r["problems"])
+                report.write(root)
+                for line in report.summary_lines():
+                    progress.log(line)
+                raise ValueError(f"严格模式: 发现 {len(report.problems)} 条标注问题，详见 {os.path.join(root, REPORT_NAME)}")
+        # 预缩放与切片是 CPU 密集的解码/编码，走进程池；普通落盘是 I/O，走线程池
+        mat_ex = proc_ex if imgsz or tile else thread_ex
+        mat = ordered_map(partial(_materialize_one, root=root, link_mode=link_mode, imgsz=imgsz, tile=tile),
+                          stream, mat_ex, workers * 4)
+        # 进程池返回的是记录副本，使用任务结果而不是原记录
+        for _, rec in mat:
+            entry = rec["entry"]
+            old_entry = rec["old"]
+            progress.add(STAGE_MATERIALIZE, 1, entry["img_size"] if rec["action"] == BUILD else 0)
+            counts[rec["action"]] += 1
+            if rec["action"] == QUARANTINE:
+                # 旧输出已不再有效，随来源消失的条目一并清理；隔离条目不写入清单，下次构建重新检查
+                report.add(rec["js"], rec["img"], rec["problems"], rec["quarantine"])
+                if old_entry is not None:
+                    stale.append(old_entry)
+                progress.add(STAGE_WRITE)
+                continue
+            if rec["action"] == BUILD:
+                used_modes[rec["used"]] = used_modes.get(rec["used"], 0) + 1
+                if old_entry is None:
+                    n_new += 1
+            # 切片网格或切片开关变化时输出集合不同，旧输出中未被本次占用的随后删除
+            if old_entry is not None and (not same_outputs(old_entry, entry) or output_paths(old_entry) != output_paths(entry)):
+                stale.append(old_entry)
+            claimed.update(output_paths(entry))
+            outputs = []
+            if entry.get("tiles"):
+                built = rec.get("tile_labels")
+                for j, (image, label, x0, y0, x1, y1) in enumerate(entry["tiles"]):
+                    labels = built[j] if built is not None else reused_labels(image, label)[0]
+                    outputs.append((image, [y1 - y0, x1 - x0], labels))
+                tile_index.add(rec["img"], [entry["shape"][1], entry["shape"][0]], [[t[0], *t[2:]] for t in entry["tiles"]])
+                n_tiles += len(entry["tiles"])
+            else:
+                if rec["action"] == BUILD:
+                    labels = arrays.pop(rec["key"])
+                else:
+                    labels, shape = reused_labels(entry["image"], entry["label"])
+                    if not entry.get("shape") and shape:
+                        entry["shape"] = shape
+                if not entry.get("shape"):
+                    w, h = image_size(os.path.join(root, entry["image"]))
+                    entry["shape"] = [h, w]
+                outputs.append((entry["image"], entry["shape"], labels))
+            if entry.get("fold") is not None:
+                fold_members[entry["fold"]].extend(o[0] for o in outputs)
+            for image, shape, labels in outputs:
+                cache_images.append(image)
+                cache_shapes.append(shape)
+                cache_labels.append(labels)
+                if coco is not None:
+                    coco.add(entry["split"], image, shape, *labels)
+                stats.add(entry["split"], shape, *labels)
+            writer.add(rec["key"], entry)
+            progress.add(STAGE_WRITE)
+    except BaseException:
+        writer.abort()
+        if coco is not None:
+            coco.abort()
+        if tile_index is not None:
+            tile_index.abort()
+        raise
+    finally:
+        if old_cache is not None:
+            old_cache.close()
+        if probe is not None:
+            probe.save()
+        for ex in (thread_ex, proc_ex):
+            if ex is not None:
+                ex.shutdown(cancel_futures=True)
+
+    report.write(root)
+    for line in report.summary_lines():
+        progress.log(line)
+
+    # 来源已消失的条目：删除其输出（仍被本次构建占用的路径除外）
+    removed = list(remaining.values())
+    for entry in stale + removed:
+        remove_outputs(root, entry, keep=claimed)
+    write_label_cache(root, names, cache_images, cache_shapes, cache_labels)
+    if coco is not None:
+        coco_counts = coco.counts()
+        coco.commit()
+        progress.log("COCO 标注: " + ", ".join(f"{s} {n} 张 / {a} 框" for s, (n, a) in coco_counts.items()))
+    else:
+        remove_coco(root)
+    if tile_index is not None:
+        tile_index.commit()
+        progress.log(f"切片: {counts[REUSE] + counts[BUILD]} 张原图 -> {n_tiles} 个切片，索引 {TILE_INDEX_NAME}")
+    elif os.path.exists(os.path.join(root, TILE_INDEX_NAME)):
+        os.remove(os.path.join(root, TILE_INDEX_NAME))
+    writer.commit()
+
     data_yaml = {
         "path": win_to_wsl_path(root),
         "train": "images/train",
@@ -64,12 +585,85 @@ def build_yolo_dataset(src_dir: str, classes_path: str, ratios: Tuple[int, int,
         "test": "images/test",
         "names": names,
     }
+    if kfold:
+        write_folds(root, fold_members, names, data_yaml["path"])
+        data_yaml["train"], data_yaml["val"] = list_name(0, "train"), list_name(0, "val")
+        progress.log(f"K 折: {kfold} 折，各折验证 " + ", ".join(str(len(m)) for m in fold_members)
+                     + " 张，依次训练各折: run_folds.sh")
+    else:
+        remove_folds(root)
     yaml_path = os.path.join(root, "dataset_config.yaml")
     with open(yaml_path, "w", encoding="utf-8") as f:
         yaml.safe_dump(data_yaml, f, allow_unicode=True, sort_keys=False)
-    if not persist and output_dir:
-        pass
+    dup_path = os.path.join(root, DUPLICATES_NAME)
+    if dup_report is not None:
+        write_duplicates(root, dup_report)
+    elif os.path.exists(dup_path):
+        os.remove(dup_path)
+    ds_stats = stats.result()
+    write_stats(root, ds_stats)
+    summary = {"reused": counts[REUSE], "updated": counts[BUILD], "new": n_new, "removed": len(removed), "link_modes": used_modes,
+               "quarantined": counts[QUARANTINE], "recommended_imgsz": ds_stats["recommended_imgsz"]}
+    if tile:
+        summary["tiles"] = n_tiles
+    progress.finish(summary)
+    progress.log(f"增量构建: 复用 {counts[REUSE]}, 更新 {counts[BUILD]} (新增 {n_new}, 变更 {counts[BUILD] - n_new}), 删除 {len(removed)}")
+    if probe is not None:
+        progress.log(f"尺寸检查: 读取文件头 {probe.misses} 张，缓存命中 {probe.hits} 张")
+    if counts[QUARANTINE]:
+        progress.log(f"隔离 {counts[QUARANTINE]} 个有问题的样本到 {os.path.join(root, QUARANTINE_DIR)}")
+    if used_modes:
+        progress.log("落盘方式: " + ", ".join(f"{k} {v}" for k, v in used_modes.items()))
+    for line in summary_lines(ds_stats):
+        progress.log(line)
+    if in_store:
+        size = dataset_store.finalize(root)
+        progress.log(f"数据集仓库条目 {os.path.basename(root)}，占用 {size / 1024 ** 2:.1f} MB")
+        for m in dataset_store.evict(keep=[os.path.basename(root)]):
+            progress.log(f"超出仓库预算，已淘汰最久未使用的条目 {m['key']} ({dataset_store.entry_src(m)})")
     return root, yaml_path
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口：`python -m core.dataset_builder --src <标注目录> --classes <classes.txt> --out <输出目录>`。"""
+    p = argparse.ArgumentParser(description="构建 YOLO 数据集")
+    p.add_argument("--src", required=True, nargs="+", help="标注数据文件夹，可指定多个来源合并构建")
+    p.add_argument("--classes", required=True, help="classes.txt 路径")
+    p.add_argument("--out", required=True, help="输出数据集目录")
+    p.add_argument("--ratios", type=int, nargs=3, default=[9, 1, 0], metavar=("TRAIN", "VAL", "TEST"))
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--workers", type=int, default=0, help="并行数，0 表示全部 CPU 核心")
+    p.add_argument("--split-mode", choices=SPLIT_MODES, default="random")
+    p.add_argument("--link-mode", choices=LINK_MODES, default="copy")
+    p.add_argument("--format", choices=DATASET_FORMATS, default="TXT", dest="fmt")
+    p.add_argument("--strict", action="store_true", help="严格模式：存在任何标注问题时构建失败")
+    p.add_argument("--size-check", choices=SIZE_CHECK_MODES, default="fix",
+                   help="核对标注尺寸与图片真实尺寸：fix 接受等比缩放，flag 任何不一致都报告，off 不检查")
+    p.add_argument("--dedup", choices=DEDUP_MODES, default="off",
+                   help="重复图片检测：group 同簇分入同一划分，drop 另外丢弃完全相同的图片")
+    p.add_argument("--dedup-distance", type=int, default=DEFAULT_DISTANCE, help="视为重复的最大感知哈希汉明距离")
+    p.add_argument("--tile-size", type=int, default=0, help="切片边长（像素），0 表示不切片")
+    p.add_argument("--tile-overlap", type=float, default=DEFAULT_OVERLAP, help="相邻切片的重叠比例")
+    p.add_argument("--tile-min-visibility", type=float, default=DEFAULT_MIN_VISIBILITY,
+                   help="框被切片裁剪后保留的最小面积比例")
+    p.add_argument("--remap", default=None, help="类别映射表（YAML/JSON），转换时在内存中统一类别名")
+    p.add_argument("--kfold", type=int, default=0, help="k 折交叉验证的折数，0 表示不使用")
+    p.add_argument("--imgsz", type=int, default=0, help="预缩放到训练分辨率的长边，0 表示不缩放")
+    a = p.parse_args(argv)
+    try:
+        root, yaml_path = build_yolo_dataset(a.src[0] if len(a.src) == 1 else a.src, a.classes, tuple(a.ratios), True, a.out, seed=a.seed,
+                                             workers=a.workers, split_mode=a.split_mode, link_mode=a.link_mode,
+                                             imgsz=a.imgsz or None, fmt=a.fmt,
+                                             on_error="strict" if a.strict else "quarantine",
+                                             size_check=a.size_check, dedup=a.dedup, dedup_distance=a.dedup_distance,
+                                             tile_size=a.tile_size or None, tile_overlap=a.tile_overlap,
+                                             tile_min_visibility=a.tile_min_visibility, kfold=a.kfold,
+                                             remap=a.remap)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(yaml_path)
+
+if __name__ == "__main__":
+    main()
 """数据集构建工具：从标注目录与类文件生成 YOLO 训练集结构。
 
 - 输入：标注根目录、`classes.txt` 路径、比例 (train:val:test)、是否持久化与输出目录。
@@ -1,26 +1,186 @@
 import os
-import json
-import math
-from typing import List, Tuple, Dict
+import numpy as np
+from typing import List, Tuple, Dict, Iterator, Optional
+from .json_backend import load_file
+from .fs_scan import walk_files
 
 IMAGE_EXTS = {".jpg", ".jpeg", ".png"}
+_YOLO_LINE = "%d %.6f %.6f %.6f %.6f\n"
 
 def load_classes(path: str) -> List[str]:
     with open(path, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
 
-def _normalize_bbox(points: List[List[float]], iw: int, ih: int) -> Tuple[float, float, float, float]:
-    xs = [p[0] for p in points]
-    ys = [p[1] for p in points]
-    x_min = min(xs)
-    x_max = max(xs)
-    y_min = min(ys)
-    y_max = max(ys)
-    x_center = ((x_min + x_max) / 2.0) / float(iw)
-    y_center = ((y_min + y_max) / 2.0) / float(ih)
-    w = (x_max - x_min) / float(iw)
-    h = (y_max - y_min) / float(ih)
-    return x_center, y_center, w, h
+def build_class_index(classes: List[str]) -> Dict[str, int]:
+    """类别名 -> 编号字典；重复类别取首次出现的位置，与 `list.index` 行为一致。"""
+    index: Dict[str, int] = {}
+    for i, c in enumerate(classes):
+        index.setdefault(c, i)
+    return index
+
+def shapes_to_yolo_batch(datas: List[Dict], class_index: Dict[str, int]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    将一批 LabelMe 数据中的矩形框一次性向量化归一化。
+
+    参数:
+        datas (List[Dict]): 已解析的 LabelMe JSON 字典列表。
+        class_index (Dict[str, int]): `build_class_index` 生成的类别编号字典。
+
+    返回:
+        List[Tuple[np.ndarray, np.ndarray]]: 每个文件对应 `(cls, boxes)`，`cls` 形状为 (n,) 的 int64，
+        `boxes` 形状为 (n, 4) 的 float64，依次为 x_center、y_center、width、height。
+    """
+    counts = []
+    cls_ids = []
+    xs: List[float] = []
+    ys: List[float] = []
+    seg_lens = []
+    iws = []
+    ihs = []
+    for data in datas:
+        iw = float(int(data.get("imageWidth")))
+        ih = float(int(data.get("imageHeight")))
+        k = 0
+        for s in data.get("shapes", []):
+            if s.get("shape_type") != "rectangle":
+                continue
+            label = s.get("label")
+            idx = class_index.get(label)
+            if idx is None:
+                raise ValueError(f"label not in classes: {label}")
+            points = s.get("points", [])
+            if not points:
+                raise ValueError("rectangle has no points")
+            cls_ids.append(idx)
+            for p in points:
+                xs.append(p[0])
+                ys.append(p[1])
+            seg_lens.append(len(points))
+            iws.append(iw)
+            ihs.append(ih)
+            k += 1
+        counts.append(k)
+    n = len(cls_ids)
+    if n == 0:
+        return [(np.zeros((0,), dtype=np.int64), np.zeros((0, 4), dtype=np.float64)) for _ in datas]
+    starts = np.zeros(n, dtype=np.int64)
+    np.cumsum(seg_lens[:-1], out=starts[1:])
+    ax = np.asarray(xs, dtype=np.float64)
+    ay = np.asarray(ys, dtype=np.float64)
+    x_min = np.minimum.reduceat(ax, starts)
+    x_max = np.maximum.reduceat(ax, starts)
+    y_min = np.minimum.reduceat(ay, starts)
+    y_max = np.maximum.reduceat(ay, starts)
+    aw = np.asarray(iws, dtype=np.float64)
+    ah = np.asarray(ihs, dtype=np.float64)
+    # 运算顺序与逐框实现保持一致，保证 IEEE 结果逐位相同
+    boxes = np.empty((n, 4), dtype=np.float64)
+    boxes[:, 0] = ((x_min + x_max) / 2.0) / aw
+    boxes[:, 1] = ((y_min + y_max) / 2.0) / ah
+    boxes[:, 2] = (x_max - x_min) / aw
+    boxes[:, 3] = (y_max - y_min) / ah
+    cls = np.asarray(cls_ids, dtype=np.int64)
+    out = []
+    start = 0
+    for k in counts:
+        out.append((cls[start:start + k], boxes[start:start + k]))
+        start += k
+    return out
+
+def check_labelme(data: Dict, class_index: Dict[str, int]) -> List[Tuple[int, str]]:
+    """
+    检查一个 LabelMe 文件能否转换，返回全部问题而不是遇到第一个就抛出。
+
+    参数:
+        data (Dict): 已解析的 LabelMe JSON。
+        class_index (Dict[str, int]): 类别编号字典。
+
+    返回:
+        List[Tuple[int, str]]: `(形状下标, 原因)` 列表；文件级问题（如缺少图片尺寸）的下标为 -1。
+    """
+    problems: List[Tuple[int, str]] = []
+    try:
+        if int(data.get("imageWidth")) <= 0 or int(data.get("imageHeight")) <= 0:
+            problems.append((-1, "imageWidth/imageHeight must be positive"))
+    except (TypeError, ValueError):
+        problems.append((-1, "missing or invalid imageWidth/imageHeight"))
+    shapes = data.get("shapes", [])
+    if not isinstance(shapes, list):
+        return problems + [(-1, "shapes is not a list")]
+    for i, s in enumerate(shapes):
+        if not isinstance(s, dict) or s.get("shape_type") != "rectangle":
+            continue
+        if s.get("label") not in class_index:
+            problems.append((i, f"label not in classes: {s.get('label')}"))
+        points = s.get("points", [])
+        if not points:
+            problems.append((i, "rectangle has no points"))
+            continue
+        try:
+            for p in points:
+                float(p[0]), float(p[1])
+        except (TypeError, ValueError, IndexError, KeyError):
+            problems.append((i, "invalid point coordinates"))
+    return problems
+
+def convert_json_batch_checked(json_paths: List[str], classes: List[str],
+                               remap=None) -> List[Tuple[Optional[Tuple[np.ndarray, np.ndarray]], Optional[Tuple[int, int]], List[Tuple[int, str]]]]:
+    """
+    容错版批量转换：逐个读取与检查，有问题的文件不参与转换。
+
+    参数:
+        remap (Optional[ClassRemap]): 类别映射（见 `core.class_remap`），在查找类别编号前于内存中改名。
+
+    返回:
+        List: 与输入顺序一致的 `((cls, boxes), (宽, 高), 问题列表)`；有问题的文件前两项为 None。
+    """
+    class_index = build_class_index(classes)
+    if remap is not None:
+        class_index = remap.class_index(class_index)
+    datas: List[Optional[Dict]] = []
+    problems: List[List[Tuple[int, str]]] = []
+    for p in json_paths:
+        try:
+            data = load_file(p, lazy=True)
+            if not isinstance(data, dict):
+                raise ValueError("top level is not an object")
+        except (OSError, ValueError) as e:
+            datas.append(None)
+            problems.append([(-1, f"invalid json: {e}")])
+            continue
+        found = check_labelme(data, class_index)
+        datas.append(None if found else data)
+        problems.append(found)
+    good = [d for d in datas if d is not None]
+    converted = iter(shapes_to_yolo_batch(good, class_index)) if good else iter(())
+    out = []
+    for data, found in zip(datas, problems):
+        if data is None:
+            out.append((None, None, found))
+        else:
+            out.append((next(converted), (int(data.get("imageWidth")), int(data.get("imageHeight"))), found))
+    return out
+
+def yolo_text(cls: np.ndarray, boxes: np.ndarray) -> str:
+    """将一个文件的 `(cls, boxes)` 一次性格式化为 YOLO 标签文本（每行以换行结尾）。"""
+    n = len(cls)
+    if n == 0:
+        return ""
+    flat: List = []
+    for c, b in zip(cls.tolist(), boxes.tolist()):
+        flat.append(c)
+        flat.extend(b)
+    return (_YOLO_LINE * n) % tuple(flat)
+
+def convert_json_batch(json_paths: List[str], classes: List[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """读取一批 JSON 并批量转换，类别字典只构建一次。"""
+    return convert_json_batch_sized(json_paths, classes)[0]
+
+def convert_json_batch_sized(json_paths: List[str], classes: List[str]) -> Tuple[List[Tuple[np.ndarray, np.ndarray]], List[Tuple[int, int]]]:
+    """同 `convert_json_batch`，另外返回每个文件记录的图片尺寸 `(imageWidth, imageHeight)`。"""
+    datas = [load_file(p, lazy=True) for p in json_paths]
+    sizes = [(int(d.get("imageWidth")), int(d.get("imageHeight"))) for d in datas]
+    return shapes_to_yolo_batch(datas, build_class_index(classes)), sizes
 
 def json_to_yolo_lines(json_path: str, classes: List[str]) -> List[str]:
     """
@@ -33,35 +193,21 @@ def json_to_yolo_lines(json_path: str, classes: List[str]) -> List[str]:
     返回:
         List[str]: 每个元素为一个 YOLO 格式的行，格式为 "class_id x_center y_center width height"。
     """
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    iw = int(data.get("imageWidth"))
-    ih = int(data.get("imageHeight"))
-    lines = []
-    for s in data.get("shapes", []):
-        if s.get("shape_type") != "rectangle":
-            continue
-        label = s.get("label")
-        if label not in classes:
-            raise ValueError(f"label not in classes: {label}")
-        cls_idx = classes.index(label)
-        x, y, w, h = _normalize_bbox(s.get("points", []), iw, ih)
-        line = f"{cls_idx} {x:.6f} {y:.6f} {w:.6f} {h:.6f}"
-        lines.append(line)
-    return lines
+    cls, boxes = convert_json_batch([json_path], classes)[0]
+    return yolo_text(cls, boxes).splitlines()
 
-def pair_images_and_jsons(root: str) -> List[Tuple[str, str]]:
+def iter_pairs(root: str) -> Iterator[Tuple[str, str]]:
     """
-    遍历目录，将每个图像文件与对应的 JSON 文件配对。
+    逐目录遍历并产出图像与同名 JSON 的配对，遍历未结束时即可开始消费。
 
     参数:
         root (str): 包含图像和 JSON 文件的根目录。
 
     返回:
-        List[Tuple[str, str]]: 每个元组包含一个图像路径和一个 JSON 路径。
+        Iterator[Tuple[str, str]]: 依次产出 `(图像路径, JSON 路径)`，顺序与 `os.walk` 一致。
+            目录列举走 `fs_scan.walk_files`（并行 + mtime 缓存）。
     """
-    pairs = []
-    for dirpath, _, filenames in os.walk(root):
+    for dirpath, filenames in walk_files(root):
         base_map: Dict[str, Dict[str, str]] = {}
         for name in filenames:
             p = os.path.join(dirpath, name)
@@ -74,5 +220,16 @@ def pair_images_and_jsons(root: str) -> List[Tuple[str, str]]:
             img = d.get("img")
             js = d.get("json")
             if img and js:
-                pairs.append((img, js))
-    return pairs
\ No newline at end of file
+                yield img, js
+
+def pair_images_and_jsons(root: str) -> List[Tuple[str, str]]:
+    """
+    遍历目录，将每个图像文件与对应的 JSON 文件配对。
+
+    参数:
+        root (str): 包含图像和 JSON 文件的根目录。
+
+    返回:
+        List[Tuple[str, str]]: 每个元组包含一个图像路径和一个 JSON 路径。
+    """
+    return list(iter_pairs(root))
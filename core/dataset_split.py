@@ -0,0 +1,157 @@
+"""数据集划分：为每个样本生成所属子集编号（0=train, 1=val, 2=test）。
+
+- `random`：与原实现一致，按种子打乱索引后按比例切分，同一种子、同一输入顺序结果稳定。
+- `hash`：对文件名主干（stem）做哈希映射到 [0, 1)，再按比例区间判定子集。
+  新增图片不会改变已有样本的归属，是增量重建的基础。
+- 需要整体归属同一子集的样本组（如重复图片簇）使用 `group_assignment`。
+- k 折交叉验证的折编号由 `fold_assignment` 生成，同样支持样本组。
+"""
+import random
+import hashlib
+from typing import List, Tuple, Sequence, Optional
+
+SPLITS = ("train", "val", "test")
+SPLIT_MODES = ("random", "hash")
+
+def _check_ratios(ratios: Tuple[int, int, int]) -> Tuple[int, int, int, int]:
+    a, b, c = ratios
+    total = a + b + c
+    if total == 0:
+        raise ValueError("invalid ratios")
+    return a, b, c, total
+
+def stem_bucket(key: str, seed: int = 42) -> float:
+    """将 `key` 稳定地映射到 [0, 1)，与进程、平台及 `PYTHONHASHSEED` 无关。"""
+    h = hashlib.blake2b(key.encode("utf-8"), digest_size=8, salt=str(seed).encode("ascii")[:16])
+    return int.from_bytes(h.digest(), "big") / float(1 << 64)
+
+def random_assignment(n: int, ratios: Tuple[int, int, int], seed: int = 42) -> List[int]:
+    """按种子打乱后切分，返回长度为 `n` 的子集编号数组，O(n)。"""
+    a, b, _, total = _check_ratios(ratios)
+    idxs = list(range(n))
+    random.Random(seed).shuffle(idxs)
+    n_train = round(n * a / total)
+    n_val = round(n * b / total)
+    assign = [2] * n
+    for i in idxs[:n_train]:
+        assign[i] = 0
+    for i in idxs[n_train:n_train + n_val]:
+        assign[i] = 1
+    return assign
+
+def hash_split(key: str, ratios: Tuple[int, int, int], seed: int = 42) -> int:
+    """单个样本的哈希划分结果，供流式构建逐个判定。"""
+    a, b, _, total = _check_ratios(ratios)
+    u = stem_bucket(key, seed)
+    return 0 if u < a / total else (1 if u < (a + b) / total else 2)
+
+def hash_assignment(keys: Sequence[str], ratios: Tuple[int, int, int], seed: int = 42) -> List[int]:
+    """按 `keys`（通常为文件 stem）哈希划分，单个样本的归属只取决于自身的 key。"""
+    _check_ratios(ratios)
+    return [hash_split(k, ratios, seed) for k in keys]
+
+def assign_splits(n: int, ratios: Tuple[int, int, int], mode: str = "random", keys: Optional[Sequence[str]] = None, seed: int = 42) -> List[int]:
+    """
+    生成每个索引对应的子集编号。
+
+    参数:
+        n (int): 样本数量。
+        ratios (Tuple[int, int, int]): train:val:test 比例。
+        mode (str): `random` 或 `hash`。
+        keys (Sequence[str]): `hash` 模式下每个样本的 key，长度需为 `n`。
+        seed (int): 随机种子；`hash` 模式下作为哈希盐。
+
+    返回:
+        List[int]: 第 i 个元素为样本 i 的子集编号，可用 `SPLITS[...]` 取名称。
+    """
+    if mode == "random":
+        return random_assignment(n, ratios, seed)
+    if mode == "hash":
+        if keys is None or len(keys) != n:
+            raise ValueError("hash 划分需要与样本数量一致的 keys")
+        return hash_assignment(keys, ratios, seed)
+    raise ValueError(f"unknown split mode: {mode}")
+
+def group_assignment(n: int, groups: Sequence[Sequence[int]], ratios: Tuple[int, int, int], mode: str = "random",
+                     keys: Optional[Sequence[str]] = None, seed: int = 42) -> List[int]:
+    """
+    与 `assign_splits` 相同，但 `groups` 中每组样本（如重复图片簇）整体分到同一子集。
+
+    - `random`：以组为单位按种子打乱，按累计样本数切分；没有分组时结果与 `random_assignment` 逐位一致。
+    - `hash`：组内 key 最小的样本决定整组归属，新增样本不改变已有组的划分。
+    """
+    a, b, _, total = _check_ratios(ratios)
+    leader = list(range(n))
+    for g in groups:
+        first = min(g)
+        for i in g:
+            leader[i] = first
+    if mode == "hash":
+        if keys is None or len(keys) != n:
+            raise ValueError("hash 划分需要与样本数量一致的 keys")
+        group_key = {}
+        for i in range(n):
+            k = group_key.get(leader[i])
+            group_key[leader[i]] = keys[i] if k is None else min(k, keys[i])
+        return [hash_split(group_key[leader[i]], ratios, seed) for i in range(n)]
+    if mode != "random":
+        raise ValueError(f"unknown split mode: {mode}")
+    sizes = {}
+    for i in range(n):
+        sizes[leader[i]] = sizes.get(leader[i], 0) + 1
+    units = sorted(sizes)
+    random.Random(seed).shuffle(units)
+    n_train = round(n * a / total)
+    n_val = round(n * b / total)
+    split_of = {}
+    pos = 0
+    for u in units:
+        split_of[u] = 0 if pos < n_train else (1 if pos < n_train + n_val else 2)
+        pos += sizes[u]
+    return [split_of[leader[i]] for i in range(n)]
+
+def fold_assignment(n: int, pool: Sequence[int], k: int, mode: str = "random", keys: Optional[Sequence[str]] = None,
+                    seed: int = 42, groups: Sequence[Sequence[int]] = ()) -> List[Optional[int]]:
+    """
+    为 `pool` 中的样本分配 k 折编号（0..k-1），其余样本为 None；`groups` 中同组样本分到同一折。
+
+    - `random`：以组为单位按种子打乱，依次放入当前样本最少的折，各折大小尽量均衡。
+    - `hash`：按组内最小 key 的哈希值决定折编号，新增样本不改变已有样本的折。
+    """
+    if k < 2:
+        raise ValueError("k 折划分需要 k >= 2")
+    leader = {i: i for i in pool}
+    for g in groups:
+        members = [i for i in g if i in leader]
+        if members:
+            first = min(members)
+            for i in members:
+                leader[i] = first
+    sizes: dict = {}
+    for i in pool:
+        sizes[leader[i]] = sizes.get(leader[i], 0) + 1
+    fold_of = {}
+    if mode == "hash":
+        if keys is None or len(keys) != n:
+            raise ValueError("hash 划分需要与样本数量一致的 keys")
+        group_key: dict = {}
+        for i in pool:
+            k0 = group_key.get(leader[i])
+            group_key[leader[i]] = keys[i] if k0 is None else min(k0, keys[i])
+        # 加前缀与划分所用的哈希区分开，否则同一池内的样本只会落在部分折中
+        for u, key in group_key.items():
+            fold_of[u] = min(int(stem_bucket("fold:" + key, seed) * k), k - 1)
+    elif mode == "random":
+        units = sorted(sizes)
+        random.Random(seed).shuffle(units)
+        load = [0] * k
+        for u in units:
+            f = load.index(min(load))
+            fold_of[u] = f
+            load[f] += sizes[u]
+    else:
+        raise ValueError(f"unknown split mode: {mode}")
+    out: List[Optional[int]] = [None] * n
+    for i in pool:
+        out[i] = fold_of[leader[i]]
+    return out
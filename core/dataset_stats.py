@@ -0,0 +1,152 @@
+"""数据集统计：在构建流水线中顺带累积统计量，不额外读取数据。
+
+统计内容写入数据集根目录的 `dataset_stats.json`：
+- 各类别框数（总计与按划分）、各划分图片数与空图数；
+- 每张图片框数的直方图；
+- 框尺寸直方图：像素边长 `sqrt(w * h)` 与相对边长（除以图片长边），以及按 COCO 定义的小/中/大目标占比；
+- 建议的训练 `imgsz`：在候选尺寸中选最小的一个，使缩放后边长不足 `MIN_BOX_PX` 像素的框不超过
+  `MAX_TINY_RATIO`，且不超过原图长边的中位数（避免无意义的放大）。
+"""
+import os
+import json
+import numpy as np
+from typing import Dict, List, Sequence
+
+STATS_NAME = "dataset_stats.json"
+IMGSZ_CANDIDATES = (640, 800, 960, 1024, 1280, 1536)
+MIN_BOX_PX = 8.0
+MAX_TINY_RATIO = 0.05
+# 每张图片框数直方图的上限，超过的计入最后一格
+MAX_BOXES_BIN = 50
+PX_BINS = [0, 8, 16, 32, 64, 96, 128, 256, 512, 1024, float("inf")]
+REL_BINS = [0, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, float("inf")]
+# 缓冲的框数达到该值时合并一次，避免逐张图片做小数组运算
+_FLUSH_BOXES = 1 << 16
+
+class StatsCollector:
+    """逐张图片累积统计量，`add()` 在构建主循环中调用，`result()` 汇总为可写出的字典。"""
+    def __init__(self, names: List[str], splits: Sequence[str]):
+        self.names = names
+        self.splits = list(splits)
+        nc, ns = len(names), len(self.splits)
+        self.class_counts = np.zeros((ns, nc), dtype=np.int64)
+        self.images = np.zeros(ns, dtype=np.int64)
+        self.empty = np.zeros(ns, dtype=np.int64)
+        self.boxes_per_image = np.zeros(MAX_BOXES_BIN + 1, dtype=np.int64)
+        self.px_hist = np.zeros(len(PX_BINS) - 1, dtype=np.int64)
+        self.rel_hist = np.zeros(len(REL_BINS) - 1, dtype=np.int64)
+        self.coco_sizes = np.zeros(3, dtype=np.int64)
+        self.tiny_at = np.zeros(len(IMGSZ_CANDIDATES), dtype=np.int64)
+        self.long_sides: Dict[int, int] = {}
+        self._buf: List[tuple] = []
+        self._buffered = 0
+
+    def add(self, split: str, shape: Sequence[int], cls: np.ndarray, boxes: np.ndarray):
+        """累积一张图片：`shape` 为 `(高, 宽)`，`cls`/`boxes` 为归一化标签数组。"""
+        si = self.splits.index(split)
+        h, w = int(shape[0]), int(shape[1])
+        n = len(cls)
+        self.images[si] += 1
+        self.long_sides[max(h, w)] = self.long_sides.get(max(h, w), 0) + 1
+        self.boxes_per_image[min(n, MAX_BOXES_BIN)] += 1
+        if n == 0:
+            self.empty[si] += 1
+            return
+        self._buf.append((si, np.asarray(cls), np.asarray(boxes, dtype=np.float64), w, h))
+        self._buffered += n
+        if self._buffered >= _FLUSH_BOXES:
+            self._flush()
+
+    def _flush(self):
+        if not self._buf:
+            return
+        ns = [len(c) for _, c, _, _, _ in self._buf]
+        split_idx = np.repeat([si for si, _, _, _, _ in self._buf], ns)
+        cls = np.concatenate([c for _, c, _, _, _ in self._buf]).astype(np.int64)
+        boxes = np.concatenate([b for _, _, b, _, _ in self._buf])
+        ws = np.repeat([w for _, _, _, w, _ in self._buf], ns).astype(np.float64)
+        hs = np.repeat([h for _, _, _, _, h in self._buf], ns).astype(np.float64)
+        self._buf.clear()
+        self._buffered = 0
+
+        np.add.at(self.class_counts, (split_idx, cls), 1)
+        area = boxes[:, 2] * ws * boxes[:, 3] * hs
+        side = np.sqrt(area)
+        rel = side / np.maximum(ws, hs)
+        self.px_hist += np.histogram(side, bins=PX_BINS)[0]
+        self.rel_hist += np.histogram(rel, bins=REL_BINS)[0]
+        self.coco_sizes += np.histogram(area, bins=[0, 32 ** 2, 96 ** 2, float("inf")])[0]
+        for i, c in enumerate(IMGSZ_CANDIDATES):
+            self.tiny_at[i] += int(np.count_nonzero(rel * c < MIN_BOX_PX))
+
+    def _median_long_side(self) -> int:
+        half = sum(self.long_sides.values()) / 2
+        seen = 0
+        for side in sorted(self.long_sides):
+            seen += self.long_sides[side]
+            if seen >= half:
+                return side
+        return 0
+
+    def recommend_imgsz(self) -> int:
+        """按小目标占比给出建议的训练尺寸（32 的倍数）。"""
+        self._flush()
+        total = int(self.class_counts.sum())
+        median_side = self._median_long_side() or IMGSZ_CANDIDATES[0]
+        cap = max(IMGSZ_CANDIDATES[0], median_side // 32 * 32)
+        best = IMGSZ_CANDIDATES[0]
+        for c, tiny in zip(IMGSZ_CANDIDATES, self.tiny_at.tolist()):
+            if c > cap:
+                break
+            best = c
+            if total == 0 or tiny / total <= MAX_TINY_RATIO:
+                break
+        return best
+
+    def result(self) -> Dict:
+        self._flush()
+        total_boxes = int(self.class_counts.sum())
+        n_images = int(self.images.sum())
+        per_image = np.arange(MAX_BOXES_BIN + 1)
+        return {
+            "images": {s: int(self.images[i]) for i, s in enumerate(self.splits)},
+            "empty_images": {s: int(self.empty[i]) for i, s in enumerate(self.splits)},
+            "boxes": total_boxes,
+            "boxes_per_image": {
+                "mean": float((self.boxes_per_image * per_image).sum() / n_images) if n_images else 0.0,
+                "hist": self.boxes_per_image.tolist(),
+                "hist_note": f"下标为每张图片的框数，最后一格为 >= {MAX_BOXES_BIN}",
+            },
+            "class_counts": {n: int(self.class_counts[:, i].sum()) for i, n in enumerate(self.names)},
+            "class_counts_by_split": {s: {n: int(self.class_counts[si, i]) for i, n in enumerate(self.names)}
+                                      for si, s in enumerate(self.splits)},
+            "box_size_px": {"bins": [b if np.isfinite(b) else None for b in PX_BINS], "hist": self.px_hist.tolist()},
+            "box_size_rel": {"bins": [b if np.isfinite(b) else None for b in REL_BINS], "hist": self.rel_hist.tolist()},
+            "coco_sizes": dict(zip(("small", "medium", "large"), self.coco_sizes.tolist())),
+            "small_ratio": float(self.coco_sizes[0] / total_boxes) if total_boxes else 0.0,
+            "tiny_ratio_at_imgsz": {str(c): (float(t / total_boxes) if total_boxes else 0.0)
+                                    for c, t in zip(IMGSZ_CANDIDATES, self.tiny_at.tolist())},
+            "recommended_imgsz": self.recommend_imgsz(),
+        }
+
+def write_stats(root: str, stats: Dict) -> str:
+    path = os.path.join(root, STATS_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+    return path
+
+def summary_lines(stats: Dict) -> List[str]:
+    """构建日志中显示的统计摘要。"""
+    imgs = stats["images"]
+    lines = [
+        f"统计: 图片 {sum(imgs.values())} 张 ({', '.join(f'{s} {n}' for s, n in imgs.items())})，"
+        f"框 {stats['boxes']} 个，平均每张 {stats['boxes_per_image']['mean']:.2f} 个，"
+        f"空图 {sum(stats['empty_images'].values())} 张",
+        "类别: " + ", ".join(f"{n} {c}" for n, c in stats["class_counts"].items()),
+    ]
+    missing = [s for s, counts in stats["class_counts_by_split"].items()
+               if imgs.get(s) and any(c == 0 for c in counts.values())]
+    if missing:
+        lines.append("注意: 以下划分存在没有样本的类别: " + ", ".join(missing))
+    lines.append(f"小目标 (<32x32 像素) 占比 {stats['small_ratio'] * 100:.1f}%，建议 imgsz {stats['recommended_imgsz']}")
+    return lines
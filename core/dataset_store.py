@@ -0,0 +1,274 @@
+"""托管数据集仓库：未持久化的构建不再每次新建临时目录，而是放入按来源与划分参数定位的仓库目录。
+
+- 仓库条目以 `(源目录, 类别, 比例, 种子, 划分方式, 落盘方式, imgsz)` 的指纹为键；指纹相同的再次构建
+  落在同一目录，配合构建清单只处理变化的样本。
+- 每个条目目录下的 `store_entry.json` 记录来源、参数、大小与最近使用时间。
+- 仓库总大小超过预算（配置 `dataset.store.budget_gb`）时按最近最少使用淘汰，正在使用的条目除外：
+  训练开始时 `mark_in_use` 在条目下写入 `in_use.json`（进程号），结束时 `release` 删除；
+  标记所属进程已退出（如程序崩溃）的标记视为失效。本次构建的条目由调用方通过 `keep` 保护。
+- 手动删除（`remove`、命令行 `prune --key/--all`、仓库对话框）同样跳过正在使用的条目，除非指定 `force`。
+
+命令行：`python -m core.dataset_store list` / `python -m core.dataset_store prune [--key K ...] [--all] [--force] [--budget-gb N]`
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from typing import Dict, List, Optional, Sequence, Union
+
+ENTRY_META = "store_entry.json"
+IN_USE_MARK = "in_use.json"
+DEFAULT_BUDGET_GB = 20.0
+
+# remove 的结果
+REMOVED = "removed"
+MISSING = "missing"
+IN_USE = "in_use"
+
+def _store_settings() -> Dict:
+    try:
+        from tools.sys_config_tools import get_dataset_config
+        return get_dataset_config().get("store", {}) or {}
+    except Exception:
+        return {}
+
+def store_dir() -> str:
+    """仓库根目录：配置 `dataset.store.dir`，未配置时为应用缓存目录下的 `datasets`。"""
+    d = str(_store_settings().get("dir") or "").strip()
+    if d:
+        os.makedirs(d, exist_ok=True)
+        return os.path.abspath(d)
+    from tools.sys_config_tools import get_cache_dir
+    return get_cache_dir("datasets")
+
+def budget_bytes() -> int:
+    """仓库磁盘预算（字节），`0` 表示不限制。"""
+    gb = _store_settings().get("budget_gb", DEFAULT_BUDGET_GB)
+    return int(float(gb or 0) * 1024 ** 3)
+
+def _src_key(src_dir: Union[str, Sequence[str]]) -> Union[str, List[str]]:
+    if isinstance(src_dir, str):
+        return os.path.normcase(os.path.abspath(src_dir))
+    return [os.path.normcase(os.path.abspath(s)) for s in src_dir]
+
+def fingerprint(src_dir: Union[str, Sequence[str]], params: Dict) -> str:
+    """来源目录（多来源构建时为目录列表，顺序有意义）与构建参数的指纹。"""
+    raw = json.dumps({"src": _src_key(src_dir), "params": params},
+                     ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=10).hexdigest()
+
+def _meta_path(root: str) -> str:
+    return os.path.join(root, ENTRY_META)
+
+def _read_meta(root: str) -> Optional[Dict]:
+    try:
+        with open(_meta_path(root), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_meta(root: str, meta: Dict):
+    tmp = _meta_path(root) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, _meta_path(root))
+
+def dir_size(root: str) -> int:
+    """条目实际占用的字节数；硬链接落盘的图片与源文件共享数据、符号链接不占数据，均不计入。"""
+    total = 0
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            try:
+                st = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            if st.st_nlink == 1:
+                total += st.st_size
+    return total
+
+def acquire(src_dir: Union[str, Sequence[str]], params: Dict) -> str:
+    """取得（必要时创建）指纹对应的仓库目录并标记为最近使用，返回目录路径。"""
+    key = fingerprint(src_dir, params)
+    root = os.path.join(store_dir(), key)
+    os.makedirs(root, exist_ok=True)
+    src = os.path.abspath(src_dir) if isinstance(src_dir, str) else [os.path.abspath(s) for s in src_dir]
+    meta = _read_meta(root) or {"key": key, "src": src, "params": params,
+                                "created": time.time(), "size": 0}
+    meta["last_used"] = time.time()
+    _write_meta(root, meta)
+    return root
+
+def finalize(root: str) -> int:
+    """构建完成后更新条目大小与使用时间，返回条目大小（字节）。"""
+    meta = _read_meta(root)
+    if meta is None:
+        return 0
+    meta["size"] = dir_size(root)
+    meta["last_used"] = time.time()
+    _write_meta(root, meta)
+    return meta["size"]
+
+def touch(root: str):
+    """标记条目被使用（如启动训练时），影响淘汰顺序。"""
+    meta = _read_meta(root)
+    if meta is not None:
+        meta["last_used"] = time.time()
+        _write_meta(root, meta)
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def mark_in_use(root: str):
+    """标记条目正在使用（训练开始或同步到 WSL 时），淘汰时跳过。"""
+    tmp = os.path.join(root, IN_USE_MARK + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"pid": os.getpid(), "since": time.time()}, f)
+    os.replace(tmp, os.path.join(root, IN_USE_MARK))
+
+def release(root: str):
+    """清除使用标记（训练结束时）。"""
+    try:
+        os.remove(os.path.join(root, IN_USE_MARK))
+    except FileNotFoundError:
+        pass
+
+def in_use(root: str) -> bool:
+    """条目是否被仍在运行的进程标记为正在使用。"""
+    try:
+        with open(os.path.join(root, IN_USE_MARK), "r", encoding="utf-8") as f:
+            pid = int(json.load(f).get("pid", 0))
+    except (OSError, ValueError, AttributeError):
+        return False
+    return _pid_alive(pid)
+
+def is_store_path(root: str) -> bool:
+    """判断目录是否为仓库条目。"""
+    return os.path.normcase(os.path.dirname(os.path.abspath(root))) == os.path.normcase(store_dir())
+
+def list_entries() -> List[Dict]:
+    """列出仓库条目（按最近使用时间从新到旧），每项附带 `root` 字段。"""
+    base = store_dir()
+    out = []
+    for name in os.listdir(base):
+        root = os.path.join(base, name)
+        meta = _read_meta(root) if os.path.isdir(root) else None
+        if meta is not None:
+            meta["root"] = root
+            out.append(meta)
+    out.sort(key=lambda m: m.get("last_used", 0), reverse=True)
+    return out
+
+def remove(key: str, force: bool = False) -> str:
+    """
+    删除指定条目。
+
+    参数:
+        key (str): 条目键。
+        force (bool): 为 True 时即使条目正在使用也删除。
+
+    返回:
+        str: `REMOVED`、`MISSING`（条目不存在）或 `IN_USE`（正在训练或同步，未删除）。
+    """
+    root = os.path.join(store_dir(), key)
+    if not os.path.isdir(root):
+        return MISSING
+    if not force and in_use(root):
+        return IN_USE
+    shutil.rmtree(root, ignore_errors=True)
+    return REMOVED
+
+def evict(budget: Optional[int] = None, keep: Sequence[str] = ()) -> List[Dict]:
+    """
+    按最近最少使用淘汰条目，直到总大小不超过预算。
+
+    参数:
+        budget (Optional[int]): 预算字节数，None 时取配置；`0` 表示不限制。
+        keep (Sequence[str]): 不参与淘汰的条目键（如本次刚构建的条目）；被标记为正在使用的条目同样跳过。
+
+    返回:
+        List[Dict]: 被删除条目的元数据。
+    """
+    budget = budget_bytes() if budget is None else budget
+    if budget <= 0:
+        return []
+    entries = list_entries()
+    total = sum(int(m.get("size", 0)) for m in entries)
+    removed = []
+    for m in reversed(entries):
+        if total <= budget:
+            break
+        if m["key"] in keep or remove(m["key"]) != REMOVED:
+            continue
+        total -= int(m.get("size", 0))
+        removed.append(m)
+    return removed
+
+def _fmt_size(n: int) -> str:
+    return f"{n / 1024 ** 3:.2f} GB" if n >= 1024 ** 3 else f"{n / 1024 ** 2:.1f} MB"
+
+def entry_src(m: Dict) -> str:
+    """条目来源的显示文本；多来源构建的目录以 ` + ` 连接。"""
+    src = m.get("src", "")
+    return " + ".join(src) if isinstance(src, list) else src
+
+def format_entry(m: Dict) -> str:
+    used = time.strftime("%Y-%m-%d %H:%M", time.localtime(m.get("last_used", 0)))
+    return f"{m['key']}  {_fmt_size(int(m.get('size', 0))):>10}  {used}  {entry_src(m)}"
+
+def main(argv: Optional[List[str]] = None):
+    p = argparse.ArgumentParser(description="管理托管数据集仓库")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="列出仓库条目")
+    pr = sub.add_parser("prune", help="删除条目或按预算淘汰")
+    pr.add_argument("--key", action="append", default=[], help="删除指定条目，可重复")
+    pr.add_argument("--all", action="store_true", help="删除全部条目")
+    pr.add_argument("--force", action="store_true", help="正在使用的条目也删除")
+    pr.add_argument("--budget-gb", type=float, default=None, help="按该预算淘汰，缺省取配置")
+    a = p.parse_args(argv)
+    if a.cmd == "list":
+        entries = list_entries()
+        for m in entries:
+            print(format_entry(m))
+        print(f"共 {len(entries)} 个条目，{_fmt_size(sum(int(m.get('size', 0)) for m in entries))}，目录 {store_dir()}")
+        return
+    if a.all:
+        keys = [m["key"] for m in list_entries()]
+    else:
+        keys = a.key
+    labels = {REMOVED: "已删除 ", MISSING: "不存在 ", IN_USE: "正在使用，已跳过 "}
+    skipped = []
+    for k in keys:
+        status = remove(k, force=a.force)
+        print(labels[status] + k)
+        if status == IN_USE:
+            skipped.append(k)
+    if skipped:
+        print(f"{len(skipped)} 个条目正在使用，未删除；确认无训练进行后可加 --force 删除")
+    if not keys and not a.all:
+        budget = budget_bytes() if a.budget_gb is None else int(a.budget_gb * 1024 ** 3)
+        for m in evict(budget):
+            print("已淘汰 " + format_entry(m))
+
+if __name__ == "__main__":
+    main()
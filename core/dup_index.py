@@ -0,0 +1,177 @@
+"""重复图片索引：感知哈希 (dHash) 聚类，避免同一画面的多次导出落入不同划分。
+
+- 每张图片计算 64 位 dHash（灰度缩到 9x8 后比较相邻像素）与文件内容摘要；计算在进程池中并行，
+  结果按文件 `(大小, mtime_ns)` 缓存在应用缓存目录的 `phash/` 下（见 `core.file_cache`）。
+- 汉明距离不超过 `distance` 的图片归为同一重复簇。查找使用多索引哈希：把 64 位分成 `distance + 1` 段，
+  距离不超过 `distance` 的两个哈希至少有一段完全相同，只需在同段取值的桶内比较，不做全量两两比较。
+- 内容摘要相同的图片为完全重复，可在构建时只保留第一张。
+- 构建时同一簇的图片分到同一划分（见 `dataset_split.group_assignment`），簇信息写入 `duplicates.json`。
+"""
+import io
+import os
+import json
+import hashlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .file_cache import FileCache
+from .pipeline import ordered_map, chunked
+
+DUPLICATES_NAME = "duplicates.json"
+DEFAULT_DISTANCE = 4
+DEDUP_MODES = ("off", "group", "drop")
+CACHE_VERSION = 1
+_HASH_CHUNK = 32
+# 不超过该大小的桶直接计算两两距离矩阵，更大的桶逐行比较以限制内存
+_MATRIX_BUCKET = 256
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def dhash(data: bytes) -> int:
+    """从图片文件内容计算 64 位 dHash；JPEG 利用 draft 缩小解码，只需少量像素。"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as im:
+        im.draft("L", (64, 64))
+        small = im.convert("L").resize((9, 8), Image.Resampling.BILINEAR)
+    a = np.asarray(small, dtype=np.int16)
+    bits = (a[:, 1:] > a[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def _hash_chunk(paths: List[str]) -> List[Optional[Tuple[str, str]]]:
+    """进程池任务：返回每张图片的 `(dHash 十六进制, 内容摘要)`；无法解码的图片为 None。"""
+    out = []
+    for p in paths:
+        try:
+            with open(p, "rb") as f:
+                data = f.read()
+            out.append((f"{dhash(data):016x}", hashlib.blake2b(data, digest_size=16).hexdigest()))
+        except Exception:
+            out.append(None)
+    return out
+
+def image_hashes(paths: Sequence[str], cache: Optional[FileCache] = None,
+                 workers: int = 1) -> List[Optional[Tuple[int, str]]]:
+    """
+    计算一批图片的 `(dHash, 内容摘要)`，顺序与输入一致；缓存命中的文件不再读取。
+
+    参数:
+        paths (Sequence[str]): 图片路径。
+        cache (Optional[FileCache]): 结果缓存，通常为 `FileCache("phash", 源目录)`。
+        workers (int): 进程数，`1` 时在当前进程串行计算。
+    """
+    out: List[Optional[Tuple[int, str]]] = [None] * len(paths)
+    todo: List[Tuple[int, int, int]] = []
+    for i, p in enumerate(paths):
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        cached = cache.get(p, st.st_size, st.st_mtime_ns) if cache is not None else None
+        if cached is not None:
+            out[i] = (int(cached[0], 16), cached[1])
+        else:
+            todo.append((i, st.st_size, st.st_mtime_ns))
+    ex = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(todo) > _HASH_CHUNK else None
+    try:
+        chunks = chunked(iter(todo), _HASH_CHUNK)
+        arg = lambda chunk: [paths[i] for i, _, _ in chunk]
+        for chunk, results in ordered_map(_hash_chunk, chunks, ex, workers * 2, arg=arg):
+            for (i, size, mtime), res in zip(chunk, results):
+                if res is None:
+                    continue
+                out[i] = (int(res[0], 16), res[1])
+                if cache is not None:
+                    cache.put(paths[i], size, mtime, list(res))
+    finally:
+        if ex is not None:
+            ex.shutdown(cancel_futures=True)
+    return out
+
+def _popcount(x: np.ndarray) -> np.ndarray:
+    return _POPCOUNT8[x.view(np.uint8)].reshape(len(x), 8).sum(axis=1)
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+def find_clusters(hashes: Sequence[Optional[Tuple[int, str]]], distance: int = DEFAULT_DISTANCE) -> List[List[int]]:
+    """
+    按汉明距离聚类，返回成员数不少于 2 的重复簇（下标升序，簇按首个成员排序）。
+
+    参数:
+        hashes (Sequence): `image_hashes` 的结果；None（无法解码）不参与聚类。
+        distance (int): 视为重复的最大汉明距离，`0` 表示 dHash 完全相同。
+    """
+    idx = np.array([i for i, h in enumerate(hashes) if h is not None], dtype=np.int64)
+    uf = _UnionFind(len(hashes))
+    if len(idx) < 2:
+        return []
+    # 内容完全相同的图片直接合并
+    by_digest: Dict[str, int] = {}
+    for i in idx.tolist():
+        first = by_digest.setdefault(hashes[i][1], i)
+        if first != i:
+            uf.union(first, i)
+    # dHash 相同的图片先行合并，之后只比较不同的哈希值（大量纯色/空画面时桶不会退化为平方级比较）
+    all_values = np.array([hashes[i][0] for i in idx], dtype=np.uint64)
+    values, first_pos, inverse = np.unique(all_values, return_index=True, return_inverse=True)
+    for pos, u in enumerate(inverse.tolist()):
+        uf.union(int(idx[first_pos[u]]), int(idx[pos]))
+    idx_all, idx = idx, idx[first_pos]
+    bands = min(max(0, distance) + 1, 64)
+    bounds = np.linspace(0, 64, bands + 1).astype(np.int64)
+    for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        key = (values >> np.uint64(lo)) & np.uint64((1 << (hi - lo)) - 1)
+        order = np.argsort(key, kind="stable")
+        sorted_key = key[order]
+        starts = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+        for s, e in zip(starts.tolist(), ends.tolist()):
+            if e - s < 2:
+                continue
+            members = idx[order[s:e]]
+            vals = values[order[s:e]]
+            if e - s <= _MATRIX_BUCKET:
+                # 小桶一次算出两两距离矩阵
+                m = e - s
+                d = _popcount((vals[:, None] ^ vals[None, :]).ravel()).reshape(m, m)
+                for j, k in zip(*np.nonzero(np.triu(d <= distance, 1))):
+                    uf.union(int(members[j]), int(members[k]))
+                continue
+            for j in range(len(members) - 1):
+                d = _popcount(vals[j + 1:] ^ vals[j])
+                for k in np.flatnonzero(d <= distance).tolist():
+                    uf.union(int(members[j]), int(members[j + 1 + k]))
+    groups: Dict[int, List[int]] = {}
+    for i in idx_all.tolist():
+        groups.setdefault(uf.find(i), []).append(i)
+    return sorted((g for g in groups.values() if len(g) > 1), key=lambda g: g[0])
+
+def exact_duplicates(cluster: Sequence[int], hashes: Sequence[Optional[Tuple[int, str]]]) -> List[int]:
+    """簇内与更早成员内容完全相同的下标（保留每组内容的第一张，其余可丢弃）。"""
+    seen = set()
+    out = []
+    for i in cluster:
+        digest = hashes[i][1]
+        if digest in seen:
+            out.append(i)
+        seen.add(digest)
+    return out
+
+def write_duplicates(root: str, report: Dict) -> str:
+    path = os.path.join(root, DUPLICATES_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
@@ -0,0 +1,63 @@
+"""按文件签名失效的持久化结果缓存。
+
+缓存以扫描根目录区分，存放在应用缓存目录的 `<name>/` 下；条目以相对路径为键，记录
+`[大小, mtime_ns, 结果...]`，文件大小或修改时间变化即视为失效。与当前时刻过近的修改时间不写入
+（见 `core.app_cache`）。`get`/`put` 只做字典读写，可在线程池中并发调用。
+"""
+import os
+from typing import Dict, List, Optional
+
+from .app_cache import scan_settings, cache_file, load_cache, save_cache, racy_horizon
+
+class FileCache:
+    """
+    按 `(大小, mtime_ns)` 失效的逐文件结果缓存。
+
+    参数:
+        name (str): 缓存类别，对应缓存目录下的子目录名。
+        root (str): 扫描根目录。
+        version (int): 结果格式版本，变化时旧缓存整体作废。
+        use_cache (Optional[bool]): 是否读写持久化缓存，None 时取配置 `dataset.scan.cache`（默认开启）；
+            关闭时仍可作为本次运行内的内存缓存使用。
+    """
+    def __init__(self, name: str, root: str, version: int = 1, use_cache: Optional[bool] = None):
+        self.root = os.path.abspath(root)
+        self.version = version
+        if use_cache is None:
+            use_cache = bool(scan_settings().get("cache", True))
+        self.path = cache_file(name, self.root) if use_cache else None
+        self.entries: Dict[str, list] = self._load()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+    def _load(self) -> Dict[str, list]:
+        data = load_cache(self.path, self.version, self.root)
+        return (data or {}).get("files") or {}
+
+    def _key(self, path: str) -> str:
+        try:
+            return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+        except ValueError:
+            # 与根目录不在同一盘符（多来源构建），以绝对路径为键
+            return os.path.abspath(path).replace(os.sep, "/")
+
+    def get(self, path: str, st_size: int, st_mtime_ns: int) -> Optional[list]:
+        """返回缓存的结果列表；不存在或签名不一致时返回 None（计为未命中）。"""
+        cached = self.entries.get(self._key(path))
+        if cached is not None and cached[0] == st_size and cached[1] == st_mtime_ns:
+            self.hits += 1
+            return cached[2:]
+        self.misses += 1
+        return None
+
+    def put(self, path: str, st_size: int, st_mtime_ns: int, value: List):
+        if st_mtime_ns < racy_horizon():
+            self.entries[self._key(path)] = [st_size, st_mtime_ns, *value]
+            self._dirty = True
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        if save_cache(self.path, {"version": self.version, "root": self.root, "files": self.entries}):
+            self._dirty = False
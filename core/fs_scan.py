@@ -0,0 +1,146 @@
+"""目录扫描：基于 `os.scandir` 的并行遍历与按目录 mtime 失效的持久化列表缓存。
+
+- 子目录的列举提交到线程池并行执行（网络共享盘上单次列举延迟高，并行收益明显），
+  产出顺序仍与 `os.walk` 自顶向下的先序一致，结果可复现。
+- 缓存以目录为单位记录 `(mtime_ns, 文件名列表, 子目录列表)`。目录 mtime 只在增删、重命名
+  条目时变化，未变化的目录只需一次 `stat` 即可复用上次的列举结果。
+  文件内容修改不会改变目录 mtime，调用方需要内容级变化时自行检查文件签名。
+- 与扫描时刻过近的 mtime 不写入缓存（见 `core.app_cache`）。
+- `StemIndex` 按目录记录 `主文件名 -> 文件名`，可由遍历结果直接填充，按主文件名查找同名文件
+  （如 JSON 对应的图片）时不再逐个扩展名 `stat`。
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .app_cache import scan_settings, cache_file, load_cache, save_cache, racy_horizon
+
+CACHE_VERSION = 1
+_CACHE_NAME = "scan"
+
+def _load_cache(path: Optional[str], root: str) -> Dict[str, list]:
+    data = load_cache(path, CACHE_VERSION, root)
+    return (data or {}).get("dirs") or {}
+
+def _list_dir(path: str, cached: Optional[list]) -> Tuple[Optional[int], List[str], List[str], bool]:
+    """列举单个目录，返回 `(mtime_ns, 文件名, 子目录名, 是否命中缓存)`；目录不可读时返回空列表。"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None, [], [], False
+    if cached is not None and cached[0] == mtime:
+        return mtime, cached[1], cached[2], True
+    files: List[str] = []
+    dirs: List[str] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    files.append(entry.name)
+                elif not entry.is_symlink():
+                    dirs.append(entry.name)
+    except OSError:
+        return None, [], [], False
+    return mtime, files, dirs, False
+
+def walk_files(root: str, recursive: bool = True, workers: Optional[int] = None,
+               use_cache: Optional[bool] = None, stats: Optional[Dict] = None) -> Iterator[Tuple[str, List[str]]]:
+    """
+    并行遍历目录树，逐目录产出 `(目录路径, 文件名列表)`。
+
+    参数:
+        root (str): 根目录。
+        recursive (bool): 是否递归子目录；为 False 时只列举根目录。
+        workers (Optional[int]): 列举线程数，None 时取配置 `dataset.scan.workers`（默认 8）。
+        use_cache (Optional[bool]): 是否使用持久化缓存，None 时取配置 `dataset.scan.cache`（默认开启）。
+        stats (Optional[Dict]): 传入时写入 `dirs`、`cached`、`files` 计数，便于观察缓存命中。
+
+    返回:
+        Iterator[Tuple[str, List[str]]]: 顺序与 `os.walk(root)` 一致；符号链接目录不会进入。
+            只有完整遍历结束后才更新缓存。
+    """
+    cfg = scan_settings()
+    if workers is None:
+        workers = int(cfg.get("workers", 8) or 8)
+    if use_cache is None:
+        use_cache = bool(cfg.get("cache", True))
+    key = os.path.abspath(root)
+    cache_path = cache_file(_CACHE_NAME, key) if use_cache and recursive else None
+    old = _load_cache(cache_path, key)
+    new: Dict[str, list] = {}
+    counts = stats if stats is not None else {}
+    counts.update(dirs=0, cached=0, files=0)
+    horizon = racy_horizon()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        # 栈中保存 (路径, 缓存键, 列举任务)；子目录在父目录产出前即已提交，列举与消费重叠
+        stack = [(root, ".", ex.submit(_list_dir, root, old.get(".")))]
+        try:
+            while stack:
+                path, rel, fut = stack.pop()
+                mtime, files, dirs, hit = fut.result()
+                counts["dirs"] += 1
+                counts["cached"] += int(hit)
+                counts["files"] += len(files)
+                if mtime is not None and mtime < horizon:
+                    new[rel] = [mtime, files, dirs]
+                if recursive:
+                    futs = []
+                    for d in dirs:
+                        child_rel = d if rel == "." else f"{rel}/{d}"
+                        futs.append((os.path.join(path, d), child_rel,
+                                     ex.submit(_list_dir, os.path.join(path, d), old.get(child_rel))))
+                    stack.extend(reversed(futs))
+                yield path, files
+        finally:
+            for _, _, fut in stack:
+                fut.cancel()
+    if cache_path:
+        save_cache(cache_path, {"version": CACHE_VERSION, "root": key, "dirs": new})
+
+class StemIndex:
+    """
+    目录内 `主文件名 -> 文件名` 的索引，在一次操作内共享：每个目录只列举一次，之后的查找不访问文件系统。
+    目录可由 `walk_files` 的结果填充（`add`），未填充的目录在首次查找时列举；可在多个线程中使用。
+    主文件名按 `os.path.normcase` 比较，扩展名不区分大小写；同一主文件名有多个候选时按文件名排序取第一个。
+    """
+    def __init__(self):
+        self._dirs: Dict[str, Dict[str, List[str]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(directory: str) -> str:
+        return os.path.normcase(os.path.abspath(directory))
+
+    def add(self, directory: str, files: Iterable[str]):
+        """登记一个目录的文件名列表（如 `walk_files` 产出的结果）。"""
+        stems: Dict[str, List[str]] = {}
+        for name in sorted(files):
+            stems.setdefault(os.path.normcase(os.path.splitext(name)[0]), []).append(name)
+        with self._lock:
+            self._dirs[self._key(directory)] = stems
+
+    def _stems(self, directory: str) -> Dict[str, List[str]]:
+        stems = self._dirs.get(self._key(directory))
+        if stems is None:
+            _, files, _, _ = _list_dir(directory, None)
+            self.add(directory, files)
+            stems = self._dirs[self._key(directory)]
+        return stems
+
+    def find(self, directory: str, stem: str, exts: Iterable[str]) -> Optional[str]:
+        """
+        查找目录中主文件名为 `stem`、扩展名属于 `exts`（小写，含点）的文件。
+
+        返回:
+            Optional[str]: 文件的完整路径，不存在时为 None。
+        """
+        for name in self._stems(directory).get(os.path.normcase(stem), ()):
+            if os.path.splitext(name)[1].lower() in exts:
+                return os.path.join(directory, name)
+        return None
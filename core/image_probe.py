@@ -0,0 +1,191 @@
+"""图片尺寸探测：只读取 JPEG/PNG/BMP/WebP 文件头获得真实尺寸，不解码像素。
+
+- JPEG 沿段标记跳到 SOF 段读取宽高，途经 APP1 (Exif) 时顺带读取方向标签；方向为 5~8（旋转 90°）
+  时交换宽高，与 LabelMe 打开图片时看到的尺寸一致。其余格式不考虑方向。
+- 无法识别的文件头回退到 Pillow（同样只读文件头），仍失败时返回 None。
+- `ProbeCache` 按 `(大小, mtime_ns)` 缓存每个文件的探测结果（见 `core.file_cache`），存放在应用缓存目录的
+  `probe/` 下；未变化的文件不再打开。
+- `compare_size` 把标注记录的尺寸与真实尺寸比对，区分一致、等比缩放、旋转与其他不一致。
+"""
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from .file_cache import FileCache
+
+CACHE_VERSION = 1
+# JPEG 中不是帧头的 SOFn 编号：DHT、JPG、DAC
+_NOT_SOF = {0xC4, 0xC8, 0xCC}
+# 标注尺寸与真实尺寸的宽高比相对误差在该范围内视为等比缩放（容忍缩放后取整）
+_SCALE_TOLERANCE = 0.01
+
+# compare_size 的返回值
+SIZE_OK = "ok"
+SIZE_SCALED = "scaled"
+SIZE_ROTATED = "rotated"
+SIZE_MISMATCH = "mismatch"
+
+def _exif_orientation(seg: bytes) -> int:
+    """从 APP1 段数据（含 `Exif\\0\\0` 前缀）读取方向标签，缺失或损坏时返回 1。"""
+    if len(seg) < 14 or seg[:6] != b"Exif\x00\x00":
+        return 1
+    tiff = seg[6:]
+    if tiff[:4] == b"II*\x00":
+        e = "<"
+    elif tiff[:4] == b"MM\x00*":
+        e = ">"
+    else:
+        return 1
+    ifd = struct.unpack(e + "I", tiff[4:8])[0]
+    if ifd + 2 > len(tiff):
+        return 1
+    n = struct.unpack(e + "H", tiff[ifd:ifd + 2])[0]
+    for i in range(n):
+        off = ifd + 2 + i * 12
+        if off + 12 > len(tiff):
+            break
+        tag, typ = struct.unpack(e + "HH", tiff[off:off + 4])
+        if tag == 0x0112 and typ == 3:
+            return struct.unpack(e + "H", tiff[off + 8:off + 10])[0]
+    return 1
+
+def _jpeg_size(f) -> Optional[Tuple[int, int]]:
+    orientation = 1
+    f.seek(2)
+    while True:
+        b = f.read(1)
+        if not b:
+            return None
+        if b != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            return None
+        m = marker[0]
+        # 无长度字段的独立标记：TEM、RSTn、SOI
+        if m == 0x01 or 0xD0 <= m <= 0xD8:
+            continue
+        if m == 0xD9:
+            return None
+        head = f.read(2)
+        if len(head) < 2:
+            return None
+        length = struct.unpack(">H", head)[0]
+        if length < 2:
+            return None
+        if 0xC0 <= m <= 0xCF and m not in _NOT_SOF:
+            sof = f.read(5)
+            if len(sof) < 5:
+                return None
+            h, w = struct.unpack(">HH", sof[1:5])
+            return (h, w) if orientation in (5, 6, 7, 8) else (w, h)
+        if m == 0xE1 and orientation == 1:
+            orientation = _exif_orientation(f.read(length - 2))
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+def _header_size(path: str) -> Optional[Tuple[int, int]]:
+    with open(path, "rb") as f:
+        head = f.read(32)
+        if head[:3] == b"\xff\xd8\xff":
+            return _jpeg_size(f)
+        if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:2] == b"BM" and len(head) >= 26:
+            if struct.unpack("<I", head[14:18])[0] == 12:
+                return struct.unpack("<HH", head[18:22])
+            w, h = struct.unpack("<ii", head[18:26])
+            return w, abs(h)
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            chunk = head[12:16]
+            if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+                w, h = struct.unpack("<HH", head[26:30])
+                return w & 0x3FFF, h & 0x3FFF
+            if chunk == b"VP8L" and head[20] == 0x2F:
+                bits = struct.unpack("<I", head[21:25])[0]
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8X":
+                return (int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1)
+    return None
+
+def probe_size(path: str) -> Optional[Tuple[int, int]]:
+    """
+    读取图片按 EXIF 摆正后的 `(宽, 高)`，只读文件头。
+
+    返回:
+        Optional[Tuple[int, int]]: 尺寸；文件不可读或不是图片时返回 None。
+    """
+    try:
+        size = _header_size(path)
+    except (OSError, struct.error):
+        size = None
+    if size is not None and size[0] > 0 and size[1] > 0:
+        return int(size[0]), int(size[1])
+    try:
+        from .image_resize import image_size
+        return image_size(path)
+    except Exception:
+        return None
+
+def compare_size(labeled: Sequence[int], actual: Sequence[int]) -> str:
+    """
+    比对标注记录的 `(宽, 高)` 与真实 `(宽, 高)`。
+
+    返回:
+        str: `SIZE_OK` 一致；`SIZE_SCALED` 宽高比相同（图片在标注后被等比缩放，归一化坐标仍然正确）；
+        `SIZE_ROTATED` 宽高互换（图片在标注后被旋转，框已失效）；其余为 `SIZE_MISMATCH`。
+    """
+    lw, lh = int(labeled[0]), int(labeled[1])
+    aw, ah = int(actual[0]), int(actual[1])
+    if (lw, lh) == (aw, ah):
+        return SIZE_OK
+    if lw <= 0 or lh <= 0:
+        return SIZE_MISMATCH
+
+    def same_ratio(w: int, h: int) -> bool:
+        sx, sy = w / lw, h / lh
+        return abs(sx - sy) <= _SCALE_TOLERANCE * max(sx, sy)
+
+    if same_ratio(aw, ah):
+        return SIZE_SCALED
+    if same_ratio(ah, aw):
+        return SIZE_ROTATED
+    return SIZE_MISMATCH
+
+class ProbeCache(FileCache):
+    """
+    图片尺寸缓存，可在线程池中并发调用 `size()`。
+
+    参数:
+        root (str): 扫描根目录；缓存文件按根目录区分，条目以相对路径为键。
+        use_cache (Optional[bool]): 是否读写持久化缓存，None 时取配置 `dataset.scan.cache`（默认开启）。
+    """
+    def __init__(self, root: str, use_cache: Optional[bool] = None):
+        super().__init__("probe", root, CACHE_VERSION, use_cache)
+
+    def size(self, path: str, st_size: Optional[int] = None, st_mtime_ns: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """返回图片 `(宽, 高)`；调用方已有 stat 结果时传入 `st_size`/`st_mtime_ns`，省去一次 stat。"""
+        if st_size is None or st_mtime_ns is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            st_size, st_mtime_ns = st.st_size, st.st_mtime_ns
+        cached = self.get(path, st_size, st_mtime_ns)
+        if cached is not None:
+            return cached[0], cached[1]
+        size = probe_size(path)
+        if size is not None:
+            self.put(path, st_size, st_mtime_ns, list(size))
+        return size
+
+def probe_sizes(paths: List[str], cache: Optional[ProbeCache] = None, workers: int = 8) -> List[Optional[Tuple[int, int]]]:
+    """用线程池批量探测尺寸，结果顺序与输入一致；文件头读取以 I/O 延迟为主，线程即可并行。"""
+    fn = cache.size if cache is not None else probe_size
+    if workers <= 1 or len(paths) < 2:
+        return [fn(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(fn, paths, chunksize=64))
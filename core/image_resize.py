@@ -0,0 +1,84 @@
+"""训练分辨率预缩放：构建时把大图缩放到训练用的长边尺寸，训练时数据加载器不再逐 epoch 解码、缩放原图。
+
+- 缩放规则与 ultralytics `load_image` 一致：`r = imgsz / max(h, w)`，新尺寸 `min(ceil(w * r), imgsz)`，
+  因此训练时 letterbox 不再二次缩放；长边不超过 `imgsz` 的图片保持原样（按落盘策略链接或复制）。
+- YOLO 标签是归一化坐标，缩放不需要修改标签。
+- 先按 EXIF 方向摆正再缩放并去掉方向信息，与 LabelMe 标注、训练加载时看到的像素一致。
+- 原图尺寸记录在构建清单中（`orig_size`），可用 `original_sizes` 把预测结果映射回原图。
+"""
+import os
+import math
+from typing import Dict, Optional, Tuple
+
+from .build_manifest import load_manifest
+
+JPEG_QUALITY = 95
+_JPEG_EXTS = {".jpg", ".jpeg"}
+
+def target_size(w: int, h: int, imgsz: int) -> Optional[Tuple[int, int]]:
+    """计算缩放后的 `(宽, 高)`；长边不超过 `imgsz` 时返回 None 表示无需缩放。"""
+    r = imgsz / max(w, h)
+    if r >= 1:
+        return None
+    return min(math.ceil(w * r), imgsz), min(math.ceil(h * r), imgsz)
+
+def image_size(path: str) -> Tuple[int, int]:
+    """只读文件头获取图片按 EXIF 摆正后的 `(宽, 高)`。"""
+    from PIL import Image
+
+    with Image.open(path) as im:
+        w, h = im.size
+        if im.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            w, h = h, w
+    return w, h
+
+def resize_image(src: str, dst: str, imgsz: int, quality: int = JPEG_QUALITY) -> Optional[Tuple[int, int]]:
+    """
+    把 `src` 缩放到长边 `imgsz` 后写入 `dst`（格式由扩展名决定）。
+
+    参数:
+        src (str): 原图路径。
+        dst (str): 输出路径；先写临时文件再替换，不会改写指向原图的硬链接。
+        imgsz (int): 目标长边。
+        quality (int): JPEG 质量。
+
+    返回:
+        Optional[Tuple[int, int]]: 原图（摆正后）的 `(宽, 高)`；长边不超过 `imgsz` 时不写出文件，
+        返回 None，由调用方按落盘策略处理（训练加载时同样按 EXIF 摆正）。
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as im:
+        orientation = im.getexif().get(0x0112, 1)
+        w, h = im.size
+        if orientation in (5, 6, 7, 8):
+            w, h = h, w
+        size = target_size(w, h, imgsz)
+        if size is None:
+            return None
+        # JPEG 在 DCT 阶段按 1/2、1/4、1/8 缩小解码，显著减少大图解码时间；draft 针对未摆正的原始方向
+        im.draft(im.mode, (size[1], size[0]) if orientation in (5, 6, 7, 8) else size)
+        img = ImageOps.exif_transpose(im).resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        ext = os.path.splitext(dst)[1].lower()
+        if ext in _JPEG_EXTS and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        tmp = dst + ".tmp"
+        try:
+            if ext in _JPEG_EXTS:
+                img.save(tmp, format="JPEG", quality=quality)
+            else:
+                img.save(tmp, format=im.format)
+            os.replace(tmp, dst)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    return w, h
+
+def original_sizes(root: str) -> Dict[str, Tuple[int, int]]:
+    """从构建清单读取 `{输出图片相对路径: (原图宽, 原图高)}`，只包含经过预缩放的图片。"""
+    out = {}
+    for entry in load_manifest(root).get("items", {}).values():
+        if entry.get("orig_size"):
+            out[entry["image"]] = tuple(entry["orig_size"])
+    return out
@@ -0,0 +1,127 @@
+"""标注 JSON 解析层：可插拔的快速解析后端与跳过 `imageData` 的惰性模式。
+
+- 后端按优先级自动选择：`orjson` > `simdjson`（pysimdjson）> 标准库 `json`，均为可选依赖。
+  两个加速后端的浮点解析都是正确舍入的，与标准库结果逐位一致。
+- 惰性模式（`lazy=True`）在解析前直接在字节层把 `"imageData": "<base64>"` 替换为 `null`，
+  只读取 `shapes`、`imageWidth`、`imageHeight` 等字段时可跳过数 MB 的 base64 解码。
+  首个 `imageData` 键若属于嵌套对象（解析后顶层 `imageData` 不为 null），退回完整解析，结果与完整模式一致；
+  仅当嵌套的同名字符串键出现在值为 null 的顶层 `imageData` 之前时，该嵌套值会被替换为 null。
+  需要回写文件的场景（删除、替换标签）必须使用完整模式。
+"""
+import json
+from typing import Callable, Dict, List, Tuple
+
+_IMAGE_DATA_KEY = b'"imageData"'
+_WS = b" \t\r\n"
+
+def _orjson_loads() -> Callable:
+    import orjson  # type: ignore
+    return orjson.loads
+
+def _simdjson_loads() -> Callable:
+    import simdjson  # type: ignore
+    return simdjson.loads
+
+def _std_loads() -> Callable:
+    return json.loads
+
+_CANDIDATES: List[Tuple[str, Callable[[], Callable]]] = [
+    ("orjson", _orjson_loads),
+    ("simdjson", _simdjson_loads),
+    ("json", _std_loads),
+]
+
+_backend_name = "json"
+_loads: Callable = json.loads
+
+def available_backends() -> List[str]:
+    """返回当前环境可用的后端名称。"""
+    names = []
+    for name, factory in _CANDIDATES:
+        try:
+            factory()
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+def set_backend(name: str = "auto") -> str:
+    """
+    选择解析后端。
+
+    参数:
+        name (str): `auto`、`orjson`、`simdjson` 或 `json`；`auto` 取第一个可用的后端。
+
+    返回:
+        str: 实际生效的后端名称。
+    """
+    global _backend_name, _loads
+    for cand, factory in _CANDIDATES:
+        if name not in ("auto", cand):
+            continue
+        try:
+            _loads = factory()
+            _backend_name = cand
+            return cand
+        except ImportError:
+            if name != "auto":
+                raise
+    raise ValueError(f"unknown json backend: {name}")
+
+def backend_name() -> str:
+    return _backend_name
+
+def _skip_ws(raw: bytes, i: int, step: int) -> int:
+    while 0 <= i < len(raw) and raw[i] in _WS:
+        i += step
+    return i
+
+def strip_image_data(raw: bytes) -> bytes:
+    """
+    在字节层把首个作为对象键出现的 `imageData` 字符串值替换为 `null`，不做任何解码。
+
+    只在能确认安全时改写：键前为 `{` 或 `,`、值为不含反斜杠的普通字符串（base64 不会出现转义）；
+    其它情况原样返回，由完整解析兜底。
+    """
+    start = 0
+    while True:
+        i = raw.find(_IMAGE_DATA_KEY, start)
+        if i < 0:
+            return raw
+        start = i + len(_IMAGE_DATA_KEY)
+        before = _skip_ws(raw, i - 1, -1)
+        if before < 0 or raw[before] not in b"{,":
+            continue
+        j = _skip_ws(raw, start, 1)
+        if j >= len(raw) or raw[j] != ord(":"):
+            continue
+        j = _skip_ws(raw, j + 1, 1)
+        if j >= len(raw) or raw[j] != ord('"'):
+            return raw
+        k = raw.find(b'"', j + 1)
+        if k < 0 or raw.find(b"\\", j + 1, k) >= 0:
+            return raw
+        return raw[:j] + b"null" + raw[k + 1:]
+
+def loads(raw: bytes, lazy: bool = False):
+    """解析 JSON 字节串；`lazy=True` 时跳过 `imageData`。"""
+    if not lazy:
+        return _loads(raw)
+    stripped = strip_image_data(raw)
+    if stripped is not raw:
+        data = _loads(stripped)
+        if isinstance(data, dict) and data.get("imageData", "") is None:
+            return data
+        # 被替换的是嵌套对象中的同名键（顶层 imageData 仍为字符串或不存在）：退回完整解析
+    data = _loads(raw)
+    if isinstance(data, dict) and "imageData" in data:
+        data["imageData"] = None
+    return data
+
+def load_file(path: str, lazy: bool = False) -> Dict:
+    """以二进制读取并解析 JSON 文件；`lazy=True` 时结果中的 `imageData` 为 `None`。"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return loads(raw, lazy)
+
+set_backend("auto")
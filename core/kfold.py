@@ -0,0 +1,94 @@
+"""K 折交叉验证布局：图片只落盘一次，各折只是轻量的图片列表文件。
+
+- 构建时 train+val 样本统一落盘到 `images/train`（共享池），每个样本带折编号；test 样本照常放在 `images/test`。
+- 第 i 折的训练/验证列表写入数据集根目录的 `fold_<i>_train.txt`/`fold_<i>_val.txt`，每行为 `./images/...`
+  形式的相对路径（ultralytics 按列表文件所在目录解析，同步到 WSL 后依然有效）。
+- 每折的 `folds/fold_<i>/dataset_config.yaml` 可直接作为 `start.py --dataset` 的目录；
+  `run_folds.sh` 在 WSL 中依次调用 `start.py` 训练各折。
+"""
+import os
+import glob
+import shutil
+import yaml
+from typing import Dict, List
+
+KFOLD_DIR = "folds"
+DRIVER_NAME = "run_folds.sh"
+DATASET_YAML = "dataset_config.yaml"
+
+_DRIVER = """#!/usr/bin/env bash
+# K 折训练驱动：依次用 start.py 训练每一折（由数据集构建生成）
+# 用法: bash run_folds.sh <python> <start.py> [导出目录]
+set -e
+ROOT="$(cd "$(dirname "${{BASH_SOURCE[0]}}")" && pwd)"
+PY="$1"
+START="$2"
+EXPORT="${{3:-}}"
+cd "$(dirname "$START")"
+for i in $(seq 0 {last}); do
+  echo "===== fold $i / {k} ====="
+  if [ -n "$EXPORT" ]; then
+    "$PY" "$START" --dataset "$ROOT/{folds}/fold_$i" --export_path "$EXPORT/fold_$i"
+  else
+    "$PY" "$START" --dataset "$ROOT/{folds}/fold_$i"
+  fi
+done
+"""
+
+def list_name(fold: int, part: str) -> str:
+    return f"fold_{fold}_{part}.txt"
+
+def fold_yaml(path: str, fold: int, names: List[str]) -> Dict:
+    """第 `fold` 折的数据集配置；`path` 为数据集根目录（WSL 路径）。"""
+    return {
+        "path": path,
+        "train": list_name(fold, "train"),
+        "val": list_name(fold, "val"),
+        "test": "images/test",
+        "names": names,
+    }
+
+def _write_list(path: str, images: List[str]):
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.writelines(f"./{p}\n" for p in images)
+
+def write_folds(root: str, members: List[List[str]], names: List[str], path: str) -> List[str]:
+    """
+    写出 k 折列表文件、各折配置与训练驱动。
+
+    参数:
+        root (str): 数据集根目录。
+        members (List[List[str]]): 每折的验证图片相对路径（如 `images/train/a.jpg`）；其余各折之和为该折的训练集。
+        names (List[str]): 类别名称。
+        path (str): 写入配置的数据集根目录（WSL 路径）。
+
+    返回:
+        List[str]: 各折 `dataset_config.yaml` 的路径。
+    """
+    remove_folds(root)
+    k = len(members)
+    out = []
+    for i in range(k):
+        _write_list(os.path.join(root, list_name(i, "val")), members[i])
+        _write_list(os.path.join(root, list_name(i, "train")), [p for j in range(k) if j != i for p in members[j]])
+        d = os.path.join(root, KFOLD_DIR, f"fold_{i}")
+        os.makedirs(d, exist_ok=True)
+        yaml_path = os.path.join(d, DATASET_YAML)
+        with open(yaml_path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(fold_yaml(path, i, names), f, allow_unicode=True, sort_keys=False)
+        out.append(yaml_path)
+    with open(os.path.join(root, DRIVER_NAME), "w", encoding="utf-8", newline="\n") as f:
+        f.write(_DRIVER.format(last=k - 1, k=k, folds=KFOLD_DIR))
+    return out
+
+def remove_folds(root: str):
+    """删除 k 折布局（列表文件、各折配置与驱动），切回普通构建时调用。"""
+    shutil.rmtree(os.path.join(root, KFOLD_DIR), ignore_errors=True)
+    for p in glob.glob(os.path.join(glob.escape(root), "fold_*_*.txt")) + [os.path.join(root, DRIVER_NAME)]:
+        try:
+            os.remove(p)
+        except FileNotFoundError:
+            pass
+
+def has_folds(root: str) -> bool:
+    return os.path.exists(os.path.join(root, DRIVER_NAME))
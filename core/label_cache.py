@@ -0,0 +1,140 @@
+"""合并标签缓存：把整个数据集的标签与图片尺寸写入单个可内存映射的文件。
+
+训练启动或工具需要读取全部标签时，一次打开该文件即可，无需逐个打开上万个小 `.txt`
+（WSL 的 `/mnt/<盘符>` 挂载上打开小文件的开销很大）。逐文件的 `.txt` 标签仍照常写出以保持兼容。
+
+文件布局（小端）：
+- 8 字节魔数 `YOLOLBL1`，8 字节无符号整数表示头部长度；
+- UTF-8 JSON 头部：`version`、`names`、`images`（输出图片相对路径，与数组下标一一对应）以及各数组的
+  `dtype`/`shape`/`offset`；
+- 数组按 64 字节对齐依次存放：
+  `shapes` (M, 2) int32 为图片 `(高, 宽)`；`offsets` (M + 1,) int64 为每张图片的标签在下面两个数组中的区间；
+  `cls` (N,) int32 类别编号；`boxes` (N, 4) float32 归一化的 `x_center, y_center, width, height`。
+"""
+import os
+import json
+import struct
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LABEL_CACHE_NAME = "label_cache.bin"
+LABEL_CACHE_VERSION = 1
+_MAGIC = b"YOLOLBL1"
+_ALIGN = 64
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+def parse_yolo_text(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """把 YOLO 标签文本解析为 `(cls, boxes)`，用于缓存中缺失的条目。"""
+    vals = np.asarray(text.split(), dtype=np.float64).reshape(-1, 5)
+    return vals[:, 0].astype(np.int32), vals[:, 1:].astype(np.float32)
+
+def write_label_cache(root: str, names: List[str], images: List[str], shapes: Sequence[Sequence[int]],
+                      labels: Sequence[Tuple[np.ndarray, np.ndarray]]) -> str:
+    """
+    写出合并标签缓存（先写临时文件再原子替换）。
+
+    参数:
+        root (str): 数据集根目录。
+        names (List[str]): 类别名称。
+        images (List[str]): 输出图片相对路径。
+        shapes (Sequence[Sequence[int]]): 每张图片的 `(高, 宽)`。
+        labels (Sequence[Tuple[np.ndarray, np.ndarray]]): 每张图片的 `(cls, boxes)`。
+
+    返回:
+        str: 缓存文件路径。
+    """
+    counts = np.fromiter((len(c) for c, _ in labels), dtype=np.int64, count=len(labels))
+    offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    arrays = {
+        "shapes": np.asarray(shapes, dtype=np.int32).reshape(-1, 2),
+        "offsets": offsets,
+        "cls": np.concatenate([np.asarray(c, dtype=np.int32) for c, _ in labels]) if labels else np.zeros(0, np.int32),
+        "boxes": (np.concatenate([np.asarray(b, dtype=np.float32).reshape(-1, 4) for _, b in labels])
+                  if labels else np.zeros((0, 4), np.float32)),
+    }
+    meta: Dict[str, Dict] = {}
+    header = {"version": LABEL_CACHE_VERSION, "names": names, "images": images, "arrays": meta}
+    # 头部长度依赖各数组偏移，先用占位偏移估算，再按实际头部长度重新布局直到稳定
+    base = 0
+    while True:
+        pos = base
+        for k, a in arrays.items():
+            pos = _align(pos)
+            meta[k] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": pos}
+            pos += a.nbytes
+        raw = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        need = _align(len(_MAGIC) + 8 + len(raw))
+        if need <= base:
+            break
+        base = need
+    path = os.path.join(root, LABEL_CACHE_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_MAGIC + struct.pack("<Q", len(raw)) + raw)
+        for k, a in arrays.items():
+            f.write(b"\0" * (meta[k]["offset"] - f.tell()))
+            f.write(np.ascontiguousarray(a).tobytes())
+    os.replace(tmp, path)
+    return path
+
+class LabelCache:
+    """只读打开合并标签缓存，数组为内存映射视图；用完调用 `close()` 释放文件。"""
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"not a label cache: {path}")
+            (n,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(n).decode("utf-8"))
+        if header.get("version") != LABEL_CACHE_VERSION:
+            raise ValueError(f"unsupported label cache version: {header.get('version')}")
+        self.path = path
+        self.names: List[str] = header["names"]
+        self.images: List[str] = header["images"]
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        views = {}
+        for k, m in header["arrays"].items():
+            dt = np.dtype(m["dtype"])
+            count = int(np.prod(m["shape"])) if m["shape"] else 1
+            views[k] = self._mm[m["offset"]:m["offset"] + count * dt.itemsize].view(dt).reshape(m["shape"])
+        self.shapes = views["shapes"]
+        self.offsets = views["offsets"]
+        self.cls = views["cls"]
+        self.boxes = views["boxes"]
+        self._index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def open(cls, root: str) -> Optional["LabelCache"]:
+        """打开数据集根目录下的缓存；不存在或格式不符时返回 None。"""
+        path = os.path.join(root, LABEL_CACHE_NAME)
+        try:
+            return cls(path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+    def labels(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """第 `i` 张图片的 `(cls, boxes)`（内存映射视图）。"""
+        a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.cls[a:b], self.boxes[a:b]
+
+    def find(self, image: str) -> Optional[int]:
+        """按输出图片相对路径查找下标。"""
+        if self._index is None:
+            self._index = {p: i for i, p in enumerate(self.images)}
+        return self._index.get(image)
+
+    def close(self):
+        """释放内存映射；Windows 下替换缓存文件前必须先关闭。"""
+        mm = getattr(self._mm, "_mmap", None)
+        self.shapes = self.offsets = self.cls = self.boxes = None  # type: ignore[assignment]
+        self._mm = None  # type: ignore[assignment]
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                pass
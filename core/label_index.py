@@ -0,0 +1,181 @@
+"""标签倒排索引：`标签 -> 文件` 的持久化 SQLite 索引，查询某个标签出现在哪些文件中无需逐个解析 JSON。
+
+- 每个源目录一个数据库，存放在应用缓存目录的 `label_index/` 下（与扫描缓存相同的按根目录定位方式）；
+  缓存目录不可用或关闭缓存（`dataset.scan.cache: false`）时使用内存数据库，仅在本次运行内有效。
+- `files` 表记录每个 JSON 的 `(大小, mtime_ns)`、形状数量与是否为空白标注；`labels` 表记录
+  `(标签, 文件, 该标签的形状数)`，以标签为主键前缀，按标签查询只读取相关行。
+- `refresh` 按文件签名增量更新：只解析新增或变化的文件（线程池并行，跳过 imageData 的解码），
+  已消失的文件从索引删除，全部写入在一个事务中完成。与当前时刻过近的修改时间不作为有效签名，
+  下次刷新时重新解析（同一时间粒度内的后续修改无法被察觉）。
+"""
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .json_backend import load_file
+from .app_cache import scan_settings, cache_file, racy_horizon
+
+SCHEMA_VERSION = 1
+# 未读取成功的文件的形状数
+_UNREADABLE = -1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, shapes INTEGER, blank INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS labels (
+    label TEXT, path TEXT, count INTEGER, PRIMARY KEY (label, path)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS labels_by_path ON labels (path);
+"""
+
+def _parse(path: str) -> Tuple[int, bool, Dict[str, int]]:
+    """线程池任务：返回 `(形状数, 是否空白标注, {标签: 形状数})`；读取失败时形状数为 -1。"""
+    try:
+        data = load_file(path, lazy=True)
+    except Exception:
+        return _UNREADABLE, True, {}
+    if not isinstance(data, dict):
+        return _UNREADABLE, True, {}
+    shapes = data.get("shapes")
+    # 与 LabelProcessor.export_blank_images 的判断一致：没有 shapes 字段或为空即为空白
+    blank = not data or "shapes" not in data or not shapes
+    counts: Dict[str, int] = {}
+    if not isinstance(shapes, list):
+        return 0, blank, counts
+    for s in shapes:
+        label = s.get("label", "") if isinstance(s, dict) else ""
+        if not isinstance(label, str):
+            label = str(label)
+        counts[label] = counts.get(label, 0) + 1
+    return len(shapes), blank, counts
+
+class LabelIndex:
+    """
+    源目录的标签倒排索引；查询前调用 `refresh` 与磁盘同步。连接只在创建它的线程中使用。
+
+    参数:
+        root (str): 源目录。
+        use_cache (Optional[bool]): 是否持久化到缓存目录，None 时取配置 `dataset.scan.cache`（默认开启）。
+        db_path (Optional[str]): 指定数据库文件，主要用于测试。
+    """
+    def __init__(self, root: str, use_cache: Optional[bool] = None, db_path: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        if use_cache is None:
+            use_cache = bool(scan_settings().get("cache", True))
+        self.path = db_path or (cache_file("label_index", self.root, ".sqlite") if use_cache else None)
+        self.conn = self._connect()
+        self.parsed = 0
+        self.reused = 0
+        self.removed = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            conn = sqlite3.connect(self.path or ":memory:")
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != str(SCHEMA_VERSION) or self._stored_root(conn) != self.root:
+                conn.executescript("DELETE FROM files; DELETE FROM labels; DELETE FROM meta;")
+                conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                                 [("version", str(SCHEMA_VERSION)), ("root", self.root)])
+                conn.commit()
+            return conn
+        except sqlite3.DatabaseError:
+            # 数据库损坏时丢弃重建
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+                return self._connect()
+            raise
+
+    @staticmethod
+    def _stored_root(conn: sqlite3.Connection) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def key(self, path: str) -> str:
+        """文件在索引中的键（相对源目录的路径）；查询结果均为键的集合。"""
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def refresh(self, json_files: List[str], recursive: bool = True, workers: int = 8):
+        """
+        与磁盘同步：解析新增或变化的文件，删除已不存在的文件。
+
+        参数:
+            json_files (List[str]): 本次遍历得到的全部 JSON 文件。
+            recursive (bool): 遍历是否包含子目录；为 False 时只清理根目录下已消失的文件。
+            workers (int): 解析线程数。
+        """
+        known = {k: (size, mtime) for k, size, mtime in self.conn.execute("SELECT path, size, mtime_ns FROM files")}
+        keys = []
+        todo: List[Tuple[str, str, int, int]] = []
+        for p in json_files:
+            key = self.key(p)
+            keys.append(key)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            if known.get(key) != (st.st_size, st.st_mtime_ns):
+                todo.append((key, p, st.st_size, st.st_mtime_ns))
+        seen = set(keys)
+        gone = [k for k in known if k not in seen and (recursive or "/" not in k)]
+        racy = racy_horizon()
+        if workers > 1 and len(todo) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                parsed = list(ex.map(_parse, [t[1] for t in todo], chunksize=32))
+        else:
+            parsed = [_parse(t[1]) for t in todo]
+        with self.conn:
+            self._delete(gone + [t[0] for t in todo if t[0] in known])
+            self.conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+                                  [(key, size, mtime if mtime < racy else -1, n, int(blank))
+                                   for (key, _, size, mtime), (n, blank, _) in zip(todo, parsed)])
+            self.conn.executemany("INSERT INTO labels VALUES (?, ?, ?)",
+                                  [(label, key, c) for (key, _, _, _), (_, _, counts) in zip(todo, parsed)
+                                   for label, c in counts.items()])
+        self.parsed = len(todo)
+        self.reused = len(keys) - len(todo)
+        self.removed = len(gone)
+
+    def _delete(self, keys: List[str]):
+        self.conn.executemany("DELETE FROM labels WHERE path = ?", [(k,) for k in keys])
+        self.conn.executemany("DELETE FROM files WHERE path = ?", [(k,) for k in keys])
+
+    def files_with(self, labels: Iterable[str]) -> Set[str]:
+        """包含任一标签的文件。"""
+        labels = list(dict.fromkeys(labels))
+        if not labels:
+            return set()
+        marks = ",".join("?" * len(labels))
+        rows = self.conn.execute(f"SELECT DISTINCT path FROM labels WHERE label IN ({marks})", labels)
+        return {k for k, in rows}
+
+    def unreadable_files(self) -> Set[str]:
+        """解析失败的文件；这些文件需要由调用方实际读取以报告错误。"""
+        rows = self.conn.execute("SELECT path FROM files WHERE shapes = ?", (_UNREADABLE,))
+        return {k for k, in rows}
+
+    def blank_files(self) -> Set[str]:
+        """空白标注（无 shapes 或 shapes 为空，以及无法解析）的文件。"""
+        rows = self.conn.execute("SELECT path FROM files WHERE blank = 1")
+        return {k for k, in rows}
+
+    def label_counts(self) -> Dict[str, Tuple[int, int]]:
+        """`{标签: (文件数, 形状数)}`，按形状数从多到少排列。"""
+        rows = self.conn.execute("SELECT label, COUNT(*), SUM(count) FROM labels GROUP BY label "
+                                 "ORDER BY SUM(count) DESC, label")
+        return {label: (int(files), int(shapes)) for label, files, shapes in rows}
+
+    def file_count(self) -> int:
+        return int(self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0])
@@ -0,0 +1,59 @@
+"""标签字节预筛：解析 JSON 之前先在原始字节中查找目标标签，不可能包含目标标签的文件直接跳过。
+
+- 每个标签生成其 JSON 字符串字面量（含两侧引号）的各种写法作为查找串：`ensure_ascii=False` 的 UTF-8 原文，
+  `ensure_ascii=True` 的 `\\uXXXX` 转义（非 BMP 字符为代理对），十六进制小写与大写两种；
+  `"`、`\\` 与控制字符按 JSON 的转义规则写出，含 `/` 的标签另加 `\\/` 的写法。
+- 任一查找串出现即视为可能匹配（可能误报，例如标签名出现在其他字段中，交给后续解析判断）；
+  都不出现的文件不可能含有该标签值，跳过解析。只对同一字符串中混用转义与原文的非常规写法不作保证。
+- 小文件一次读入后查找，大文件（通常带 imageData）用 mmap 查找，不复制文件内容。
+- 读取失败或空文件视为可能匹配，由后续解析照常报告错误；格式损坏但不含查找串的文件会被跳过而不再报告，
+  错误文件的统计因此与不预筛时不同，所以预筛需要显式开启（配置 `dataset.label_processor.prefilter`，
+  默认关闭；标签处理页可勾选）。
+"""
+import os
+import re
+import json
+import mmap
+from typing import Iterable, List
+
+# 超过该大小的文件用 mmap 查找
+_MMAP_MIN = 1 << 20
+_HEX_ESCAPE = re.compile(r"\\u([0-9a-f]{4})")
+
+def label_needles(label: str) -> List[bytes]:
+    """标签在 JSON 中可能的字面量写法（含引号），去重后按长度排列。"""
+    raw = json.dumps(label, ensure_ascii=False)
+    ascii_ = json.dumps(label, ensure_ascii=True)
+    forms = {raw, ascii_, _HEX_ESCAPE.sub(lambda m: "\\u" + m.group(1).upper(), ascii_)}
+    if "/" in label:
+        forms |= {f.replace("/", "\\/") for f in forms}
+    return sorted({f.encode("utf-8") for f in forms}, key=len)
+
+class LabelPrefilter:
+    """
+    按字节判断文件是否可能包含任一目标标签，可在多个线程中同时调用。
+
+    参数:
+        labels (Iterable[str]): 目标标签。空标签（缺失 label 的形状按空字符串比较）无法按字节判断，此时不做预筛。
+    """
+    def __init__(self, labels: Iterable[str]):
+        labels = list(dict.fromkeys(labels))
+        self.enabled = bool(labels) and all(isinstance(l, str) and l for l in labels)
+        self.needles = tuple(n for l in labels for n in label_needles(l)) if self.enabled else ()
+
+    def __call__(self, path: str) -> bool:
+        """文件可能包含目标标签时返回 True。"""
+        if not self.enabled:
+            return True
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return True
+                if size < _MMAP_MIN:
+                    data = f.read()
+                    return any(n in data for n in self.needles)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return any(mm.find(n) >= 0 for n in self.needles)
+        except (OSError, ValueError):
+            return True
@@ -6,6 +6,16 @@
 - 标签删除：删除指定标签，若JSON文件无其他标签则删除文件
 - 标签导出：导出包含指定标签的JSON文件和对应图片
 - 标签替换：将指定标签名称替换为新名称
+- 尺寸核对：比对JSON记录的图片尺寸与图片真实尺寸，可自动修正等比缩放过的图片
+- 组合处理：按顺序执行多个操作（删除、替换、筛选、导出），每个文件只读取与写回一次
+
+删除、替换、导出与空白图导出支持线程池并行（`workers` > 1）：逐文件的读取、修改与复制在工作线程中完成，
+日志与统计由主线程按文件顺序汇总，结果与串行执行完全一致。
+
+启用标签索引（`use_index`，见 `core.label_index`）时，删除、替换、导出与组合处理只读取包含目标标签的文件，
+空白图导出直接从索引判断标注是否为空；索引按文件签名增量更新，只有新增或变化的文件需要重新解析。
+启用字节预筛（`prefilter`，默认关闭，见 `core.label_prefilter`）时，逐文件处理前先在原始字节中查找目标标签，找不到的文件不再解析；
+这类文件即使格式损坏也不再计入错误文件，因此错误统计与关闭预筛时可能不同。
 
 作者：数据集处理工具
 版本：1.0
@@ -15,8 +25,73 @@ import os
 import json
 import shutil
 from typing import Optional, Callable, List, Dict
-from pathlib import Path
 import time
+from concurrent.futures import ThreadPoolExecutor
+from .json_backend import load_file
+from .fs_scan import walk_files, StemIndex
+from .pipeline import ordered_map
+from .label_index import LabelIndex
+from .label_prefilter import LabelPrefilter
+from .image_probe import ProbeCache, probe_sizes, compare_size, SIZE_OK, SIZE_SCALED
+
+class _FileResult:
+    """单个文件在工作线程中的处理结果，由主线程按文件顺序汇总到统计信息"""
+    __slots__ = ("logs", "errors", "modified", "deleted", "exported", "deferred", "value")
+
+    def __init__(self):
+        self.logs: List[str] = []
+        self.errors: List[tuple] = []
+        self.modified: List[str] = []
+        self.deleted: List[str] = []
+        self.exported: list = []
+        self.deferred: List[tuple] = []
+        self.value = None
+
+# 组合处理支持的操作
+PIPELINE_OPS = ("delete", "replace", "filter", "export")
+
+def parse_operations(text: str, output_dir: str = "") -> List[Dict]:
+    """
+    解析组合处理的操作描述，操作之间用分号分隔，按书写顺序执行
+    
+    例如 `delete a,b; replace 划痕=scratch; filter scratch; export`：
+    - `delete 标签1,标签2`：删除标签
+    - `replace 原标签=新标签`：替换标签名称
+    - `filter 标签1,标签2`：不包含其中任一标签的文件不再执行后续操作
+    - `export [输出目录]`：导出当前状态的JSON及对应图片，省略目录时使用 `output_dir`
+    
+    Args:
+        text: 操作描述
+        output_dir: export 未指定目录时的输出目录
+        
+    Returns:
+        `run_pipeline` 使用的操作列表
+    """
+    operations = []
+    for part in text.split(';'):
+        part = part.strip()
+        if not part:
+            continue
+        kind, _, arg = part.partition(' ')
+        kind, arg = kind.strip().lower(), arg.strip()
+        if kind in ('delete', 'filter'):
+            labels = [t.strip() for t in arg.split(',') if t.strip()]
+            if not labels:
+                raise ValueError(f"{kind} 需要至少一个标签: {part}")
+            operations.append({'op': kind, 'labels': labels})
+        elif kind == 'replace':
+            old, sep, new = arg.partition('=')
+            if not sep or not old.strip() or not new.strip():
+                raise ValueError(f"replace 的格式应为 原标签=新标签: {part}")
+            operations.append({'op': 'replace', 'old': old.strip(), 'new': new.strip()})
+        elif kind == 'export':
+            target = arg or output_dir
+            if not target:
+                raise ValueError(f"export 需要输出目录: {part}")
+            operations.append({'op': 'export', 'output_dir': target})
+        else:
+            raise ValueError(f"未知操作: {kind}")
+    return operations
 
 class LabelProcessor:
     """标签处理主类"""
@@ -29,7 +104,10 @@ class LabelProcessor:
                  backup_enabled: bool = False,
                  backup_dir: str = "",
                  progress_callback: Optional[Callable] = None,
-                 log_callback: Optional[Callable] = None):
+                 log_callback: Optional[Callable] = None,
+                 workers: int = 1,
+                 use_index: bool = False,
+                 prefilter: bool = False):
         """
         初始化标签处理器
         
@@ -40,6 +118,9 @@ class LabelProcessor:
             backup_dir: 备份目录路径
             progress_callback: 进度回调函数
             log_callback: 日志回调函数
+            workers: 并行线程数，1为串行
+            use_index: 是否使用持久化的标签索引跳过不包含目标标签的文件
+            prefilter: 是否在解析前按字节预筛，跳过不可能包含目标标签的文件
         """
         self.source_dir = source_dir
         self.recursive = recursive
@@ -47,6 +128,11 @@ class LabelProcessor:
         self.backup_dir = backup_dir
         self.progress_callback = progress_callback
         self.log_callback = log_callback
+        self.workers = max(1, int(workers or 1))
+        self.use_index = use_index
+        self.prefilter = prefilter
+        # 目录列举结果，由每次操作开始时的遍历填充，供查找同名图片与JSON
+        self.stem_index = StemIndex()
         
         # 统计信息
         self.total_files = 0
@@ -70,6 +156,43 @@ class LabelProcessor:
         if self.progress_callback:
             self.progress_callback(progress)
     
+    def _merge(self, res: _FileResult):
+        """在主线程中汇总一个文件的处理结果"""
+        for message in res.logs:
+            self.log(message)
+        self.error_files.extend(res.errors)
+        self.modified_files.extend(res.modified)
+        self.deleted_files.extend(res.deleted)
+        self.exported_files.extend(res.exported)
+    
+    def _map_files(self, fn: Callable, items: List):
+        """
+        逐个处理文件，按输入顺序产出 `(item, 结果)` 并汇总统计
+        
+        workers > 1 时 fn 在线程池中执行（fn 只写入自己的结果对象，不修改共享状态），
+        否则在当前线程串行执行；两种方式的日志与统计顺序相同。
+        """
+        ex = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        try:
+            for item, res in ordered_map(fn, items, ex, self.workers * 4):
+                self._merge(res)
+                yield item, res
+        finally:
+            if ex is not None:
+                ex.shutdown(cancel_futures=True)
+    
+    @staticmethod
+    def _last_writers(copies: List[List[tuple]]) -> set:
+        """
+        同名文件复制到同一输出目录时，串行执行的结果是后写入的覆盖先写入的；
+        返回每个目标路径最后一次复制的 `(文件下标, 复制下标)`，其余复制可以跳过
+        """
+        last = {}
+        for i, ops in enumerate(copies):
+            for j, (_, dst) in enumerate(ops):
+                last[os.path.normcase(dst)] = (i, j)
+        return set(last.values())
+    
     def get_json_files(self) -> List[str]:
         """
         获取所有JSON标注文件
@@ -78,26 +201,87 @@ class LabelProcessor:
             JSON文件路径列表
         """
         json_files = []
+        self.stem_index = StemIndex()
         
         try:
-            if self.recursive:
-                # 递归遍历
-                for root, dirs, files in os.walk(self.source_dir):
-                    for file in files:
-                        if file.lower().endswith('.json'):
-                            json_files.append(os.path.join(root, file))
-            else:
-                # 只遍历当前目录
-                for file in os.listdir(self.source_dir):
+            # 并行遍历（recursive=False 时只列举当前目录），未变化的目录直接复用扫描缓存
+            for root, files in walk_files(self.source_dir, recursive=self.recursive):
+                self.stem_index.add(root, files)
+                for file in files:
                     if file.lower().endswith('.json'):
-                        file_path = os.path.join(self.source_dir, file)
-                        if os.path.isfile(file_path):
-                            json_files.append(file_path)
+                        json_files.append(os.path.join(root, file))
         except Exception as e:
             self.log(f"遍历目录时出错: {e}")
         
         return json_files
     
+    def open_index(self, json_files: List[str]) -> LabelIndex:
+        """
+        打开源目录的标签索引并与本次遍历到的JSON文件同步
+        
+        Args:
+            json_files: `get_json_files` 的结果
+            
+        Returns:
+            已刷新的标签索引，用完后需调用 `close`
+        """
+        index = LabelIndex(self.source_dir)
+        index.refresh(json_files, recursive=self.recursive, workers=self.workers)
+        self.log(f"标签索引: 解析 {index.parsed} 个文件，复用 {index.reused} 个，移除 {index.removed} 个")
+        return index
+    
+    def _candidates(self, json_files: List[str], labels: List[str]) -> List[str]:
+        """
+        按标签索引筛选可能包含任一标签的JSON文件（保持原顺序）；未启用索引时原样返回
+        
+        索引中解析失败的文件同样保留，由后续处理照常读取并记录错误
+        """
+        if not self.use_index:
+            return json_files
+        with self.open_index(json_files) as index:
+            keep = index.files_with(labels) | index.unreadable_files()
+            out = [p for p in json_files if index.key(p) in keep]
+        self.log(f"其中 {len(out)} 个文件包含目标标签")
+        return out
+    
+    def _may_match(self, labels: Optional[List[str]]) -> Optional[LabelPrefilter]:
+        """目标标签的字节预筛；未启用预筛或无法预筛时返回 None"""
+        if not self.prefilter or labels is None:
+            return None
+        may_match = LabelPrefilter(labels)
+        if not may_match.enabled:
+            return None
+        self.log("已启用字节预筛：不含目标标签的文件不再解析，其中格式损坏的文件不计入错误文件")
+        return may_match
+    
+    def label_counts(self) -> Dict[str, tuple]:
+        """
+        统计各标签出现的文件数与形状数（基于标签索引，未变化的文件不再解析）
+        
+        Returns:
+            `{标签: (文件数, 形状数)}`，按形状数从多到少排列
+        """
+        try:
+            self.log("开始标签统计...")
+            json_files = self.get_json_files()
+            self.total_files = len(json_files)
+            if self.total_files == 0:
+                self.log("未找到任何JSON文件")
+                return {}
+            self.log(f"找到 {self.total_files} 个JSON文件")
+            with self.open_index(json_files) as index:
+                counts = index.label_counts()
+                unreadable = len(index.unreadable_files())
+            for label, (files, shapes) in counts.items():
+                self.log(f"  {label}: {shapes} 个标注，{files} 个文件")
+            if unreadable:
+                self.log(f"无法读取的文件: {unreadable} 个")
+            self.update_progress(1.0)
+            return counts
+        except Exception as e:
+            self.log(f"标签统计过程中出现错误: {e}")
+            return {}
+    
     def find_image_file(self, json_path: str) -> Optional[str]:
         """
         根据JSON文件路径查找对应的图片文件
@@ -112,13 +296,8 @@ class LabelProcessor:
         json_dir = os.path.dirname(json_path)
         json_name = os.path.splitext(os.path.basename(json_path))[0]
         
-        # 在同一目录下查找同名的图片文件
-        for ext in self.IMAGE_FORMATS:
-            image_path = os.path.join(json_dir, json_name + ext)
-            if os.path.exists(image_path):
-                return image_path
-        
-        return None
+        # 在同一目录的列举结果中查找同名的图片文件（遍历过的目录不再访问文件系统）
+        return self.stem_index.find(json_dir, json_name, self.IMAGE_FORMATS)
     
     def backup_file(self, file_path: str) -> bool:
         """
@@ -130,6 +309,12 @@ class LabelProcessor:
         Returns:
             备份是否成功
         """
+        res = _FileResult()
+        ok = self._backup(file_path, res)
+        self._merge(res)
+        return ok
+    
+    def _backup(self, file_path: str, res: _FileResult) -> bool:
         if not self.backup_enabled or not self.backup_dir:
             return True
         
@@ -149,25 +334,31 @@ class LabelProcessor:
             return True
             
         except Exception as e:
-            self.log(f"备份文件失败 {file_path}: {e}")
+            res.logs.append(f"备份文件失败 {file_path}: {e}")
             return False
     
-    def load_json_file(self, json_path: str) -> Optional[Dict]:
+    def load_json_file(self, json_path: str, lazy: bool = False) -> Optional[Dict]:
         """
         加载JSON文件
         
         Args:
             json_path: JSON文件路径
+            lazy: 只读取标注字段时置为True，跳过imageData的解码（结果中imageData为None，不可回写）
             
         Returns:
             JSON数据字典，失败返回None
         """
+        res = _FileResult()
+        data = self._load_json(json_path, res, lazy)
+        self._merge(res)
+        return data
+    
+    def _load_json(self, json_path: str, res: _FileResult, lazy: bool = False) -> Optional[Dict]:
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_file(json_path, lazy=lazy)
         except Exception as e:
-            self.log(f"读取JSON文件失败 {json_path}: {e}")
-            self.error_files.append((json_path, f"读取失败: {e}"))
+            res.logs.append(f"读取JSON文件失败 {json_path}: {e}")
+            res.errors.append((json_path, f"读取失败: {e}"))
             return None
     
     def save_json_file(self, json_path: str, data: Dict) -> bool:
@@ -181,13 +372,19 @@ class LabelProcessor:
         Returns:
             保存是否成功
         """
+        res = _FileResult()
+        ok = self._save_json(json_path, data, res)
+        self._merge(res)
+        return ok
+    
+    def _save_json(self, json_path: str, data: Dict, res: _FileResult) -> bool:
         try:
             with open(json_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             return True
         except Exception as e:
-            self.log(f"保存JSON文件失败 {json_path}: {e}")
-            self.error_files.append((json_path, f"保存失败: {e}"))
+            res.logs.append(f"保存JSON文件失败 {json_path}: {e}")
+            res.errors.append((json_path, f"保存失败: {e}"))
             return False
     
     def delete_labels(self, target_labels: List[str]) -> bool:
@@ -213,49 +410,14 @@ class LabelProcessor:
                 return False
             
             self.log(f"找到 {self.total_files} 个JSON文件")
+            json_files = self._candidates(json_files, target_labels)
             
-            for i, json_path in enumerate(json_files):
-                # 加载JSON文件
-                data = self.load_json_file(json_path)
-                if data is None:
-                    continue
-                
-                # 检查是否有shapes字段
-                if 'shapes' not in data:
-                    continue
-                
-                # 备份原文件（如果需要）
-                if self.backup_enabled:
-                    self.backup_file(json_path)
-                
-                # 过滤掉要删除的标签
-                original_count = len(data['shapes'])
-                data['shapes'] = [shape for shape in data['shapes'] 
-                                if shape.get('label', '') not in target_labels]
-                new_count = len(data['shapes'])
-                
-                deleted_count = original_count - new_count
-                
-                if deleted_count > 0:
-                    if new_count == 0:
-                        # 如果没有剩余标签，删除整个JSON文件
-                        try:
-                            os.remove(json_path)
-                            self.deleted_files.append(json_path)
-                            self.log(f"删除空标注文件: {os.path.basename(json_path)}")
-                        except Exception as e:
-                            self.log(f"删除文件失败 {json_path}: {e}")
-                            self.error_files.append((json_path, f"删除失败: {e}"))
-                    else:
-                        # 保存修改后的JSON文件
-                        if self.save_json_file(json_path, data):
-                            self.modified_files.append(json_path)
-                            self.log(f"修改文件: {os.path.basename(json_path)} (删除 {deleted_count} 个标签)")
-                
-                # 更新进度
-                self.processed_files += 1
-                progress = self.processed_files / self.total_files
-                self.update_progress(progress)
+            may_match = self._may_match(target_labels)
+            for i, (_, res) in enumerate(self._map_files(lambda p: self._delete_one(p, target_labels, may_match), json_files)):
+                # 预筛跳过的文件同样计入已处理；进度按已检查的文件数推进
+                if res.value is not None:
+                    self.processed_files += 1
+                self.update_progress((i + 1) / len(json_files))
             
             elapsed_time = time.time() - start_time
             self.log(f"标签删除处理完成！耗时: {elapsed_time:.2f}秒")
@@ -269,6 +431,53 @@ class LabelProcessor:
             self.log(f"标签删除处理过程中出现错误: {e}")
             return False
     
+    def _delete_one(self, json_path: str, target_labels: List[str],
+                    may_match: Optional[LabelPrefilter] = None) -> _FileResult:
+        """删除单个文件中的指定标签（可在工作线程中执行），文件被处理时 `value` 为 True，被字节预筛跳过时为 False"""
+        res = _FileResult()
+        if may_match is not None and not may_match(json_path):
+            res.value = False
+            return res
+        # 加载JSON文件
+        data = self._load_json(json_path, res)
+        if data is None:
+            return res
+        
+        # 检查是否有shapes字段
+        if 'shapes' not in data:
+            return res
+        
+        res.value = True
+        
+        # 备份原文件（如果需要）
+        if self.backup_enabled:
+            self._backup(json_path, res)
+        
+        # 过滤掉要删除的标签
+        original_count = len(data['shapes'])
+        data['shapes'] = [shape for shape in data['shapes'] 
+                        if shape.get('label', '') not in target_labels]
+        new_count = len(data['shapes'])
+        
+        deleted_count = original_count - new_count
+        
+        if deleted_count > 0:
+            if new_count == 0:
+                # 如果没有剩余标签，删除整个JSON文件
+                try:
+                    os.remove(json_path)
+                    res.deleted.append(json_path)
+                    res.logs.append(f"删除空标注文件: {os.path.basename(json_path)}")
+                except Exception as e:
+                    res.logs.append(f"删除文件失败 {json_path}: {e}")
+                    res.errors.append((json_path, f"删除失败: {e}"))
+            else:
+                # 保存修改后的JSON文件
+                if self._save_json(json_path, data, res):
+                    res.modified.append(json_path)
+                    res.logs.append(f"修改文件: {os.path.basename(json_path)} (删除 {deleted_count} 个标签)")
+        return res
+    
     def export_labels(self, target_labels: List[str], output_dir: str) -> bool:
         """
         导出包含指定标签的文件
@@ -296,45 +505,29 @@ class LabelProcessor:
                 return False
             
             self.log(f"找到 {self.total_files} 个JSON文件")
+            json_files = self._candidates(json_files, target_labels)
             
-            for i, json_path in enumerate(json_files):
-                # 加载JSON文件
-                data = self.load_json_file(json_path)
-                if data is None:
-                    continue
-                
-                # 检查是否包含目标标签
-                if 'shapes' in data:
-                    has_target_label = any(shape.get('label', '') in target_labels 
-                                         for shape in data['shapes'])
-                    
-                    if has_target_label:
-                        try:
-                            # 复制JSON文件
-                            json_filename = os.path.basename(json_path)
-                            output_json_path = os.path.join(output_dir, json_filename)
-                            shutil.copy2(json_path, output_json_path)
-                            
-                            # 查找并复制对应的图片文件
-                            image_path = self.find_image_file(json_path)
-                            if image_path:
-                                image_filename = os.path.basename(image_path)
-                                output_image_path = os.path.join(output_dir, image_filename)
-                                shutil.copy2(image_path, output_image_path)
-                                self.exported_files.append((json_path, image_path))
-                                self.log(f"导出: {json_filename} + {image_filename}")
-                            else:
-                                self.exported_files.append((json_path, None))
-                                self.log(f"导出: {json_filename} (未找到对应图片)")
-                            
-                        except Exception as e:
-                            self.log(f"导出文件失败 {json_path}: {e}")
-                            self.error_files.append((json_path, f"导出失败: {e}"))
+            # 先并行筛选出包含目标标签的文件，再并行复制；同名文件只执行最后一次复制，与串行覆盖的结果相同
+            copies = []
+            may_match = self._may_match(target_labels)
+            for i, (json_path, res) in enumerate(self._map_files(lambda p: self._match_one(p, target_labels, may_match), json_files)):
+                if res.value is not None:
+                    self.processed_files += 1
+                if res.value is not None and res.value is not False:
+                    image_path = res.value
+                    copies.append([(json_path, os.path.join(output_dir, os.path.basename(json_path)))]
+                                  + ([(image_path, os.path.join(output_dir, os.path.basename(image_path)))] if image_path else []))
                 
                 # 更新进度
-                self.processed_files += 1
-                progress = self.processed_files / self.total_files
+                self.update_progress((i + 1) / len(json_files) * 0.5)  # 前50%用于筛选
+            
+            keep = self._last_writers(copies)
+            tasks = [(ops, [(i, j) in keep for j in range(len(ops))]) for i, ops in enumerate(copies)]
+            for i, _ in enumerate(self._map_files(self._export_one, tasks)):
+                progress = 0.5 + (i + 1) / len(tasks) * 0.5  # 后50%用于复制
                 self.update_progress(progress)
+            if not tasks:
+                self.update_progress(1.0)
             
             elapsed_time = time.time() - start_time
             self.log(f"标签导出处理完成！耗时: {elapsed_time:.2f}秒")
@@ -347,6 +540,49 @@ class LabelProcessor:
             self.log(f"标签导出处理过程中出现错误: {e}")
             return False
     
+    def _match_one(self, json_path: str, target_labels: List[str],
+                   may_match: Optional[LabelPrefilter] = None) -> _FileResult:
+        """
+        检查单个文件是否包含目标标签（可在工作线程中执行）
+        
+        包含时 `value` 为对应图片路径（未找到图片时为空字符串），不包含时为 False，读取失败时为 None
+        """
+        res = _FileResult()
+        if may_match is not None and not may_match(json_path):
+            res.value = False
+            return res
+        # 加载JSON文件（只读标注，跳过imageData）
+        data = self._load_json(json_path, res, lazy=True)
+        if data is None:
+            return res
+        res.value = False
+        if 'shapes' in data:
+            if any(shape.get('label', '') in target_labels for shape in data['shapes']):
+                res.value = self.find_image_file(json_path) or ""
+        return res
+    
+    def _export_one(self, task: tuple) -> _FileResult:
+        """复制一组导出文件（JSON及其图片）；被后续同名文件覆盖的复制直接跳过"""
+        ops, keep = task
+        res = _FileResult()
+        json_path = ops[0][0]
+        json_filename = os.path.basename(json_path)
+        try:
+            for (src, dst), needed in zip(ops, keep):
+                if needed:
+                    shutil.copy2(src, dst)
+            if len(ops) > 1:
+                image_path = ops[1][0]
+                res.exported.append((json_path, image_path))
+                res.logs.append(f"导出: {json_filename} + {os.path.basename(image_path)}")
+            else:
+                res.exported.append((json_path, None))
+                res.logs.append(f"导出: {json_filename} (未找到对应图片)")
+        except Exception as e:
+            res.logs.append(f"导出文件失败 {json_path}: {e}")
+            res.errors.append((json_path, f"导出失败: {e}"))
+        return res
+    
     def replace_labels(self, old_label: str, new_label: str) -> bool:
         """
         替换标签名称
@@ -372,38 +608,14 @@ class LabelProcessor:
             
             self.log(f"找到 {self.total_files} 个JSON文件")
             self.log(f"将标签 '{old_label}' 替换为 '{new_label}'")
+            json_files = self._candidates(json_files, [old_label])
             
-            for i, json_path in enumerate(json_files):
-                # 加载JSON文件
-                data = self.load_json_file(json_path)
-                if data is None:
-                    continue
-                
-                # 检查是否有shapes字段
-                if 'shapes' not in data:
-                    continue
-                
-                # 查找并替换标签
-                replaced_count = 0
-                for shape in data['shapes']:
-                    if shape.get('label', '') == old_label:
-                        # 备份原文件（如果需要且是第一次修改）
-                        if replaced_count == 0 and self.backup_enabled:
-                            self.backup_file(json_path)
-                        
-                        shape['label'] = new_label
-                        replaced_count += 1
-                
-                if replaced_count > 0:
-                    # 保存修改后的JSON文件
-                    if self.save_json_file(json_path, data):
-                        self.modified_files.append(json_path)
-                        self.log(f"修改文件: {os.path.basename(json_path)} (替换 {replaced_count} 个标签)")
-                
-                # 更新进度
-                self.processed_files += 1
-                progress = self.processed_files / self.total_files
-                self.update_progress(progress)
+            may_match = self._may_match([old_label])
+            for i, (_, res) in enumerate(self._map_files(lambda p: self._replace_one(p, old_label, new_label, may_match), json_files)):
+                # 预筛跳过的文件同样计入已处理；进度按已检查的文件数推进
+                if res.value is not None:
+                    self.processed_files += 1
+                self.update_progress((i + 1) / len(json_files))
             
             elapsed_time = time.time() - start_time
             self.log(f"标签替换处理完成！耗时: {elapsed_time:.2f}秒")
@@ -416,6 +628,248 @@ class LabelProcessor:
             self.log(f"标签替换处理过程中出现错误: {e}")
             return False
     
+    def _replace_one(self, json_path: str, old_label: str, new_label: str,
+                     may_match: Optional[LabelPrefilter] = None) -> _FileResult:
+        """替换单个文件中的标签名称（可在工作线程中执行），文件被处理时 `value` 为 True，被字节预筛跳过时为 False"""
+        res = _FileResult()
+        if may_match is not None and not may_match(json_path):
+            res.value = False
+            return res
+        # 加载JSON文件
+        data = self._load_json(json_path, res)
+        if data is None:
+            return res
+        
+        # 检查是否有shapes字段
+        if 'shapes' not in data:
+            return res
+        
+        res.value = True
+        
+        # 查找并替换标签
+        replaced_count = 0
+        for shape in data['shapes']:
+            if shape.get('label', '') == old_label:
+                # 备份原文件（如果需要且是第一次修改）
+                if replaced_count == 0 and self.backup_enabled:
+                    self._backup(json_path, res)
+                
+                shape['label'] = new_label
+                replaced_count += 1
+        
+        if replaced_count > 0:
+            # 保存修改后的JSON文件
+            if self._save_json(json_path, data, res):
+                res.modified.append(json_path)
+                res.logs.append(f"修改文件: {os.path.basename(json_path)} (替换 {replaced_count} 个标签)")
+        return res
+    
+    def run_pipeline(self, operations: List[Dict]) -> bool:
+        """
+        组合处理：每个文件只遍历、解析一次，在内存中依次执行全部操作，有修改时只写回一次
+        
+        Args:
+            operations: 操作列表（见 `parse_operations`），按顺序执行：
+                `{'op': 'delete', 'labels': [...]}`、`{'op': 'replace', 'old': 原标签, 'new': 新标签}`、
+                `{'op': 'filter', 'labels': [...]}`、`{'op': 'export', 'output_dir': 输出目录}`。
+                导出的是执行到该操作时的标注内容；删除后没有剩余标签的JSON文件会被删除，与 `delete_labels` 一致
+            
+        Returns:
+            处理是否成功
+        """
+        try:
+            for op in operations:
+                if op.get('op') not in PIPELINE_OPS:
+                    self.log(f"未知操作: {op.get('op')}")
+                    return False
+            if not operations:
+                self.log("未指定任何操作")
+                return False
+            
+            self.log("开始组合处理...")
+            self.log("操作顺序: " + " -> ".join(op['op'] for op in operations))
+            start_time = time.time()
+            
+            for op in operations:
+                if op['op'] == 'export':
+                    os.makedirs(op['output_dir'], exist_ok=True)
+            
+            # 获取所有JSON文件
+            json_files = self.get_json_files()
+            self.total_files = len(json_files)
+            
+            if self.total_files == 0:
+                self.log("未找到任何JSON文件")
+                return False
+            
+            self.log(f"找到 {self.total_files} 个JSON文件")
+            labels = self._pipeline_labels(operations)
+            if labels is not None:
+                json_files = self._candidates(json_files, labels)
+            
+            # 同名文件导出到同一目录时由主线程按顺序写出，保证与串行一致的覆盖结果
+            stems = {}
+            for p in json_files:
+                stem = os.path.normcase(os.path.splitext(os.path.basename(p))[0])
+                stems[stem] = stems.get(stem, 0) + 1
+            collide = {stem for stem, n in stems.items() if n > 1}
+            
+            may_match = self._may_match(labels)
+            for i, (_, res) in enumerate(self._map_files(lambda p: self._pipeline_one(p, operations, collide, may_match), json_files)):
+                for src, data, dst in res.deferred:
+                    try:
+                        if data is None:
+                            shutil.copy2(src, dst)
+                        else:
+                            with open(dst, 'wb') as f:
+                                f.write(data)
+                    except Exception as e:
+                        self.log(f"导出文件失败 {src}: {e}")
+                        self.error_files.append((src, f"导出失败: {e}"))
+                # 预筛跳过的文件同样计入已处理；进度按已检查的文件数推进
+                if res.value is not None:
+                    self.processed_files += 1
+                self.update_progress((i + 1) / len(json_files))
+                
+                if not self.is_running:
+                    self.log("处理被用户中断")
+                    return False
+            
+            elapsed_time = time.time() - start_time
+            self.log(f"组合处理完成！耗时: {elapsed_time:.2f}秒")
+            self.log(f"修改文件: {len(self.modified_files)} 个")
+            self.log(f"删除文件: {len(self.deleted_files)} 个")
+            self.log(f"导出文件组: {len(self.exported_files)} 个")
+            self.log(f"错误文件: {len(self.error_files)} 个")
+            
+            return True
+            
+        except Exception as e:
+            self.log(f"组合处理过程中出现错误: {e}")
+            return False
+    
+    @staticmethod
+    def _pipeline_labels(operations: List[Dict]) -> Optional[List[str]]:
+        """
+        组合处理中决定文件是否受影响的标签：第一个筛选及其之前的删除、替换涉及的标签（没有筛选时为全部删除、替换）；
+        不包含这些标签的文件既不会被修改也不会被导出。第一个筛选之前存在导出时返回 None（每个文件都要处理）
+        """
+        labels = []
+        for op in operations:
+            kind = op['op']
+            if kind == 'export':
+                return None
+            if kind == 'replace':
+                labels.append(op['old'])
+            else:
+                labels.extend(op['labels'])
+                if kind == 'filter':
+                    break
+        return labels
+    
+    def _pipeline_one(self, json_path: str, operations: List[Dict], collide: set,
+                      may_match: Optional[LabelPrefilter] = None) -> _FileResult:
+        """对单个文件依次执行组合操作（可在工作线程中执行），文件被处理时 `value` 为 True，被字节预筛跳过时为 False"""
+        res = _FileResult()
+        if may_match is not None and not may_match(json_path):
+            res.value = False
+            return res
+        # 只有筛选和导出时不会回写，可以跳过imageData的解码
+        mutating = any(op['op'] in ('delete', 'replace') for op in operations)
+        data = self._load_json(json_path, res, lazy=not mutating)
+        if data is None or 'shapes' not in data:
+            return res
+        res.value = True
+        
+        deferred = os.path.normcase(os.path.splitext(os.path.basename(json_path))[0]) in collide
+        shapes = data['shapes']
+        deleted_count = 0
+        replaced_count = 0
+        for op in operations:
+            kind = op['op']
+            if kind == 'delete':
+                kept = [shape for shape in shapes if shape.get('label', '') not in op['labels']]
+                deleted_count += len(shapes) - len(kept)
+                shapes = kept
+            elif kind == 'replace':
+                for shape in shapes:
+                    if shape.get('label', '') == op['old']:
+                        shape['label'] = op['new']
+                        replaced_count += 1
+            elif kind == 'filter':
+                if not any(shape.get('label', '') in op['labels'] for shape in shapes):
+                    break
+            elif kind == 'export':
+                data['shapes'] = shapes
+                self._pipeline_export(json_path, data if deleted_count or replaced_count else None,
+                                      op['output_dir'], deferred, res)
+        data['shapes'] = shapes
+        
+        if deleted_count or replaced_count:
+            # 备份原文件（如果需要），原文件在此之前未被改动
+            if self.backup_enabled:
+                self._backup(json_path, res)
+            changes = []
+            if deleted_count:
+                changes.append(f"删除 {deleted_count} 个标签")
+            if replaced_count:
+                changes.append(f"替换 {replaced_count} 个标签")
+            if not shapes and deleted_count:
+                # 如果没有剩余标签，删除整个JSON文件
+                try:
+                    os.remove(json_path)
+                    res.deleted.append(json_path)
+                    res.logs.append(f"删除空标注文件: {os.path.basename(json_path)}")
+                except Exception as e:
+                    res.logs.append(f"删除文件失败 {json_path}: {e}")
+                    res.errors.append((json_path, f"删除失败: {e}"))
+            elif self._save_json(json_path, data, res):
+                res.modified.append(json_path)
+                res.logs.append(f"修改文件: {os.path.basename(json_path)} ({', '.join(changes)})")
+        return res
+    
+    def _pipeline_export(self, json_path: str, data: Optional[Dict], output_dir: str, deferred: bool, res: _FileResult):
+        """
+        导出JSON（`data` 为 None 时复制原文件，否则写出修改后的内容）及对应图片
+        
+        `deferred` 时不直接写出，而是把内容快照交给主线程按文件顺序写出
+        """
+        json_filename = os.path.basename(json_path)
+        try:
+            content = None
+            if data is not None:
+                content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+            elif deferred:
+                # 原文件可能在后续操作后被改写，先取快照
+                with open(json_path, 'rb') as f:
+                    content = f.read()
+            output_json_path = os.path.join(output_dir, json_filename)
+            if deferred:
+                res.deferred.append((json_path, content, output_json_path))
+            elif content is None:
+                shutil.copy2(json_path, output_json_path)
+            else:
+                with open(output_json_path, 'wb') as f:
+                    f.write(content)
+            
+            # 查找并复制对应的图片文件
+            image_path = self.find_image_file(json_path)
+            if image_path:
+                image_filename = os.path.basename(image_path)
+                output_image_path = os.path.join(output_dir, image_filename)
+                if deferred:
+                    res.deferred.append((image_path, None, output_image_path))
+                else:
+                    shutil.copy2(image_path, output_image_path)
+                res.exported.append((json_path, image_path))
+                res.logs.append(f"导出: {json_filename} + {image_filename}")
+            else:
+                res.exported.append((json_path, None))
+                res.logs.append(f"导出: {json_filename} (未找到对应图片)")
+        except Exception as e:
+            res.logs.append(f"导出文件失败 {json_path}: {e}")
+            res.errors.append((json_path, f"导出失败: {e}"))
+    
     def export_blank_images(self, output_dir: str) -> bool:
         """
         导出未标注或标注为空的图片
@@ -436,16 +890,17 @@ class LabelProcessor:
             # 获取所有图片文件
             image_extensions = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp')
             image_files = []
+            json_files = []
+            # 扫描到的全部文件按目录登记，用于查找同名 JSON，避免逐个 stat
+            self.stem_index = StemIndex()
             
-            if self.recursive:
-                for root, _, files in os.walk(self.source_dir):
-                    for file in files:
-                        if file.lower().endswith(image_extensions):
-                            image_files.append(os.path.join(root, file))
-            else:
-                for file in os.listdir(self.source_dir):
+            for root, files in walk_files(self.source_dir, recursive=self.recursive):
+                self.stem_index.add(root, files)
+                for file in files:
                     if file.lower().endswith(image_extensions):
-                        image_files.append(os.path.join(self.source_dir, file))
+                        image_files.append(os.path.join(root, file))
+                    elif file.lower().endswith('.json'):
+                        json_files.append(os.path.join(root, file))
             
             if not image_files:
                 self.log("未找到任何图片文件")
@@ -464,26 +919,22 @@ class LabelProcessor:
             
             processed_files = 0
             
-            for image_path in image_files:
-                # 检查是否有对应的JSON文件
-                json_path = image_path.rsplit('.', 1)[0] + '.json'
-                
-                if not os.path.exists(json_path):
-                    # 没有对应的JSON文件
+            # 启用索引时空标注直接由索引判断，只有索引中无法解析的文件需要读取以记录错误
+            blank = None
+            if self.use_index:
+                with self.open_index(json_files) as index:
+                    unreadable = index.unreadable_files()
+                    empty = index.blank_files()
+                    keys = {os.path.normcase(p): index.key(p) for p in json_files}
+                blank = {p: k not in unreadable for p, k in keys.items() if k in empty}
+            
+            for image_path, res in self._map_files(lambda p: self._blank_one(p, blank), image_files):
+                if res.value == "no_json":
                     no_json_images.append(image_path)
                     blank_images.append(image_path)
-                else:
-                    try:
-                        # 读取JSON文件检查标签
-                        json_data = self.load_json_file(json_path)
-                        if not json_data or 'shapes' not in json_data or not json_data['shapes']:
-                            # JSON文件存在但没有标签
-                            empty_label_images.append(image_path)
-                            blank_images.append(image_path)
-                    except Exception as e:
-                        self.log(f"读取JSON文件失败 {json_path}: {e}")
-                        no_json_images.append(image_path)
-                        blank_images.append(image_path)
+                elif res.value == "empty":
+                    empty_label_images.append(image_path)
+                    blank_images.append(image_path)
                 
                 processed_files += 1
                 progress = processed_files / self.total_files * 0.5  # 前50%用于检查
@@ -499,22 +950,13 @@ class LabelProcessor:
                 self.log(f"找到 {len(blank_images)} 个空白图片（无JSON: {len(no_json_images)}, 空标签: {len(empty_label_images)}）")
                 self.log(f"开始复制到输出目录: {output_dir}")
                 
+                # 同名图片只执行最后一次复制，与串行覆盖的结果相同
+                copies = [[(p, os.path.join(output_dir, os.path.basename(p)))] for p in blank_images]
+                keep = self._last_writers(copies)
+                tasks = [(ops, [(i, 0) in keep]) for i, ops in enumerate(copies)]
                 copied_count = 0
-                for i, image_path in enumerate(blank_images):
-                    try:
-                        # 获取文件名
-                        filename = os.path.basename(image_path)
-                        output_path = os.path.join(output_dir, filename)
-                        
-                        # 复制文件
-                        shutil.copy2(image_path, output_path)
-                        copied_count += 1
-                        self.exported_files.append(image_path)
-                        
-                        self.log(f"已复制: {filename}")
-                    except Exception as e:
-                        self.log(f"复制文件失败 {image_path}: {e}")
-                        self.error_files.append((image_path, f"复制失败: {e}"))
+                for i, (_, res) in enumerate(self._map_files(self._copy_blank_one, tasks)):
+                    copied_count += len(res.exported)
                     
                     # 更新进度
                     progress = 0.5 + (i / len(blank_images)) * 0.5  # 后50%用于复制
@@ -546,6 +988,148 @@ class LabelProcessor:
             self.log(f"空白图片导出过程中出现错误: {e}")
             return False
     
+    def _blank_one(self, image_path: str, blank: Optional[Dict[str, bool]] = None) -> _FileResult:
+        """
+        检查单张图片是否为空白图片：`value` 为 "no_json"（无JSON）、"empty"（空标签）或 None（可在工作线程中执行）
+        
+        `blank` 为标签索引给出的 `{JSON路径: 是否确定为空标注}`：不在其中的JSON有标签，值为 False 的需要实际读取
+        """
+        res = _FileResult()
+        # 检查是否有对应的JSON文件（在遍历时登记的目录列举中查找）
+        image_dir, image_name = os.path.split(image_path)
+        json_path = self.stem_index.find(image_dir, os.path.splitext(image_name)[0], ('.json',))
+        
+        if json_path is None:
+            # 没有对应的JSON文件
+            res.value = "no_json"
+            return res
+        key = os.path.normcase(json_path)
+        if blank is not None and blank.get(key, True):
+            if key in blank:
+                res.value = "empty"
+        else:
+            try:
+                # 读取JSON文件检查标签
+                json_data = self._load_json(json_path, res, lazy=True)
+                if not json_data or 'shapes' not in json_data or not json_data['shapes']:
+                    # JSON文件存在但没有标签
+                    res.value = "empty"
+            except Exception as e:
+                res.logs.append(f"读取JSON文件失败 {json_path}: {e}")
+                res.value = "no_json"
+        return res
+    
+    def _copy_blank_one(self, task: tuple) -> _FileResult:
+        """复制一张空白图片；被后续同名图片覆盖的复制直接跳过"""
+        ops, keep = task
+        res = _FileResult()
+        image_path, output_path = ops[0]
+        try:
+            # 复制文件
+            if keep[0]:
+                shutil.copy2(image_path, output_path)
+            res.exported.append(image_path)
+            
+            res.logs.append(f"已复制: {os.path.basename(image_path)}")
+        except Exception as e:
+            res.logs.append(f"复制文件失败 {image_path}: {e}")
+            res.errors.append((image_path, f"复制失败: {e}"))
+        return res
+    
+    def check_image_sizes(self, fix: bool = False) -> bool:
+        """
+        核对JSON中的imageWidth/imageHeight与图片真实尺寸
+        
+        图片尺寸只读取文件头获得，结果按文件修改时间缓存。不一致的文件记入错误列表；
+        开启修正时，等比缩放过的图片按比例缩放标注点并改写尺寸（旋转或宽高比变化无法自动修正）。
+        
+        Args:
+            fix: 是否自动修正等比缩放的标注
+            
+        Returns:
+            处理是否成功
+        """
+        try:
+            self.log("开始图片尺寸核对...")
+            start_time = time.time()
+            
+            # 获取所有JSON文件
+            json_files = self.get_json_files()
+            self.total_files = len(json_files)
+            
+            if self.total_files == 0:
+                self.log("未找到任何JSON文件")
+                return False
+            
+            self.log(f"找到 {self.total_files} 个JSON文件")
+            
+            # 先批量探测图片尺寸：只读文件头，线程池并行，未变化的文件直接取缓存
+            image_files = [self.find_image_file(p) for p in json_files]
+            cache = ProbeCache(self.source_dir)
+            sizes = iter(probe_sizes([p for p in image_files if p], cache))
+            actual_sizes = [next(sizes) if p else None for p in image_files]
+            cache.save()
+            self.log(f"读取图片文件头 {cache.misses} 张，缓存命中 {cache.hits} 张")
+            
+            mismatched = 0
+            for json_path, image_path, actual in zip(json_files, image_files, actual_sizes):
+                if not self.is_running:
+                    self.log("处理已停止")
+                    break
+                
+                self.processed_files += 1
+                self.update_progress(self.processed_files / self.total_files)
+                
+                if image_path is None:
+                    continue
+                if actual is None:
+                    self.error_files.append((json_path, "无法读取图片尺寸"))
+                    continue
+                
+                data = self.load_json_file(json_path, lazy=True)
+                if data is None:
+                    continue
+                try:
+                    labeled = (int(data.get('imageWidth')), int(data.get('imageHeight')))
+                except (TypeError, ValueError):
+                    self.error_files.append((json_path, "缺少或无效的imageWidth/imageHeight"))
+                    continue
+                
+                kind = compare_size(labeled, actual)
+                if kind == SIZE_OK:
+                    continue
+                mismatched += 1
+                detail = f"标注 {labeled[0]}x{labeled[1]}，图片 {actual[0]}x{actual[1]}"
+                if kind != SIZE_SCALED or not fix:
+                    self.error_files.append((json_path, f"尺寸不一致({kind}): {detail}"))
+                    continue
+                
+                # 修正需要完整读取（含imageData）后回写
+                data = self.load_json_file(json_path)
+                if data is None:
+                    continue
+                sx = actual[0] / labeled[0]
+                sy = actual[1] / labeled[1]
+                for shape in data.get('shapes', []):
+                    shape['points'] = [[p[0] * sx, p[1] * sy] for p in shape.get('points', [])]
+                data['imageWidth'], data['imageHeight'] = actual
+                if self.backup_enabled:
+                    self.backup_file(json_path)
+                if self.save_json_file(json_path, data):
+                    self.modified_files.append(json_path)
+                    self.log(f"修正文件: {os.path.basename(json_path)} ({detail})")
+            
+            elapsed_time = time.time() - start_time
+            self.log(f"图片尺寸核对完成！耗时: {elapsed_time:.2f}秒")
+            self.log(f"尺寸不一致: {mismatched} 个，已修正: {len(self.modified_files)} 个")
+            self.log(f"错误文件: {len(self.error_files)} 个")
+            
+            return True
+            
+        except Exception as e:
+            self.log(f"图片尺寸核对过程中出现错误: {e}")
+            return False
+    
     def generate_report(self) -> str:
         """
         生成处理报告
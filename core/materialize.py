@@ -0,0 +1,84 @@
+"""数据集图片落盘策略。
+
+- `copy`：`shutil.copy2` 完整复制（默认）。
+- `hardlink`：硬链接，不占用额外磁盘空间；要求源与目标位于同一文件系统。
+- `symlink`：符号链接；Windows 下需要管理员权限或开发者模式。
+- `reflink`：写时复制克隆（Linux btrfs/xfs 的 FICLONE，macOS APFS 的 clonefile），文件系统不支持时回退。
+
+任一策略失败（跨文件系统、权限不足、文件系统不支持）时自动回退为 `copy`，返回实际使用的策略。
+"""
+import os
+import sys
+import shutil
+from typing import Optional
+
+LINK_MODES = ("copy", "hardlink", "symlink", "reflink")
+
+# linux/fs.h: #define FICLONE _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+def _reflink_linux(src: str, dst: str):
+    import fcntl
+    with open(src, "rb") as fs, open(dst, "wb") as fd:
+        fcntl.ioctl(fd.fileno(), _FICLONE, fs.fileno())
+
+def _reflink_darwin(src: str, dst: str):
+    import ctypes
+    libc = ctypes.CDLL("libc.dylib", use_errno=True)
+    if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), dst)
+
+def _reflink(src: str, dst: str):
+    if sys.platform.startswith("linux"):
+        try:
+            _reflink_linux(src, dst)
+        except OSError:
+            # ioctl 失败时 open(dst, "wb") 已留下空文件
+            if os.path.exists(dst):
+                os.remove(dst)
+            raise
+    elif sys.platform == "darwin":
+        _reflink_darwin(src, dst)
+    else:
+        raise OSError("reflink is not supported on this platform")
+    shutil.copystat(src, dst)
+
+def materialize(src: str, dst: str, mode: str = "copy") -> str:
+    """
+    按指定策略将 `src` 落盘到 `dst`。
+
+    参数:
+        src (str): 源图片路径。
+        dst (str): 目标路径；已存在时先删除，避免通过旧链接改写源文件。
+        mode (str): `LINK_MODES` 之一。
+
+    返回:
+        str: 实际使用的策略；回退时为 `copy`。
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"unknown link mode: {mode}")
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if mode != "copy":
+        try:
+            if mode == "hardlink":
+                os.link(src, dst)
+            elif mode == "symlink":
+                os.symlink(os.path.abspath(src), dst)
+            else:
+                _reflink(src, dst)
+            return mode
+        except (OSError, NotImplementedError):
+            pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+def link_mode_supported(src_dir: str, dst_dir: str, mode: str) -> Optional[bool]:
+    """粗略判断两目录间能否使用该策略：硬链接与 reflink 要求同一设备；无法判断时返回 None。"""
+    if mode in ("copy", "symlink"):
+        return True
+    try:
+        return os.stat(src_dir).st_dev == os.stat(dst_dir).st_dev
+    except OSError:
+        return None
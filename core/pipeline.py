@@ -0,0 +1,191 @@
+"""流式流水线基础设施：有界预取、窗口化有序并行 map 与进度事件。
+
+各阶段以生成器串联，相邻阶段之间只保留有界数量的在途数据（预取队列长度、并行窗口），
+因此内存占用与输入规模无关；上游尚未结束时下游即可开始处理。
+
+进度事件为普通字典，GUI 与命令行都通过 `format_event` 将其转换为日志文本：
+
+- `{"kind": "log", "message": str}`
+- `{"kind": "progress", "total": int | None, "stages": {阶段名: {"done", "bytes", "elapsed"}}}`
+- `{"kind": "done", "total": int, "stages": {...}, "summary": dict}`
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Any
+
+_END = object()
+
+class _Raised:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+def prefetch(iterable: Iterable, maxsize: int = 1024) -> Iterator:
+    """在后台线程中迭代 `iterable`，经有界队列交给消费端；生产端异常在消费端重新抛出。"""
+    q: "queue.Queue" = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(_Raised(e))
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _END:
+                return
+            if isinstance(item, _Raised):
+                raise item.exc
+            yield item
+    finally:
+        stop.set()
+
+def ordered_map(fn: Callable, items: Iterable, executor: Optional[Executor], window: int,
+                arg: Optional[Callable[[Any], Any]] = None) -> Iterator[Tuple[Any, Any]]:
+    """
+    有序并行 map，产出 `(item, fn(arg(item)))`。
+
+    参数:
+        fn (Callable): 任务函数；使用进程池时需可被 pickle。
+        items (Iterable): 输入，按需惰性读取。
+        executor (Executor): 线程池或进程池；为 None 时在当前线程串行执行。
+        window (int): 最多在途的任务数，决定阶段间缓冲的上限。
+        arg (Callable): 从 item 提取实际提交给 `fn` 的参数，默认为 item 本身。
+    """
+    conv = arg or (lambda x: x)
+    if executor is None:
+        for item in items:
+            yield item, fn(conv(item))
+        return
+    pending: deque = deque()
+    try:
+        for item in items:
+            pending.append((item, executor.submit(fn, conv(item))))
+            if len(pending) >= window:
+                it, fut = pending.popleft()
+                yield it, fut.result()
+        while pending:
+            it, fut = pending.popleft()
+            yield it, fut.result()
+    finally:
+        for _, fut in pending:
+            fut.cancel()
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    buf: List = []
+    for it in items:
+        buf.append(it)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+class PipelineProgress:
+    """记录各阶段完成数量、字节数与耗时，并按时间间隔推送进度事件。"""
+    def __init__(self, stages: List[str], event_callback: Callable[[Dict], None], interval: float = 0.5):
+        self.stages = stages
+        self.event_callback = event_callback
+        self.interval = interval
+        self.total: Optional[int] = None
+        self.done = {s: 0 for s in stages}
+        self.nbytes = {s: 0 for s in stages}
+        self.first: Dict[str, float] = {}
+        self.last: Dict[str, float] = {}
+        self._last_emit = time.perf_counter()
+
+    def set_total(self, total: int):
+        self.total = total
+
+    def add(self, stage: str, files: int = 1, nbytes: int = 0):
+        now = time.perf_counter()
+        self.first.setdefault(stage, now)
+        self.last[stage] = now
+        self.done[stage] += files
+        self.nbytes[stage] += nbytes
+        if now - self._last_emit >= self.interval:
+            self.emit_progress(now)
+
+    def log(self, message: str):
+        self.event_callback({"kind": "log", "message": message})
+
+    def snapshot(self) -> Dict[str, Dict]:
+        out = {}
+        for s in self.stages:
+            elapsed = self.last.get(s, 0.0) - self.first.get(s, 0.0)
+            out[s] = {"done": self.done[s], "bytes": self.nbytes[s], "elapsed": elapsed}
+        return out
+
+    def emit_progress(self, now: Optional[float] = None):
+        self._last_emit = now or time.perf_counter()
+        self.event_callback({"kind": "progress", "total": self.total, "stages": self.snapshot()})
+
+    def finish(self, summary: Dict):
+        self.event_callback({"kind": "done", "total": self.total, "stages": self.snapshot(), "summary": summary})
+
+def _rate(st: Dict) -> Tuple[float, float]:
+    el = max(st["elapsed"], 1e-6)
+    return st["done"] / el, st["bytes"] / el / (1 << 20)
+
+def format_event(event: Dict) -> List[str]:
+    """将进度事件转换为日志行，供 GUI 日志面板与命令行共用。"""
+    kind = event.get("kind")
+    if kind == "log":
+        return [event["message"]]
+    total = event.get("total")
+    stages = event.get("stages", {})
+    if kind == "progress":
+        parts = []
+        for name, st in stages.items():
+            fps, _ = _rate(st)
+            parts.append(f"{name} {st['done']}/{total if total is not None else '?'} ({fps:.0f} files/s)")
+        return ["[进度] " + " | ".join(parts)]
+    if kind == "done":
+        lines = []
+        for name, st in stages.items():
+            fps, mbps = _rate(st)
+            lines.append(f"[{name}] {st['done']} 个文件, 耗时 {st['elapsed']:.2f}s, {fps:.1f} files/s, {mbps:.1f} MB/s")
+        return lines
+    return []
+
+def event_fraction(event: Dict, stage: str) -> Optional[float]:
+    """按指定阶段的完成数量估算整体进度；总数未知时返回 None。"""
+    total = event.get("total")
+    st = event.get("stages", {}).get(stage)
+    if not total or st is None:
+        return None
+    return min(st["done"] / total, 1.0)
+
+def log_event_callback(log_callback: Optional[Callable[[str], None]] = None,
+                       progress_callback: Optional[Callable[[float], None]] = None,
+                       progress_stage: Optional[str] = None) -> Callable[[Dict], None]:
+    """把事件适配为日志回调（缺省为 print）与 0~1 进度回调。"""
+    def on_event(event: Dict):
+        for line in format_event(event):
+            if log_callback:
+                log_callback(line)
+            else:
+                print(line)
+        if progress_callback and progress_stage:
+            frac = 1.0 if event.get("kind") == "done" else event_fraction(event, progress_stage)
+            if frac is not None:
+                progress_callback(frac)
+    return on_event
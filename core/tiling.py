@@ -0,0 +1,187 @@
+"""大图切片：把高分辨率图片切成有重叠的固定尺寸切片，小目标在训练分辨率下不再因整体缩放而消失。
+
+- 切片网格按 `size` 与重叠比例 `overlap` 生成，最后一行/列贴齐图片边缘；不超过 `size` 的边只切一片。
+- 框的裁剪与重新归一化对 `(切片数, 框数)` 一次性向量化计算；裁剪后保留面积不足原框
+  `min_visibility` 的框被丢弃（被切断的小半个缺陷不作为正样本）。
+- 切片命名为 `<stem>__<x0>_<y0><ext>`，切片到原图的映射写入数据集根目录的 `tile_index.jsonl`，
+  `stitch_predictions` 据此把切片上的预测框平移回原图并做跨切片 NMS。
+"""
+import os
+import json
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .json_backend import loads
+
+TILE_INDEX_NAME = "tile_index.jsonl"
+DEFAULT_OVERLAP = 0.2
+DEFAULT_MIN_VISIBILITY = 0.3
+JPEG_QUALITY = 95
+_JPEG_EXTS = {".jpg", ".jpeg"}
+
+def tile_grid(w: int, h: int, size: int, overlap: float = DEFAULT_OVERLAP) -> np.ndarray:
+    """返回切片像素范围 `(k, 4)` 的 `x0, y0, x1, y1`，按行优先（先 y 后 x）排列。"""
+    def starts(n: int) -> np.ndarray:
+        if n <= size:
+            return np.zeros(1, dtype=np.int64)
+        stride = max(1, int(round(size * (1.0 - overlap))))
+        return np.r_[np.arange(0, n - size, stride), n - size].astype(np.int64)
+
+    gx, gy = np.meshgrid(starts(w), starts(h))
+    x0, y0 = gx.ravel(), gy.ravel()
+    return np.stack([x0, y0, np.minimum(x0 + size, w), np.minimum(y0 + size, h)], axis=1)
+
+def clip_boxes(cls: np.ndarray, boxes: np.ndarray, w: int, h: int, tiles: np.ndarray,
+               min_visibility: float = DEFAULT_MIN_VISIBILITY) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    把整图的归一化标签裁剪到每个切片并按切片尺寸重新归一化。
+
+    参数:
+        cls (np.ndarray): 类别下标，形状 (n,)。
+        boxes (np.ndarray): 整图归一化 `x_center, y_center, width, height`，形状 (n, 4)。
+        w, h (int): 整图尺寸。
+        tiles (np.ndarray): `tile_grid` 的结果，形状 (k, 4)。
+        min_visibility (float): 裁剪后面积占原框面积的最小比例。
+
+    返回:
+        List[Tuple[np.ndarray, np.ndarray]]: 每个切片的 `(cls, boxes)`。
+    """
+    k = len(tiles)
+    if len(cls) == 0:
+        return [(np.zeros((0,), dtype=np.int64), np.zeros((0, 4), dtype=np.float64)) for _ in range(k)]
+    b = np.asarray(boxes, dtype=np.float64)
+    bx0 = (b[:, 0] - b[:, 2] / 2.0) * w
+    by0 = (b[:, 1] - b[:, 3] / 2.0) * h
+    bx1 = (b[:, 0] + b[:, 2] / 2.0) * w
+    by1 = (b[:, 1] + b[:, 3] / 2.0) * h
+    area = (bx1 - bx0) * (by1 - by0)
+    t = tiles.astype(np.float64)
+    tx0, ty0, tx1, ty1 = (t[:, i:i + 1] for i in range(4))
+    # (k, n)：每个切片与每个框的交集
+    ix0 = np.maximum(bx0[None, :], tx0)
+    iy0 = np.maximum(by0[None, :], ty0)
+    ix1 = np.minimum(bx1[None, :], tx1)
+    iy1 = np.minimum(by1[None, :], ty1)
+    iw = ix1 - ix0
+    ih = iy1 - iy0
+    keep = (iw > 0) & (ih > 0) & (area[None, :] > 0)
+    keep &= iw * ih >= min_visibility * area[None, :]
+    tw = tx1 - tx0
+    th = ty1 - ty0
+    out_all = np.stack([((ix0 + ix1) / 2.0 - tx0) / tw, ((iy0 + iy1) / 2.0 - ty0) / th, iw / tw, ih / th], axis=2)
+    c = np.asarray(cls)
+    return [(c[keep[j]], out_all[j][keep[j]]) for j in range(k)]
+
+def tile_name(stem: str, x0: int, y0: int, ext: str) -> str:
+    return f"{stem}__{x0}_{y0}{ext}"
+
+def write_tiles(src: str, dst_dir: str, stem: str, tiles: np.ndarray, ext: str,
+                quality: int = JPEG_QUALITY) -> List[str]:
+    """解码一次原图（按 EXIF 摆正），逐个裁剪写出切片，返回切片文件名（先写临时文件再替换）。"""
+    from PIL import Image, ImageOps
+
+    names = []
+    with Image.open(src) as im:
+        img = ImageOps.exif_transpose(im)
+        fmt = "JPEG" if ext.lower() in _JPEG_EXTS else im.format
+        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        for x0, y0, x1, y1 in tiles.tolist():
+            name = tile_name(stem, x0, y0, ext)
+            dst = os.path.join(dst_dir, name)
+            tmp = dst + ".tmp"
+            crop = img.crop((x0, y0, x1, y1))
+            try:
+                if fmt == "JPEG":
+                    crop.save(tmp, format=fmt, quality=quality)
+                else:
+                    crop.save(tmp, format=fmt)
+                os.replace(tmp, dst)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            names.append(name)
+    return names
+
+class TileIndexWriter:
+    """流式写出 `tile_index.jsonl`：每行一张原图 `{"source", "size": [w, h], "tiles": [[切片图片相对路径, x0, y0, x1, y1], ...]}`。"""
+    def __init__(self, root: str):
+        self.path = os.path.join(root, TILE_INDEX_NAME)
+        self.tmp = self.path + ".tmp"
+        self.f = open(self.tmp, "w", encoding="utf-8")
+
+    def add(self, source: str, size: Sequence[int], tiles: List[list]):
+        self.f.write(json.dumps({"source": source, "size": list(size), "tiles": tiles}, ensure_ascii=False) + "\n")
+
+    def commit(self):
+        self.f.close()
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        try:
+            self.f.close()
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+def load_tile_index(root: str) -> Dict[str, Tuple[str, int, int]]:
+    """读取切片索引：`{切片文件名: (原图路径, x0, y0)}`，以文件名为键，便于直接匹配预测结果的路径。"""
+    out = {}
+    with open(os.path.join(root, TILE_INDEX_NAME), "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = loads(line)
+            for image, x0, y0, _, _ in rec["tiles"]:
+                out[os.path.basename(image)] = (rec["source"], int(x0), int(y0))
+    return out
+
+def _nms(boxes: np.ndarray, scores: np.ndarray, iou: float) -> np.ndarray:
+    order = np.argsort(-scores, kind="stable")
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    while len(order):
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        xx0 = np.maximum(boxes[i, 0], boxes[rest, 0])
+        yy0 = np.maximum(boxes[i, 1], boxes[rest, 1])
+        xx1 = np.minimum(boxes[i, 2], boxes[rest, 2])
+        yy1 = np.minimum(boxes[i, 3], boxes[rest, 3])
+        inter = np.clip(xx1 - xx0, 0, None) * np.clip(yy1 - yy0, 0, None)
+        union = area[i] + area[rest] - inter
+        order = rest[inter <= iou * np.maximum(union, 1e-9)]
+    return np.asarray(keep, dtype=np.int64)
+
+def stitch_predictions(index: Dict[str, Tuple[str, int, int]],
+                       preds: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                       iou: Optional[float] = 0.5) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    把切片上的预测合并回原图。
+
+    参数:
+        index: `load_tile_index` 的结果。
+        preds: `{切片路径或文件名: (cls (m,), xyxy 像素坐标 (m, 4), conf (m,))}`。
+        iou: 跨切片按类别做 NMS 的 IoU 阈值（重叠区域的同一目标会被多个切片检出），None 表示不做。
+
+    返回:
+        Dict: `{原图路径: (cls, xyxy, conf)}`，坐标为原图像素。
+    """
+    grouped: Dict[str, List[Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+    for tile, (cls, xyxy, conf) in preds.items():
+        source, x0, y0 = index[os.path.basename(tile)]
+        shifted = np.asarray(xyxy, dtype=np.float64) + np.array([x0, y0, x0, y0], dtype=np.float64)
+        grouped.setdefault(source, []).append((np.asarray(cls), shifted, np.asarray(conf, dtype=np.float64)))
+    out = {}
+    for source, parts in grouped.items():
+        cls = np.concatenate([p[0] for p in parts])
+        xyxy = np.concatenate([p[1] for p in parts]).reshape(-1, 4)
+        conf = np.concatenate([p[2] for p in parts])
+        if iou is not None and len(cls):
+            keep = np.concatenate([np.flatnonzero(cls == c)[_nms(xyxy[cls == c], conf[cls == c], iou)]
+                                   for c in np.unique(cls)])
+            keep.sort()
+            cls, xyxy, conf = cls[keep], xyxy[keep], conf[keep]
+        out[source] = (cls, xyxy, conf)
+    return out
@@ -16,10 +16,11 @@ def build_train_cmd(export_path: str,start_py: str, dataset_dir: str, env_name:
 
     - 若提供 `conda_base`，优先使用该路径下的 `envs/<env_name>/bin/python` 或 `condabin/conda`。
     - 否则在常见路径下自动探测 `condabin/conda` 或使用 `micromamba`，最终回退到 `python3`。
+    - `dataset_dir` 以 `/` 开头时视为已同步到 WSL 原生文件系统的路径（见 `core.wsl_sync`），不再转换。
     """
     sp = win_to_wsl_path(start_py)
     wd = os.path.dirname(sp)
-    dd = win_to_wsl_path(dataset_dir)
+    dd = dataset_dir if dataset_dir.startswith("/") else win_to_wsl_path(dataset_dir)
     ep = win_to_wsl_path(export_path) 
     extra = f" --export_path \"{ep}\"" if ep else ""
     cmd = ""
@@ -33,6 +34,21 @@ def build_train_cmd(export_path: str,start_py: str, dataset_dir: str, env_name:
   
     return ["wsl", "bash", "-lc", cmd]
 
+def build_kfold_cmd(export_path: str, start_py: str, dataset_dir: str, env_name: str = "train", conda_base: Optional[str] = None) -> List[str]:
+    """构建在 WSL 中依次训练 k 折的命令行：调用数据集根目录下由构建生成的 `run_folds.sh`（见 `core.kfold`）。
+
+    各折的导出目录为 `<export_path>/fold_<i>`；解释器的选择与 `build_train_cmd` 相同。
+    """
+    sp = win_to_wsl_path(start_py)
+    dd = dataset_dir if dataset_dir.startswith("/") else win_to_wsl_path(dataset_dir)
+    ep = win_to_wsl_path(export_path) if export_path else ""
+    cmd = ""
+    if conda_base:
+        py = conda_base.rstrip("/") + f"/envs/{env_name}/bin/python"
+        cmd = f"bash \"{dd}/run_folds.sh\" \"{py}\" \"{sp}\" \"{ep}\""
+
+    return ["wsl", "bash", "-lc", cmd]
+
 def run_stream(cmd: List[str], on_line: Callable[[str], None], stop_event=None) -> int:
     """以流式方式运行命令并逐行回调输出。返回进程退出码。"""
     ansi = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]")
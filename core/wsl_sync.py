@@ -0,0 +1,183 @@
+"""把构建好的数据集同步到 WSL 原生文件系统（ext4），训练时不再经由 9P 读取 `/mnt/<盘符>`。
+
+- 先在 WSL 端列出目标目录已有文件的大小与修改时间，与本地逐一比对；
+- 符号链接（`link_mode="symlink"` 构建的图片）按目标文件的内容作为普通文件发送，远端不出现指向本地路径的链接；
+- 只把新增或变化的文件打成一个流式 tar（边读边写，不落临时文件）经管道送入 WSL 端 `tar -x`，
+  远端的 stderr 在后台线程中读取；
+- 本地已不存在的远端文件随后删除；
+- `dataset_config.yaml`（含 k 折布局下各折的配置）不直接复制，而是按同步后的位置改写 `path` 后单独生成。
+"""
+import os
+import io
+import time
+import yaml
+import shlex
+import tarfile
+import hashlib
+import threading
+import subprocess
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DATASET_YAML = "dataset_config.yaml"
+DEFAULT_STAGE_DIR = "~/onest_datasets"
+# 不同步的本地文件：构建过程中的临时文件
+_SKIP_SUFFIXES = (".tmp",)
+
+def _run_flags() -> int:
+    return getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+def _bash(script: str, wsl_prefix: Sequence[str]) -> List[str]:
+    return [*wsl_prefix, "bash", "-c", script]
+
+def _quote_remote(path: str) -> str:
+    """引用 WSL 端路径；`~/` 开头时展开为 `$HOME`。"""
+    if path == "~":
+        return '"$HOME"'
+    if path.startswith("~/"):
+        return '"$HOME"/' + shlex.quote(path[2:])
+    return shlex.quote(path)
+
+def stage_dir_for(root: str, base: str = DEFAULT_STAGE_DIR) -> str:
+    """为本地数据集目录生成稳定的 WSL 端目录名：`<base>/<目录名>-<路径哈希>`。"""
+    root = os.path.abspath(root)
+    h = hashlib.blake2b(os.path.normcase(root).encode("utf-8"), digest_size=4).hexdigest()
+    return f"{base.rstrip('/')}/{os.path.basename(root.rstrip(os.sep)) or 'dataset'}-{h}"
+
+def _local_tree(root: str) -> Tuple[List[str], Dict[str, os.stat_result], List[str]]:
+    """
+    返回 `(子目录相对路径, {文件相对路径: stat}, 数据集配置相对路径)`；空目录（如未使用的 test 划分）
+    也需要在远端建出，数据集配置不计入文件列表，由调用方改写后发送。
+    stat 跟随符号链接，记录的是目标文件的大小与修改时间；目标已不存在的链接跳过。
+    """
+    dirs, out, yamls = [], {}, []
+    for dirpath, _, files in os.walk(root):
+        if dirpath != root:
+            dirs.append(os.path.relpath(dirpath, root).replace(os.sep, "/"))
+        for name in files:
+            if name.endswith(_SKIP_SUFFIXES):
+                continue
+            p = os.path.join(dirpath, name)
+            rel = os.path.relpath(p, root).replace(os.sep, "/")
+            if name == DATASET_YAML:
+                yamls.append(rel)
+                continue
+            try:
+                out[rel] = os.stat(p)
+            except OSError:
+                continue
+    return dirs, out, yamls
+
+def _remote_listing(dest: str, wsl_prefix: Sequence[str]) -> Tuple[str, Dict[str, Tuple[int, int]]]:
+    """
+    创建并列出远端目录，返回 `(绝对路径, {相对路径: (大小, 整秒修改时间)})`。
+    远端的符号链接（早期同步遗留）一并列出，其大小与本地不符，会被重新发送为普通文件或作为多余文件删除。
+    """
+    script = (f"mkdir -p {_quote_remote(dest)} && cd {_quote_remote(dest)} && printf '%s\\0' \"$PWD\" && "
+              "find . \\( -type f -o -type l \\) -printf '%P\\0%s\\0%T@\\0'")
+    res = subprocess.run(_bash(script, wsl_prefix), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                         creationflags=_run_flags())
+    if res.returncode != 0:
+        raise RuntimeError(f"列出 WSL 目录失败: {res.stderr.decode('utf-8', 'replace').strip()}")
+    parts = res.stdout.split(b"\0")
+    abs_dest = parts[0].decode("utf-8", "surrogateescape")
+    files = {}
+    fields = parts[1:-1]
+    for i in range(0, len(fields) - 2, 3):
+        rel = fields[i].decode("utf-8", "surrogateescape")
+        files[rel] = (int(fields[i + 1]), int(float(fields[i + 2])))
+    return abs_dest, files
+
+def _staged_yaml(root: str, rel: str, abs_dest: str) -> bytes:
+    """改写配置的 `path`；各折配置的 `path` 同样指向数据集根目录。"""
+    with open(os.path.join(root, *rel.split("/")), "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    data["path"] = abs_dest
+    return yaml.safe_dump(data, allow_unicode=True, sort_keys=False).encode("utf-8")
+
+def stage_dataset(root: str, dest: Optional[str] = None,
+                  log_callback: Optional[Callable[[str], None]] = None,
+                  wsl_prefix: Sequence[str] = ("wsl",)) -> Tuple[str, Dict]:
+    """
+    将数据集目录增量同步到 WSL 原生文件系统。
+
+    参数:
+        root (str): 本地（Windows）数据集根目录，需包含 `dataset_config.yaml`。
+        dest (Optional[str]): WSL 端目标目录，支持 `~/` 开头；为空时使用 `stage_dir_for(root)`。
+        log_callback (Optional[Callable[[str], None]]): 日志回调，缺省为 print。
+        wsl_prefix (Sequence[str]): 进入 WSL 的命令前缀；在 Linux 上直接执行时传入空元组。
+
+    返回:
+        Tuple[str, Dict]: `(WSL 端数据集绝对路径, 统计)`；统计含 `sent_files`、`sent_bytes`、
+        `skipped_files`、`skipped_bytes`、`deleted_files` 与 `seconds`。
+    """
+    log = log_callback or print
+    dest = dest or stage_dir_for(root)
+    t0 = time.perf_counter()
+    dirs, local, yamls = _local_tree(root)
+    abs_dest, remote = _remote_listing(dest, wsl_prefix)
+
+    send, skipped_bytes = [], 0
+    for rel, st in local.items():
+        r = remote.get(rel)
+        if r is not None and r[0] == st.st_size and r[1] == int(st.st_mtime):
+            skipped_bytes += st.st_size
+        else:
+            send.append(rel)
+    stale = sorted(set(remote) - set(local) - set(yamls))
+    sent_bytes = sum(local[rel].st_size for rel in send)
+    log(f"同步到 WSL: {abs_dest}，发送 {len(send)} 个文件 ({sent_bytes / 1e6:.1f} MB)，"
+        f"跳过 {len(local) - len(send)} 个已存在文件 ({skipped_bytes / 1e6:.1f} MB)，删除 {len(stale)} 个")
+
+    # 单个流式 tar 经管道送入 WSL 端解包；配置文件按同步位置改写后追加在末尾
+    script = f"cd {_quote_remote(abs_dest)} && tar -xf - --no-same-owner"
+    proc = subprocess.Popen(_bash(script, wsl_prefix), stdin=subprocess.PIPE, stderr=subprocess.PIPE,
+                            creationflags=_run_flags())
+    # 写入 tar 的同时在后台读取 stderr：远端输出大量警告时管道写满，双方会互相阻塞
+    err_chunks: List[bytes] = []
+    reader = threading.Thread(target=lambda: err_chunks.append(proc.stderr.read()), daemon=True)
+    reader.start()
+    try:
+        with tarfile.open(fileobj=proc.stdin, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+            for rel in dirs:
+                info = tarfile.TarInfo(rel)
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                info.mtime = int(time.time())
+                tar.addfile(info)
+            for rel in send:
+                path = os.path.join(root, *rel.split("/"))
+                st = local[rel]
+                # 按跟随链接的 stat 构造普通文件条目（gettarinfo 使用 lstat，会把链接原样打包）
+                info = tarfile.TarInfo(rel)
+                info.size = st.st_size
+                info.mode = st.st_mode & 0o777 or 0o644
+                # 取整秒，与远端比对时的精度一致
+                info.mtime = int(st.st_mtime)
+                with open(path, "rb") as f:
+                    tar.addfile(info, f)
+            for rel in yamls:
+                data = _staged_yaml(root, rel, abs_dest)
+                info = tarfile.TarInfo(rel)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                tar.addfile(info, io.BytesIO(data))
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+    code = proc.wait()
+    reader.join()
+    err = b"".join(err_chunks)
+    if code != 0:
+        raise RuntimeError(f"WSL 端解包失败: {err.decode('utf-8', 'replace').strip()}")
+
+    if stale:
+        script = f"cd {_quote_remote(abs_dest)} && xargs -0 -r rm -f --"
+        subprocess.run(_bash(script, wsl_prefix), input=b"\0".join(s.encode("utf-8", "surrogateescape") for s in stale),
+                       check=True, creationflags=_run_flags())
+
+    stats = {"sent_files": len(send), "sent_bytes": sent_bytes,
+             "skipped_files": len(local) - len(send), "skipped_bytes": skipped_bytes,
+             "deleted_files": len(stale), "seconds": time.perf_counter() - t0}
+    mbps = sent_bytes / 1e6 / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    log(f"同步完成，耗时 {stats['seconds']:.2f}s ({mbps:.1f} MB/s)，跳过已存在 {skipped_bytes / 1e6:.1f} MB")
+    return abs_dest, stats
@@ -1,7 +1,7 @@
 
 from PySide6.QtWidgets import QPushButton,QInputDialog,QLineEdit,QMessageBox
 
-def setup_menu(main_window, on_sys_settings, on_lang_change,btn_cfg:QPushButton):
+def setup_menu(main_window, on_sys_settings, on_lang_change,btn_cfg:QPushButton, on_dataset_store=None):
     mb = main_window.menuBar()
     mb.setStyleSheet("QMenuBar{background:#f8f8f8;border-bottom:1px solid #d0d0d0;} QMenuBar::item{padding:6px 12px;}")
     lang_menu = mb.addMenu("语言")
@@ -14,6 +14,9 @@ def setup_menu(main_window, on_sys_settings, on_lang_change,btn_cfg:QPushButton)
     sys_menu = mb.addMenu("系统设置")
     act_sys = sys_menu.addAction("打开设置")
     act_sys.triggered.connect(on_sys_settings)
+    if on_dataset_store is not None:
+        act_store = sys_menu.addAction("数据集仓库")
+        act_store.triggered.connect(on_dataset_store)
 
     shift_admin_action = mb.addAction("切换用户")
     shift_admin_action.triggered.connect(lambda: on_shift_admin(btn_cfg,shift_admin_action))
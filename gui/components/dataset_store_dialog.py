@@ -0,0 +1,64 @@
+import time
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
+                               QLabel, QMessageBox, QAbstractItemView, QHeaderView)
+from core import dataset_store
+
+class DatasetStoreDialog(QDialog):
+    """数据集仓库管理：列出托管的数据集条目，支持删除选中条目与按预算淘汰。"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("数据集仓库")
+        self.resize(900, 420)
+        root = QVBoxLayout(self)
+        self.lb_summary = QLabel("")
+        root.addWidget(self.lb_summary)
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["条目", "大小", "最近使用", "来源目录"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        root.addWidget(self.table, 1)
+        row = QHBoxLayout()
+        self.btn_refresh = QPushButton("刷新")
+        self.btn_remove = QPushButton("删除选中")
+        self.btn_evict = QPushButton("按预算清理")
+        for b in (self.btn_refresh, self.btn_remove, self.btn_evict):
+            row.addWidget(b)
+        row.addStretch(1)
+        root.addLayout(row)
+        self.btn_refresh.clicked.connect(self._load)
+        self.btn_remove.clicked.connect(self._remove_selected)
+        self.btn_evict.clicked.connect(self._evict)
+        self._load()
+
+    def _load(self):
+        entries = dataset_store.list_entries()
+        self.table.setRowCount(len(entries))
+        for i, m in enumerate(entries):
+            size = int(m.get("size", 0))
+            used = time.strftime("%Y-%m-%d %H:%M", time.localtime(m.get("last_used", 0)))
+            for j, text in enumerate([m["key"], f"{size / 1024 ** 2:.1f} MB", used, dataset_store.entry_src(m)]):
+                self.table.setItem(i, j, QTableWidgetItem(text))
+        total = sum(int(m.get("size", 0)) for m in entries)
+        budget = dataset_store.budget_bytes()
+        budget_text = f"{budget / 1024 ** 3:.1f} GB" if budget else "不限"
+        self.lb_summary.setText(f"目录: {dataset_store.store_dir()}    共 {len(entries)} 个条目，"
+                                f"占用 {total / 1024 ** 3:.2f} GB，预算 {budget_text}")
+
+    def _remove_selected(self):
+        rows = sorted({idx.row() for idx in self.table.selectedIndexes()})
+        if not rows:
+            return
+        keys = [self.table.item(r, 0).text() for r in rows]
+        if QMessageBox.question(self, "确认", f"删除 {len(keys)} 个数据集条目？") != QMessageBox.StandardButton.Yes:
+            return
+        skipped = [k for k in keys if dataset_store.remove(k) == dataset_store.IN_USE]
+        self._load()
+        if skipped:
+            QMessageBox.warning(self, "部分条目未删除",
+                                f"以下 {len(skipped)} 个条目正在训练或同步，已跳过：\n" + "\n".join(skipped))
+
+    def _evict(self):
+        removed = dataset_store.evict()
+        QMessageBox.information(self, "完成", f"已淘汰 {len(removed)} 个条目")
+        self._load()
@@ -2,10 +2,15 @@ from PySide6.QtWidgets import QPushButton
 from PySide6 import QtCore, QtWidgets
 from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QStackedWidget
 from PySide6.QtCore import QThread, Signal,Qt
-from core.dataset_builder import build_yolo_dataset
-from core.wsl_runner import build_train_cmd, run_stream
+from core.dataset_builder import build_yolo_dataset, DATASET_FORMATS
+from core.pipeline import format_event
+from core.wsl_runner import build_train_cmd, build_kfold_cmd, run_stream
+from core.kfold import has_folds
+from core.wsl_sync import stage_dataset, stage_dir_for
+from core import dataset_store
 from gui.pages.monitor_widget import MonitorWidget
 from gui.components.sys_settings_dialog import SystemSettingsDialog as SysSettingsDialog
+from gui.components.dataset_store_dialog import DatasetStoreDialog
 from gui.pages.run_page import RunPageWidget
 from gui.pages.build_page import BuildPageWidget
 from gui.pages.config_page import ConfigPageWidget
@@ -15,7 +20,7 @@ from gui.pages.build_engine_page import BuildEnginePageWidget
 from gui.components.app_menu import setup_menu
 from gui.pages.one_click_page import OneClickPageWidget
 from PySide6.QtGui import QIcon, QPixmap
-from tools.sys_config_tools import get_wsl_config
+from tools.sys_config_tools import get_wsl_config, get_dataset_config
 from tools.sys_config_tools import get_resource_path
 
 
@@ -26,18 +31,46 @@ import shutil
 class LogThread(QThread):
     line = Signal(str)
     done = Signal(int)
-    def __init__(self, cmd):
+    def __init__(self, cmd, prepare=None):
+        """`prepare(log)` 可选，在后台线程中先执行（如同步数据集到 WSL）并返回最终命令。"""
         super().__init__()
         self.cmd = cmd
+        self.prepare = prepare
         self.stop_event = Event()
         
     def run(self):
+        if self.prepare is not None:
+            try:
+                self.cmd = self.prepare(self.line.emit)
+            except Exception as e:
+                self.line.emit(f"训练准备失败: {e}")
+                self.done.emit(-1)
+                return
+            self.line.emit("命令: " + " ".join(self.cmd))
         rc = run_stream(self.cmd, lambda s: self.line.emit(s), stop_event=self.stop_event)
         self.done.emit(rc)
     
     def stop(self):
         self.stop_event.set()
 
+class BuildThread(QThread):
+    """后台构建数据集：流水线事件经信号回到 UI 线程。"""
+    event = Signal(object)
+    done = Signal(str, str)
+    failed = Signal(str)
+    def __init__(self, args: tuple, kwargs: dict):
+        super().__init__()
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            root, yaml_path = build_yolo_dataset(*self.args, event_callback=self.event.emit, **self.kwargs)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(root, yaml_path)
+
 class MainFrame(QMainWindow):
     """主框架：只负责页面路由与信号接线，业务逻辑下沉到各页面或 core 模块。"""
     def __init__(self):
@@ -49,6 +82,7 @@ class MainFrame(QMainWindow):
         self.dataset_root = None 
         self.dataset_yaml = None
         self.log_thread = None
+        self.build_thread = None
         self._is_closing = False
         
     # def _on_page_changed(self, idx):
@@ -77,6 +111,9 @@ class MainFrame(QMainWindow):
 
     def _on_train_done(self, rc: int):
         self._emit_log_to_current(f"训练结束 {rc}")
+        if getattr(self, "_in_use_root", None):
+            dataset_store.release(self._in_use_root)
+            self._in_use_root = None
         self._set_run_button_loading(False)
         self._set_one_button_loading(False)
         try:
@@ -202,7 +239,7 @@ class MainFrame(QMainWindow):
         left_tools_layout.addStretch(1)
 
         #设置菜单
-        setup_menu(self, self._open_sys_settings, self._set_lang,self.btn_cfg)
+        setup_menu(self, self._open_sys_settings, self._set_lang,self.btn_cfg, self._open_dataset_store)
 
         
         #创建一个按钮组，用于管理左侧功能区的按钮，确保只能选中一个
@@ -245,15 +282,44 @@ class MainFrame(QMainWindow):
     
 
 
-    def _on_dataset_built(self, src: str, cls: str, ratios: tuple, out_dir: str, fmt: str, persist: bool = False):
-        # if fmt == "TXT":
-        dataset_root, yaml_path = build_yolo_dataset(src, cls, ratios, persist, out_dir)
-        # elif fmt == "COCO":
-           # dataset_root, yaml_path = build_coco_dataset(src, cls, ratios, persist, out_dir)
-        #    pass
-
+    def _on_dataset_built(self, src: str, cls: str, ratios: tuple, out_dir: str, fmt: str, link_mode: str = "copy", persist: bool = False, on_done=None):
+        """在后台线程构建数据集；完成后回调 on_done(dataset_root, yaml_path)。"""
+        if self.build_thread is not None and self.build_thread.isRunning():
+            self._emit_log_to_current("数据集正在构建中，请稍候。")
+            return
+        build_cfg = get_dataset_config().get("build", {}) or {}
+        kwargs = dict(workers=int(build_cfg.get("workers", 0) or 0),
+                      split_mode=str(build_cfg.get("split_mode", "random") or "random"),
+                      link_mode=link_mode,
+                      imgsz=int(build_cfg.get("imgsz", 0) or 0) or None,
+                      fmt=fmt if fmt in DATASET_FORMATS else "TXT",
+                      on_error=str(build_cfg.get("on_error", "quarantine") or "quarantine"),
+                      size_check=str(build_cfg.get("size_check", "fix") or "fix"),
+                      dedup=str(build_cfg.get("dedup", "off") or "off"),
+                      dedup_distance=int(build_cfg.get("dedup_distance", 4)),
+                      tile_size=int(build_cfg.get("tile_size", 0) or 0) or None,
+                      tile_overlap=float(build_cfg.get("tile_overlap", 0.2)),
+                      tile_min_visibility=float(build_cfg.get("tile_min_visibility", 0.3)),
+                      kfold=int(build_cfg.get("kfold", 0) or 0),
+                      remap=build_cfg.get("remap") or None)
+        self.build_thread = BuildThread((src, cls, ratios, persist, out_dir), kwargs)
+        self.build_thread.event.connect(self._on_build_event)
+        self.build_thread.failed.connect(lambda msg: self._on_build_failed(msg))
+        self.build_thread.done.connect(lambda root, yaml_path: self._on_build_done(root, yaml_path, on_done))
+        self.build_thread.start()
+
+    def _on_build_event(self, event: dict):
+        for line in format_event(event):
+            self._emit_log_to_current(line)
+
+    def _on_build_failed(self, msg: str):
+        self._emit_log_to_current(f"数据集构建失败: {msg}")
+
+    def _on_build_done(self, dataset_root: str, yaml_path: str, on_done=None):
+        self.dataset_root, self.dataset_yaml = dataset_root, yaml_path
         self._emit_log_to_current(f"数据集构建完成 {dataset_root}")
-        return dataset_root, yaml_path
+        if on_done is not None:
+            on_done(dataset_root, yaml_path)
 
 
 
@@ -272,31 +338,46 @@ class MainFrame(QMainWindow):
             QtWidgets.QMessageBox.warning(self, "警告", "获取 Conda 环境路径失败。请检查配置文件是否正确或联系管理员。")
             return
         self._emit_log_to_current(f"conda 环境路径 {conda_base}")
-        cmd = build_train_cmd(export_path,start_py, dataset_root, conda_base=conda_base)
+        if dataset_store.is_store_path(dataset_root):
+            dataset_store.touch(dataset_root)
+            # 训练（及同步到 WSL）期间保护该条目不被其他构建淘汰，训练结束时清除
+            dataset_store.mark_in_use(dataset_root)
+            self._in_use_root = dataset_root
+        # k 折布局的数据集由 run_folds.sh 依次训练各折
+        make_cmd = build_kfold_cmd if has_folds(dataset_root) else build_train_cmd
+        cmd = make_cmd(export_path,start_py, dataset_root, conda_base=conda_base)
+        prepare = None
+        stage_cfg = cfg.get("stage", {}) if isinstance(cfg.get("stage"), dict) else {}
+        if stage_cfg.get("enabled"):
+            # 训练前把数据集增量同步到 WSL 原生文件系统，训练直接读取 ext4 上的副本
+            dest = stage_dir_for(dataset_root, str(stage_cfg.get("dir") or "~/onest_datasets"))
+            def stage_then_cmd(log):
+                staged, _ = stage_dataset(dataset_root, dest, log_callback=log)
+                return make_cmd(export_path, start_py, staged, conda_base=conda_base)
+            prepare = stage_then_cmd
         
         self._emit_log_to_current("启动训练")
         try:
-            self._emit_log_to_current("命令: " + " ".join(cmd))
+            if prepare is None:
+                self._emit_log_to_current("命令: " + " ".join(cmd))
             self._set_one_button_loading(True)
-            self.log_thread = LogThread(cmd)
+            self.log_thread = LogThread(cmd, prepare)
             self.log_thread.line.connect(self._emit_log_to_current)
             self.log_thread.done.connect(self._on_train_done)
             self.log_thread.start()
         except Exception as e:
             self._set_one_button_loading(False)
+            if getattr(self, "_in_use_root", None):
+                dataset_store.release(self._in_use_root)
+                self._in_use_root = None
             return
         
 
         
-    def _on_one_click(self, src: str, cls: str, ratios: tuple, persist: bool, out_dir: str, export_path: str, fmt: str = "TXT"):
-        """处理一键训练请求：构建数据集并启动训练（使用系统配置的 conda 路径回退）。"""
-        # 构建数据集
-        dataset_root, yaml_path = self._on_dataset_built(src, cls, ratios, out_dir, fmt, persist)
-        if persist:
-            self._emit_log_to_current(f"数据集构建完成 {dataset_root}")
-        
-        # 启动训练
-        self._on_run_requested(dataset_root, export_path)
+    def _on_one_click(self, src: str, cls: str, ratios: tuple, persist: bool, out_dir: str, export_path: str, fmt: str = "TXT", link_mode: str = "copy"):
+        """处理一键训练请求：后台构建数据集，完成后启动训练（使用系统配置的 conda 路径回退）。"""
+        self._on_dataset_built(src, cls, ratios, out_dir, fmt, link_mode, persist,
+                               on_done=lambda root, _yaml: self._on_run_requested(root, export_path))
 
 
   
@@ -339,9 +420,19 @@ class MainFrame(QMainWindow):
         dlg = SysSettingsDialog(self, p)
         dlg.exec()
     
+    def _open_dataset_store(self):
+        dlg = DatasetStoreDialog(self)
+        dlg.exec()
+
     def closeEvent(self, e):
         self._is_closing = True
         self.hide()
+        try:
+            if self.build_thread is not None:
+                self.build_thread.event.disconnect()
+                self.build_thread.done.disconnect()
+        except Exception:
+            pass
         try:
             if self.log_thread is not None:
                 try:
@@ -9,7 +9,7 @@ from gui.components.log_panel import LogPanelWidget
 
 class BuildPageWidget(QWidget):
     """数据集构建页：采集构建参数，调用构建函数，发出结果与日志。"""
-    datasetBuilt = Signal(str, str, list, str, str)
+    datasetBuilt = Signal(str, str, list, str, str, str)
     log = Signal(str)
     def __init__(self):
         super().__init__()
@@ -62,8 +62,19 @@ class BuildPageWidget(QWidget):
         self.row_fmt = QWidget(); r3 = QtWidgets.QHBoxLayout(self.row_fmt); r3.setContentsMargins(0,0,0,0); r3.setSpacing(5)
         r3.addWidget(self.lbl_fmt); r3.addWidget(self.cb_fmt, 1)
         r3.addStretch(1)
+
+        # 图片落盘方式：复制 / 硬链接 / 符号链接 / reflink，不支持时构建过程自动回退为复制
+        self.lbl_link = QLabel("图片落盘：")
+        self.cb_link = QComboBox()
+        for text, mode in (("复制", "copy"), ("硬链接", "hardlink"), ("符号链接", "symlink"), ("reflink", "reflink")):
+            self.cb_link.addItem(text, mode)
+        self.cb_link.setCurrentIndex(0)
+        self.cb_link.setFixedWidth(90)
+        self.row_link = QWidget(); r_link = QtWidgets.QHBoxLayout(self.row_link); r_link.setContentsMargins(0,0,0,0); r_link.setSpacing(5)
+        r_link.addWidget(self.lbl_link); r_link.addWidget(self.cb_link, 1)
       
         row_mix.addWidget(self.row_fmt)
+        row_mix.addWidget(self.row_link)
         row_mix.addWidget(self.row_ratio)
         row_mix.addStretch(1)
         root.addWidget(self.row_ratio_fmt_persist)
@@ -161,6 +172,7 @@ class BuildPageWidget(QWidget):
         ratios = (self.sp_train_b.value(), self.sp_val_b.value(), self.sp_test_b.value())
         out_dir = self.ed_out.text().strip() or None
         fmt = self.cb_fmt.currentText().strip()
-        self.datasetBuilt.emit(src, cls, ratios, out_dir, fmt)
+        link_mode = self.cb_link.currentData() or "copy"
+        self.datasetBuilt.emit(src, cls, ratios, out_dir, fmt, link_mode)
         # root, yaml_path = build_yolo_dataset(src, cls, ratios, persist, out_dir)
         self.btn_build.setEnabled(True); self.btn_build.setText("构建数据集")
\ No newline at end of file
@@ -2,25 +2,29 @@ from PySide6 import QtWidgets
 from PySide6.QtCore import Signal, QThread
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                                QLineEdit, QCheckBox, QButtonGroup, 
-                               QFileDialog, QGroupBox, QMessageBox)
+                               QFileDialog, QGroupBox, QMessageBox, QSpinBox)
 from gui.style.ButtonStyleManager import StyledButton
 from gui.style.CheckButtonStyleManager import StyledCheckBox
 from gui.style.RadioButtonStyleManager import StyledRadioButton
-from core.label_processor import LabelProcessor
+from core.label_processor import LabelProcessor, parse_operations
+from tools.sys_config_tools import get_dataset_config
 import os
 
 class ProcessorThread(QThread):
     finished_signal = Signal(bool, str)
 
-    def __init__(self, processor, mode, **kwargs):
+    def __init__(self, processor, mode, workers=1, **kwargs):
         super().__init__()
         self.processor = processor
         self.mode = mode
+        self.workers = workers
         self.kwargs = kwargs
 
     def run(self):
         try:
             success = False
+            # 批量操作的并行线程数，结果与串行一致
+            self.processor.workers = max(1, int(self.workers))
             if self.mode == "delete":
                 success = self.processor.delete_labels(**self.kwargs)
             elif self.mode == "export":
@@ -29,6 +33,17 @@ class ProcessorThread(QThread):
                 success = self.processor.replace_labels(**self.kwargs)
             elif self.mode == "blank":
                 success = self.processor.export_blank_images(**self.kwargs)
+            elif self.mode == "size":
+                success = self.processor.check_image_sizes(**self.kwargs)
+            elif self.mode == "pipeline":
+                success = self.processor.run_pipeline(**self.kwargs)
+            elif self.mode == "counts":
+                counts = self.processor.label_counts()
+                success = bool(counts)
+                if success:
+                    lines = [f"{label}: {shapes} 个标注，{files} 个文件" for label, (files, shapes) in counts.items()]
+                    self.finished_signal.emit(True, "\n".join(lines))
+                    return
             
             msg = "处理完成" if success else "处理失败或被中断"
             self.finished_signal.emit(success, msg)
@@ -77,8 +92,32 @@ class LabelProcessorPageWidget(QWidget):
         self.ck_recursive = StyledCheckBox("递归处理子目录")
         self.ck_recursive.setChecked(True)
         
+        # 标签索引：按文件修改时间增量维护，跳过不包含目标标签的文件
+        self.ck_index = StyledCheckBox("使用标签索引（跳过不含目标标签的文件）")
+        self.ck_index.setChecked(self._config_flag("index"))
+        
+        # 字节预筛：不解析就跳过不含目标标签的文件，其中格式损坏的文件也一并跳过、不再计入错误，默认关闭
+        self.ck_prefilter = StyledCheckBox("字节预筛（更快；不含目标标签的损坏文件不再报错）")
+        self.ck_prefilter.setChecked(self._config_flag("prefilter", False))
+        
+        # 并行线程数
+        row_workers = QWidget()
+        layout_workers = QHBoxLayout(row_workers)
+        layout_workers.setContentsMargins(0, 0, 0, 0)
+        self.lbl_workers = QLabel("并行线程数：")
+        self.sp_workers = QSpinBox()
+        self.sp_workers.setRange(1, 64)
+        self.sp_workers.setValue(self._default_workers())
+        self.sp_workers.setFixedWidth(80)
+        layout_workers.addWidget(self.lbl_workers)
+        layout_workers.addWidget(self.sp_workers)
+        layout_workers.addStretch()
+        
         layout_source.addWidget(row_src)
         layout_source.addWidget(self.ck_recursive)
+        layout_source.addWidget(self.ck_index)
+        layout_source.addWidget(self.ck_prefilter)
+        layout_source.addWidget(row_workers)
         
         root.addWidget(self.gb_source)
 
@@ -97,12 +136,18 @@ class LabelProcessorPageWidget(QWidget):
         self.rb_export = StyledRadioButton("导出标签")
         self.rb_replace = StyledRadioButton("替换标签")
         self.rb_blank = StyledRadioButton("导出空白图")
+        self.rb_size = StyledRadioButton("核对尺寸")
+        self.rb_pipeline = StyledRadioButton("组合处理")
+        self.rb_counts = StyledRadioButton("标签统计")
         
         
         self.bg_mode.addButton(self.rb_delete, 0)
         self.bg_mode.addButton(self.rb_export, 1)
         self.bg_mode.addButton(self.rb_replace, 2)
         self.bg_mode.addButton(self.rb_blank, 3)
+        self.bg_mode.addButton(self.rb_size, 4)
+        self.bg_mode.addButton(self.rb_pipeline, 5)
+        self.bg_mode.addButton(self.rb_counts, 6)
         
         self.rb_delete.setChecked(True)
         
@@ -110,6 +155,9 @@ class LabelProcessorPageWidget(QWidget):
         layout_radios.addWidget(self.rb_export)
         layout_radios.addWidget(self.rb_replace)
         layout_radios.addWidget(self.rb_blank)
+        layout_radios.addWidget(self.rb_size)
+        layout_radios.addWidget(self.rb_pipeline)
+        layout_radios.addWidget(self.rb_counts)
         layout_radios.setSpacing(5)
         layout_radios.addStretch()
         
@@ -168,8 +216,23 @@ class LabelProcessorPageWidget(QWidget):
         layout_replace.addWidget(self.ed_new)
         layout_labels.addWidget(self.row_replace_labels)
         
+        # 组合处理的操作序列
+        self.row_ops = QWidget()
+        layout_ops = QHBoxLayout(self.row_ops)
+        layout_ops.setContentsMargins(0, 0, 0, 0)
+        self.lbl_ops = QLabel("操作序列：")
+        self.ed_ops = QLineEdit()
+        self.ed_ops.setPlaceholderText("例如: delete a,b; replace 旧=新; filter c; export")
+        layout_ops.addWidget(self.lbl_ops)
+        layout_ops.addWidget(self.ed_ops)
+        layout_labels.addWidget(self.row_ops)
+        
         layout_params.addWidget(self.gb_labels)
         
+        # 尺寸核对选项
+        self.ck_size_fix = StyledCheckBox("自动修正等比缩放的标注")
+        layout_params.addWidget(self.ck_size_fix)
+        
         # 备份选项 (删除/替换)
         self.ck_backup = StyledCheckBox("备份原文件")
         self.ck_backup.stateChanged.connect(self._update_ui_state)
@@ -219,31 +282,37 @@ class LabelProcessorPageWidget(QWidget):
 
     def _update_ui_state(self):
         mode = self.bg_mode.checkedId()
-        # 0: delete, 1: export, 2: replace, 3: blank
+        # 0: delete, 1: export, 2: replace, 3: blank, 4: size, 5: pipeline, 6: counts
 
-        # 输出目录显示
-        self.row_out.setVisible(mode in [1, 3])
+        # 输出目录显示（组合处理中 export 未指定目录时使用）
+        self.row_out.setVisible(mode in [1, 3, 5])
         
         # 备份目录显示
         self.row_backup.setVisible(self.ck_backup.isChecked())
 
         # 标签设置显示
-        if mode == 3: # blank
+        if mode in [3, 4, 6]: # blank, size, counts
             self.gb_labels.setVisible(False)
         else:
             self.gb_labels.setVisible(True)
+            self.row_ops.setVisible(mode == 5)
             if mode == 2: # replace
                 self.row_target_labels.setVisible(False)
                 self.row_replace_labels.setVisible(True)
+            elif mode == 5: # pipeline
+                self.row_target_labels.setVisible(False)
+                self.row_replace_labels.setVisible(False)
             else: # delete, export
                 self.row_target_labels.setVisible(True)
                 self.row_replace_labels.setVisible(False)
         
-        # 备份选项显示 (仅删除和替换可用)
-        self.ck_backup.setVisible(mode in [0, 2])
-        if mode not in [0, 2]:
+        self.ck_size_fix.setVisible(mode == 4)
+
+        # 备份选项显示 (仅删除、替换、尺寸核对和组合处理可用)
+        self.ck_backup.setVisible(mode in [0, 2, 4, 5])
+        if mode not in [0, 2, 4, 5]:
              self.row_backup.setVisible(False)
-        elif mode in [0, 2] and self.ck_backup.isChecked():
+        elif mode in [0, 2, 4, 5] and self.ck_backup.isChecked():
              self.row_backup.setVisible(True)
 
         # 功能说明更新
@@ -251,10 +320,29 @@ class LabelProcessorPageWidget(QWidget):
             0: "• 删除JSON文件中指定名称的标签\n• 如果删除后JSON文件没有其他标签，则删除整个JSON文件\n• 支持同时删除多个标签 (用逗号分隔)\n• 可选择是否备份原文件",
             1: "• 导出包含指定标签的JSON文件和对应图片\n• 将匹配的文件复制到指定的输出目录\n• 支持同时匹配多个标签 (用逗号分隔)\n• 自动查找同名的图片文件",
             2: "• 将JSON文件中的指定标签名称替换为新名称\n• 精确匹配标签名称进行替换\n• 可选择是否备份原文件\n• 批量处理所有匹配的文件",
-            3: "• 导出没有JSON文件或JSON文件为空的图片\n• 将符合条件的图片复制到指定的输出目录\n• 支持常见图片格式 (jpg, png, bmp等)\n• 自动保持目录结构"
+            3: "• 导出没有JSON文件或JSON文件为空的图片\n• 将符合条件的图片复制到指定的输出目录\n• 支持常见图片格式 (jpg, png, bmp等)\n• 自动保持目录结构",
+            4: "• 比对JSON记录的imageWidth/imageHeight与图片真实尺寸\n• 只读取图片文件头，结果按修改时间缓存\n• 可自动修正等比缩放过的图片（按比例缩放标注点）\n• 旋转或宽高比变化的文件记入错误列表",
+            5: "• 按顺序执行多个操作，用分号分隔：delete 标签,…; replace 旧=新; filter 标签,…; export [目录]\n• 每个文件只读取一次，全部操作在内存中完成后只写回一次\n• filter 不匹配的文件跳过后续操作；export 导出执行到该步时的内容\n• export 省略目录时使用上方的输出目录",
+            6: "• 统计各标签的标注数量与所在文件数\n• 基于标签索引，只解析新增或修改过的JSON文件\n• 结果按标注数量从多到少排列"
         }
         self.lbl_desc.setText(descs.get(mode, ""))
 
+    @staticmethod
+    def _default_workers() -> int:
+        try:
+            cfg = get_dataset_config().get("label_processor", {}) or {}
+            return max(1, min(64, int(cfg.get("workers", 8) or 1)))
+        except Exception:
+            return 8
+
+    @staticmethod
+    def _config_flag(key: str, default: bool = True) -> bool:
+        try:
+            cfg = get_dataset_config().get("label_processor", {}) or {}
+            return bool(cfg.get(key, default))
+        except Exception:
+            return default
+
     def _pick_src(self):
         d = QFileDialog.getExistingDirectory(self, "选择处理目录")
         if d:
@@ -282,7 +370,7 @@ class LabelProcessorPageWidget(QWidget):
         mode_str = ""
 
         # 初始化处理器
-        backup_enabled = self.ck_backup.isChecked() if mode in [0, 2] else False
+        backup_enabled = self.ck_backup.isChecked() if mode in [0, 2, 4, 5] else False
         backup_dir = self.ed_backup.text().strip() if backup_enabled else ""
         
         if backup_enabled and not backup_dir:
@@ -293,7 +381,9 @@ class LabelProcessorPageWidget(QWidget):
             source_dir=src_dir,
             recursive=self.ck_recursive.isChecked(),
             backup_enabled=backup_enabled,
-            backup_dir=backup_dir
+            backup_dir=backup_dir,
+            use_index=self.ck_index.isChecked(),
+            prefilter=self.ck_prefilter.isChecked()
         )
 
         if mode == 0: # delete
@@ -335,8 +425,27 @@ class LabelProcessorPageWidget(QWidget):
                 return
             kwargs['output_dir'] = out_dir
 
+        elif mode == 4: # size
+            mode_str = "size"
+            kwargs['fix'] = self.ck_size_fix.isChecked()
+
+        elif mode == 5: # pipeline
+            mode_str = "pipeline"
+            try:
+                operations = parse_operations(self.ed_ops.text(), self.ed_out.text().strip())
+            except ValueError as e:
+                QMessageBox.warning(self, "错误", f"操作序列有误：{e}")
+                return
+            if not operations:
+                QMessageBox.warning(self, "错误", "请输入操作序列！")
+                return
+            kwargs['operations'] = operations
+
+        elif mode == 6: # counts
+            mode_str = "counts"
+
         # 启动线程
-        self.processor_thread = ProcessorThread(self.processor, mode_str, **kwargs)
+        self.processor_thread = ProcessorThread(self.processor, mode_str, workers=self.sp_workers.value(), **kwargs)
         # 不再连接日志信号
         self.processor_thread.finished_signal.connect(self._on_process_finished)
         
@@ -353,7 +462,9 @@ class LabelProcessorPageWidget(QWidget):
         self.gb_source.setEnabled(True) # 恢复输入
         self.gb_func.setEnabled(True)
         
-        if success:
+        if success and self.processor_thread.mode == "counts":
+            QMessageBox.information(self, "标签统计", msg)
+        elif success:
             QMessageBox.information(self, "提示", "操作已完成！")
         else:
             QMessageBox.critical(self, "错误", f"操作失败：{msg}")
@@ -8,7 +8,7 @@ from gui.components.log_panel import LogPanelWidget
 
 
 class OneClickPageWidget(QWidget):
-    oneClickRequested = Signal(str, str, tuple, bool, object, str, str)
+    oneClickRequested = Signal(str, str, tuple, bool, object, str, str, str)
     stopRequested = Signal() # 新增停止信号
     def __init__(self):
         super().__init__()
@@ -61,6 +61,16 @@ class OneClickPageWidget(QWidget):
         self.row_fmt = QWidget(); r3 = QtWidgets.QHBoxLayout(self.row_fmt); r3.setContentsMargins(0,0,0,0); r3.setSpacing(5)
         r3.addWidget(self.lbl_fmt); r3.addWidget(self.cb_fmt, 1)
         r3.addStretch(1)
+
+        # 图片落盘方式：复制 / 硬链接 / 符号链接 / reflink，不支持时构建过程自动回退为复制
+        self.lbl_link = QLabel("图片落盘：")
+        self.cb_link = QComboBox()
+        for text, mode in (("复制", "copy"), ("硬链接", "hardlink"), ("符号链接", "symlink"), ("reflink", "reflink")):
+            self.cb_link.addItem(text, mode)
+        self.cb_link.setCurrentIndex(0)
+        self.cb_link.setFixedWidth(90)
+        self.row_link = QWidget(); r_link = QtWidgets.QHBoxLayout(self.row_link); r_link.setContentsMargins(0,0,0,0); r_link.setSpacing(5)
+        r_link.addWidget(self.lbl_link); r_link.addWidget(self.cb_link, 1)
       
 
         # 持久化数据集布局
@@ -70,6 +80,7 @@ class OneClickPageWidget(QWidget):
 
         row_mix.addWidget(self.row_persist)
         row_mix.addWidget(self.row_fmt)
+        row_mix.addWidget(self.row_link)
         row_mix.addWidget(self.row_ratio)
         row_mix.addStretch(1)
         root.addWidget(self.row_ratio_fmt_persist)
@@ -204,7 +215,8 @@ class OneClickPageWidget(QWidget):
         out_dir = self.ed_out.text().strip() or None
         out_src = self.ed_out_src.text().strip()
         fmt = self.cb_fmt.currentText()
-        self.oneClickRequested.emit(src, cls, ratios, persist, out_dir,out_src,fmt)
+        link_mode = self.cb_link.currentData() or "copy"
+        self.oneClickRequested.emit(src, cls, ratios, persist, out_dir,out_src,fmt, link_mode)
 
    
 
@@ -7,6 +7,7 @@ from core.monitor import shutdown as monitor_shutdown
 from tools.sys_config_tools import get_resource_path
 import os
 import ctypes
+import multiprocessing
 
 """
 本文件负责应用入口、管理员权限自提升以及隐藏控制台窗口：
@@ -77,4 +78,6 @@ if __name__ == "__main__":
     # 入口：如非管理员则尝试自提升；已提升或带标记时直接进入主流程
     # if "--elevated" not in sys.argv:
     #     _ensure_admin()
+    # 数据集构建使用进程池，打包后的 exe 需要在子进程中拦截启动参数
+    multiprocessing.freeze_support()
     main()
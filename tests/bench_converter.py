@@ -0,0 +1,77 @@
+"""LabelMe -> YOLO 转换基准：对比逐框实现与向量化批量实现（10 万个矩形框）。
+
+用法：python tests/bench_converter.py [shape 数量]
+"""
+import os
+import sys
+import time
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.dataset_converter import build_class_index, shapes_to_yolo_batch, yolo_text
+
+REPEAT = 3
+CLASSES = ["scratch", "dent", "划痕", "stain", "crack", "burr", "chip", "pit"]
+
+def make_datas(n_shapes: int, per_file: int = 20, seed: int = 0):
+    rnd = random.Random(seed)
+    datas = []
+    left = n_shapes
+    while left > 0:
+        k = min(per_file, left)
+        w, h = rnd.choice([(640, 480), (1920, 1080), (4000, 3000)])
+        shapes = []
+        for j in range(k):
+            x1, y1, x2, y2 = rnd.uniform(0, w), rnd.uniform(0, h), rnd.uniform(0, w), rnd.uniform(0, h)
+            if j % 3 == 0:
+                x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+            shapes.append({"label": rnd.choice(CLASSES), "points": [[x1, y1], [x2, y2]], "shape_type": "rectangle"})
+        datas.append({"shapes": shapes, "imageWidth": w, "imageHeight": h})
+        left -= k
+    return datas
+
+def legacy_lines(data, classes):
+    """变更前的逐框实现（`classes.index` + Python min/max + 逐行格式化）。"""
+    iw = int(data.get("imageWidth"))
+    ih = int(data.get("imageHeight"))
+    lines = []
+    for s in data.get("shapes", []):
+        if s.get("shape_type") != "rectangle":
+            continue
+        label = s.get("label")
+        if label not in classes:
+            raise ValueError(f"label not in classes: {label}")
+        cls_idx = classes.index(label)
+        points = s.get("points", [])
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        x_min, x_max, y_min, y_max = min(xs), max(xs), min(ys), max(ys)
+        x = ((x_min + x_max) / 2.0) / float(iw)
+        y = ((y_min + y_max) / 2.0) / float(ih)
+        w = (x_max - x_min) / float(iw)
+        h = (y_max - y_min) / float(ih)
+        lines.append(f"{cls_idx} {x:.6f} {y:.6f} {w:.6f} {h:.6f}")
+    return lines
+
+def main():
+    n_shapes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    datas = make_datas(n_shapes)
+
+    t_legacy = t_fast = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        legacy = ["".join(ln + "\n" for ln in legacy_lines(d, CLASSES)) for d in datas]
+        t_legacy = min(t_legacy, time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        index = build_class_index(CLASSES)
+        fast = [yolo_text(cls, boxes) for cls, boxes in shapes_to_yolo_batch(datas, index)]
+        t_fast = min(t_fast, time.perf_counter() - t0)
+
+    assert legacy == fast, "向量化输出与逐框实现不一致"
+    print(f"shapes: {n_shapes}, files: {len(datas)}")
+    print(f"legacy:     {t_legacy:.3f}s (best of {REPEAT})")
+    print(f"vectorized: {t_fast:.3f}s")
+    print(f"speedup:    {t_legacy / max(t_fast, 1e-9):.2f}x (输出逐字节一致)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""脚本式测试共用的 LabelMe 数据生成（随机矩形框 + 随机字节“图片”，不依赖真实图像）。"""
+import os
+import json
+import random
+
+CLASSES = ("a", "b", "划痕")
+
+def make_labelme(root: str, n: int = 60, classes=CLASSES, subdirs: int = 3, seed: int = 0) -> str:
+    """在 `root` 下生成 `n` 对 `img<i>.jpg`/`img<i>.json`，分散在 `subdirs` 个子目录中；返回 classes.txt 路径。"""
+    rnd = random.Random(seed)
+    for i in range(n):
+        d = os.path.join(root, f"d{i % subdirs}")
+        os.makedirs(d, exist_ok=True)
+        w, h = rnd.choice([(640, 480), (1920, 1080), (800, 600)])
+        shapes = []
+        for _ in range(rnd.randint(1, 4)):
+            x1, y1, x2, y2 = rnd.uniform(0, w), rnd.uniform(0, h), rnd.uniform(0, w), rnd.uniform(0, h)
+            shapes.append({"label": rnd.choice(classes), "points": [[x1, y1], [x2, y2]], "shape_type": "rectangle"})
+        data = {"version": "5.0", "shapes": shapes, "imagePath": f"img{i}.jpg", "imageData": None,
+                "imageHeight": h, "imageWidth": w}
+        with open(os.path.join(d, f"img{i}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=bool(i % 2), indent=2)
+        with open(os.path.join(d, f"img{i}.jpg"), "wb") as f:
+            f.write(rnd.randbytes(rnd.randint(500, 2000)))
+    classes_path = os.path.join(root, "classes.txt")
+    with open(classes_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(classes))
+    return classes_path
@@ -0,0 +1,89 @@
+"""增量构建清单：plan_item 对新增、仅时间变化、内容变化、输出缺失的判定，以及构建在增删改后的复用统计。"""
+import os
+import sys
+import json
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.build_manifest import REUSE, VERIFY, BUILD, plan_item, source_signature, content_hash, load_manifest
+from core.dataset_builder import build_yolo_dataset
+from fixtures import make_labelme
+
+def touch(path, delta=5):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + delta * 10 ** 9))
+
+def build(src, classes, out):
+    events = []
+    build_yolo_dataset(src, classes, (7, 2, 1), True, out, split_mode="hash", size_check="off",
+                       log_callback=lambda *_: None, event_callback=events.append)
+    done = [e for e in events if e.get("kind") == "done"]
+    assert len(done) == 1
+    return done[0]["summary"]
+
+with tempfile.TemporaryDirectory() as tmp:
+    # plan_item 单元判定
+    img, js = os.path.join(tmp, "x.jpg"), os.path.join(tmp, "x.json")
+    for p, data in ((img, b"img"), (js, b"{}")):
+        with open(p, "wb") as f:
+            f.write(data)
+    os.makedirs(os.path.join(tmp, "images"))
+    os.makedirs(os.path.join(tmp, "labels"))
+    for p in ("images/x.jpg", "labels/x.txt"):
+        open(os.path.join(tmp, p), "w").close()
+    prev = dict(source_signature(img, js), image="images/x.jpg", label="labels/x.txt")
+    cur = dict(prev)
+    assert plan_item(None, cur, tmp) == BUILD
+    assert plan_item(prev, cur, tmp) == REUSE
+    h = content_hash(img, js)
+    touch(js)
+    cur = dict(source_signature(img, js), image="images/x.jpg", label="labels/x.txt")
+    assert plan_item(prev, cur, tmp) == VERIFY and content_hash(img, js) == h
+    with open(js, "wb") as f:
+        f.write(b'{"x": 1}')
+    assert content_hash(img, js) != h
+    assert plan_item(prev, dict(cur, image="images/y.jpg"), tmp) == BUILD
+    os.remove(os.path.join(tmp, "labels/x.txt"))
+    assert plan_item(prev, dict(prev), tmp) == BUILD
+
+    # 构建级（hash 划分，增删样本不改变其他样本的子集）：首次全部新增，再次全部复用
+    src, out = os.path.join(tmp, "src"), os.path.join(tmp, "out")
+    classes = make_labelme(src, n=40)
+    s = build(src, classes, out)
+    assert (s["reused"], s["updated"], s["new"], s["removed"]) == (0, 40, 40, 0), s
+    items = load_manifest(out)["items"]
+    assert len(items) == 40
+    s = build(src, classes, out)
+    assert (s["reused"], s["updated"], s["new"], s["removed"]) == (40, 0, 0, 0), s
+
+    # 仅修改时间变化：内容哈希一致，仍复用
+    touch(os.path.join(src, "d0", "img0.json"))
+    touch(os.path.join(src, "d1", "img1.jpg"))
+    s = build(src, classes, out)
+    assert (s["reused"], s["updated"], s["new"], s["removed"]) == (40, 0, 0, 0), s
+
+    # 内容变化、新增、删除
+    p = os.path.join(src, "d2", "img2.json")
+    with open(p, encoding="utf-8") as f:
+        data = json.load(f)
+    data["shapes"] = data["shapes"][:1]
+    with open(p, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    for ext in (".json", ".jpg"):
+        os.rename(os.path.join(src, "d0", "img3" + ext), os.path.join(src, "d0", "img_new" + ext))
+    for ext in (".json", ".jpg"):
+        os.remove(os.path.join(src, "d1", "img4" + ext))
+    s = build(src, classes, out)
+    assert (s["reused"], s["updated"], s["new"], s["removed"]) == (37, 2, 1, 2), s
+    assert len(load_manifest(out)["items"]) == 39
+    n_img = sum(len(fs) for _, _, fs in os.walk(os.path.join(out, "images")))
+    n_txt = sum(len(fs) for _, _, fs in os.walk(os.path.join(out, "labels")))
+    assert n_img == n_txt == 39, (n_img, n_txt)
+
+    # 删除输出文件后重新生成
+    rel = next(iter(load_manifest(out)["items"].values()))["label"]
+    os.remove(os.path.join(out, rel))
+    s = build(src, classes, out)
+    assert (s["reused"], s["updated"], s["new"], s["removed"]) == (38, 1, 0, 0), s
+    assert os.path.exists(os.path.join(out, rel))
+
+print("ok")
@@ -0,0 +1,97 @@
+"""容错构建：有问题的标注对隔离到 quarantine/ 下各自的来源相对路径（同名文件不互相覆盖），其余样本照常构建；
+严格模式在落盘前失败，已有的构建结果保持不变，问题同样写入 build_report.json。"""
+import os
+import sys
+import json
+import shutil
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.dataset_builder import build_yolo_dataset
+from core.build_report import REPORT_NAME, QUARANTINE_DIR
+from fixtures import make_labelme
+
+def add_bad(src, sub, stem, data):
+    d = os.path.join(src, sub)
+    os.makedirs(d, exist_ok=True)
+    with open(os.path.join(d, stem + ".jpg"), "wb") as f:
+        f.write(f"{sub}/{stem}".encode("utf-8"))
+    with open(os.path.join(d, stem + ".json"), "w", encoding="utf-8") as f:
+        f.write(data if isinstance(data, str) else json.dumps(data))
+
+def build(src, out, **kw):
+    events = []
+    build_yolo_dataset(src, classes, (7, 2, 1), True, out, size_check="off", log_callback=lambda *_: None,
+                       event_callback=events.append, **kw)
+    return [e for e in events if e.get("kind") == "done"][0]["summary"]
+
+def files(root, sub=""):
+    base = os.path.join(root, sub)
+    return sorted(os.path.relpath(os.path.join(dp, n), base).replace(os.sep, "/")
+                  for dp, _, fs in os.walk(base) for n in fs)
+
+def snapshot(root):
+    out = {}
+    for rel in files(root):
+        with open(os.path.join(root, rel), "rb") as f:
+            out[rel] = (f.read(), os.stat(os.path.join(root, rel)).st_mtime_ns)
+    return out
+
+unknown = {"shapes": [{"label": "zzz", "points": [[0, 0], [5, 5]], "shape_type": "rectangle"}],
+           "imageWidth": 640, "imageHeight": 480, "imagePath": "dup.jpg"}
+with tempfile.TemporaryDirectory() as tmp:
+    src = os.path.join(tmp, "src")
+    classes = make_labelme(src, n=30)
+    clean = os.path.join(tmp, "clean")
+    shutil.copytree(src, clean)
+    # 两个子目录中的同名问题文件，以及一个格式损坏的 JSON
+    add_bad(src, "d0", "dup", unknown)
+    add_bad(src, "d1", "dup", unknown)
+    add_bad(src, "d2", "broken", '{"shapes": [')
+
+    out = os.path.join(tmp, "out")
+    summary = build(src, out)
+    assert summary["quarantined"] == 3, summary
+    assert files(out, QUARANTINE_DIR) == ["d0/dup.jpg", "d0/dup.json", "d1/dup.jpg", "d1/dup.json",
+                                          "d2/broken.jpg", "d2/broken.json"]
+    with open(os.path.join(out, QUARANTINE_DIR, "d1", "dup.jpg"), "rb") as f:
+        assert f.read() == b"d1/dup"
+    with open(os.path.join(out, REPORT_NAME), encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["mode"] == "quarantine" and report["quarantined_count"] == 3
+    assert sorted(p for q in report["quarantined"] for p in q["quarantine"]) == \
+        [f"{QUARANTINE_DIR}/{p}" for p in files(out, QUARANTINE_DIR)]
+    assert all(os.path.exists(os.path.join(out, p)) for q in report["quarantined"] for p in q["quarantine"])
+    assert len(files(out, "images")) == len(files(out, "labels")) == 30
+    assert not [p for p in files(out, "images") if "dup" in p or "broken" in p]
+
+    # 多来源：以来源目录名为第一级
+    out2 = os.path.join(tmp, "out2")
+    build([os.path.join(src, "d0"), os.path.join(src, "d1")], out2)
+    assert files(out2, QUARANTINE_DIR) == ["d0/dup.jpg", "d0/dup.json", "d1/dup.jpg", "d1/dup.json"]
+
+    # 问题修复后重新构建：隔离区清空
+    for sub, stem in (("d0", "dup"), ("d1", "dup"), ("d2", "broken")):
+        for ext in (".jpg", ".json"):
+            os.remove(os.path.join(src, sub, stem + ext))
+    assert build(src, out)["quarantined"] == 0
+    assert not os.path.exists(os.path.join(out, QUARANTINE_DIR)) or not files(out, QUARANTINE_DIR)
+
+    # 严格模式：在落盘前失败，已有构建不变，报告写出
+    strict_out = os.path.join(tmp, "strict")
+    build(clean, strict_out)
+    before = snapshot(strict_out)
+    add_bad(clean, "d0", "dup", unknown)
+    try:
+        build(clean, strict_out, on_error="strict", workers=2)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("strict build did not fail")
+    after = snapshot(strict_out)
+    assert {k: v for k, v in after.items() if k != REPORT_NAME} == {k: v for k, v in before.items() if k != REPORT_NAME}
+    with open(os.path.join(strict_out, REPORT_NAME), encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["mode"] == "strict" and report["quarantined_count"] == 1 and report["problem_count"] >= 1
+    assert "quarantine" not in report["quarantined"][0]
+
+print("ok")
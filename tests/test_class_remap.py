@@ -0,0 +1,35 @@
+"""类别映射：精确 -> 忽略大小写 -> 正则的查找顺序，未命中保留原名，非法规则报错。"""
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.class_remap import ClassRemap, resolve_remap
+
+remap = ClassRemap([
+    {"from": "scratch", "to": "划痕"},
+    {"from": "SCRATCH", "to": "凹坑", "ignore_case": True},
+    {"regex": r"^dent[_-]?(\d*)$", "to": r"凹坑\1"},
+])
+assert remap.map("scratch") == "划痕"
+assert remap.map("Scratch") == "凹坑"
+assert remap.map("dent_3") == "凹坑3" and remap.map("dent") == "凹坑"
+assert remap.map("xdent") == "xdent" and remap.map("其他") == "其他"
+assert remap.map(None) is None
+assert len(remap) == 3
+
+index = remap.class_index({"划痕": 0, "凹坑": 1})
+assert index.get("scratch") == 0 and index.get("SCRATCH") == 1 and index.get("x", -1) == -1
+assert "dent" in index and "x" not in index
+assert ClassRemap(remap.to_list()).to_list() == remap.to_list()
+
+for bad in ({"to": "x"}, {"from": "a", "regex": "b", "to": "x"}, {"from": "a"}, "a"):
+    try:
+        ClassRemap([bad])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError(bad)
+
+assert resolve_remap(None) is None and resolve_remap("  ") is None and resolve_remap(ClassRemap([])) is None
+assert resolve_remap(remap) is remap
+
+print("ok")
@@ -0,0 +1,74 @@
+"""COCO 导出：各划分写出合法的 COCO JSON，编号连续且引用正确，bbox 与 YOLO 标签换算一致，
+`file_name` 相对划分图片目录；切回 TXT 构建时删除 annotations/。"""
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.coco_export import CocoWriter, ANNOTATION_DIR
+from core.build_manifest import load_manifest
+from core.dataset_builder import build_yolo_dataset
+from fixtures import make_labelme, CLASSES
+
+with tempfile.TemporaryDirectory() as tmp:
+    # 单元：像素换算与编号
+    writer = CocoWriter(tmp, ["a", "b"], ["train", "val"])
+    writer.add("train", "images/train/x/1.jpg", (100, 200), np.array([1, 0]),
+               np.array([[0.5, 0.5, 0.5, 0.2], [0.1, 0.2, 0.2, 0.4]]))
+    writer.add("train", "images/train/2.jpg", (50, 50), np.zeros(0, np.int32), np.zeros((0, 4)))
+    writer.add("train", "images/train/y/1.jpg", (10, 10), np.array([0]), np.array([[0.5, 0.5, 1.0, 1.0]]))
+    assert writer.counts() == {"train": (3, 3), "val": (0, 0)}
+    paths = writer.commit()
+    assert not [n for n in os.listdir(os.path.join(tmp, ANNOTATION_DIR)) if n.startswith(".coco_") or n.endswith(".tmp")]
+    with open(paths["val"], encoding="utf-8") as f:
+        val = json.load(f)
+    assert val["images"] == [] and val["annotations"] == []
+    with open(paths["train"], encoding="utf-8") as f:
+        coco = json.load(f)
+    assert coco["categories"] == [{"id": 1, "name": "a", "supercategory": ""}, {"id": 2, "name": "b", "supercategory": ""}]
+    assert [(i["id"], i["file_name"], i["width"], i["height"]) for i in coco["images"]] == \
+        [(1, "x/1.jpg", 200, 100), (2, "2.jpg", 50, 50), (3, "y/1.jpg", 10, 10)]
+    anns = [(a["id"], a["image_id"], a["category_id"], a["bbox"], a["area"]) for a in coco["annotations"]]
+    assert anns == [(1, 1, 2, [50.0, 40.0, 100.0, 20.0], 2000.0), (2, 1, 1, [0.0, 0.0, 40.0, 40.0], 1600.0),
+                    (3, 3, 1, [0.0, 0.0, 10.0, 10.0], 100.0)], anns
+
+    # 构建：每个划分的图片与标注数和落盘结果一致，bbox 与 YOLO 标签一致
+    src, out = os.path.join(tmp, "src"), os.path.join(tmp, "out")
+    classes = make_labelme(src, n=40)
+    build_yolo_dataset(src, classes, (7, 2, 1), True, out, fmt="COCO", size_check="off", log_callback=lambda *_: None)
+    total = 0
+    for split in ("train", "val", "test"):
+        with open(os.path.join(out, ANNOTATION_DIR, f"instances_{split}.json"), encoding="utf-8") as f:
+            coco = json.load(f)
+        assert [c["name"] for c in coco["categories"]] == list(CLASSES)
+        images = {i["id"]: i for i in coco["images"]}
+        assert sorted(images) == list(range(1, len(images) + 1))
+        assert [a["id"] for a in coco["annotations"]] == list(range(1, len(coco["annotations"]) + 1))
+        on_disk = sorted(os.path.relpath(os.path.join(dp, n), os.path.join(out, "images", split)).replace(os.sep, "/")
+                         for dp, _, fs in os.walk(os.path.join(out, "images", split)) for n in fs)
+        assert sorted(i["file_name"] for i in images.values()) == on_disk
+        by_image = {}
+        for a in coco["annotations"]:
+            assert a["image_id"] in images and 1 <= a["category_id"] <= len(CLASSES)
+            by_image.setdefault(a["image_id"], []).append(a)
+        for image_id, img in images.items():
+            label = os.path.join(out, "labels", split, os.path.splitext(img["file_name"])[0] + ".txt")
+            with open(label, encoding="utf-8") as f:
+                rows = [list(map(float, line.split())) for line in f if line.strip()]
+            got = by_image.get(image_id, [])
+            assert len(got) == len(rows)
+            w, h = img["width"], img["height"]
+            for a, (c, xc, yc, bw, bh) in zip(got, rows):
+                assert a["category_id"] == int(c) + 1
+                assert np.allclose(a["bbox"], [(xc - bw / 2) * w, (yc - bh / 2) * h, bw * w, bh * h], atol=0.02), (a, rows)
+        total += len(images)
+    assert total == 40
+    assert load_manifest(out)["params"]["fmt"] == "COCO"
+
+    # 切回 TXT：annotations/ 被删除，参数中记录格式
+    build_yolo_dataset(src, classes, (7, 2, 1), True, out, size_check="off", log_callback=lambda *_: None)
+    assert not os.path.exists(os.path.join(out, ANNOTATION_DIR))
+    assert "fmt" not in load_manifest(out)["params"]
+
+print("ok")
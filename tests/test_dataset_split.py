@@ -0,0 +1,49 @@
+"""数据集划分：random 模式与原实现逐位一致；hash 模式稳定且新增样本不改变已有归属；分组与 k 折不拆散样本组。"""
+import os
+import sys
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.dataset_split import assign_splits, group_assignment, fold_assignment, hash_split
+
+def baseline_split_indices(n, ratios, seed):
+    """变更前 `dataset_builder._split_indices` 的实现（全局 random.seed 后打乱）。"""
+    random.seed(seed)
+    a, b, c = ratios
+    total = a + b + c
+    idxs = list(range(n))
+    random.shuffle(idxs)
+    n_train = round(n * a / total)
+    n_val = round(n * b / total)
+    return idxs[:n_train], idxs[n_train:n_train + n_val], idxs[n_train + n_val:]
+
+for n, ratios, seed in [(0, (7, 2, 1), 42), (1, (7, 2, 1), 42), (97, (7, 2, 1), 42), (1000, (8, 1, 1), 7), (50, (1, 0, 0), 3)]:
+    assign = assign_splits(n, ratios, "random", seed=seed)
+    train, val, test = baseline_split_indices(n, ratios, seed)
+    assert [i for i in range(n) if assign[i] == 0] == sorted(train)
+    assert [i for i in range(n) if assign[i] == 1] == sorted(val)
+    assert [i for i in range(n) if assign[i] == 2] == sorted(test)
+
+keys = [f"img{i}" for i in range(500)]
+first = assign_splits(len(keys), (7, 2, 1), "hash", keys, seed=42)
+assert first == assign_splits(len(keys), (7, 2, 1), "hash", keys, seed=42)
+grown = keys + [f"new{i}" for i in range(100)]
+assert assign_splits(len(grown), (7, 2, 1), "hash", grown, seed=42)[:len(keys)] == first
+assert first == [hash_split(k, (7, 2, 1), 42) for k in keys]
+assert 0.6 < first.count(0) / len(first) < 0.8
+
+# 没有分组时 group_assignment 与 random 结果一致；有分组时组内样本同属一个子集
+assert group_assignment(200, [], (7, 2, 1), "random", seed=5) == assign_splits(200, (7, 2, 1), "random", seed=5)
+groups = [[0, 5, 9], [10, 11], [100, 150, 199]]
+for mode in ("random", "hash"):
+    g = group_assignment(200, groups, (7, 2, 1), mode, [f"k{i}" for i in range(200)], seed=5)
+    for grp in groups:
+        assert len({g[i] for i in grp}) == 1
+
+pool = list(range(0, 200, 2))
+for mode in ("random", "hash"):
+    folds = fold_assignment(200, pool, 5, mode, [f"k{i}" for i in range(200)], seed=1, groups=[[0, 2, 4], [1, 3]])
+    assert all(folds[i] is None for i in range(200) if i not in pool)
+    assert {folds[i] for i in pool} == set(range(5))
+    assert folds[0] == folds[2] == folds[4]
+
+print("ok")
@@ -0,0 +1,106 @@
+"""数据集统计：分批向量化累积的结果与逐框计算一致（含跨批次合并），建议 imgsz 符合小目标规则；
+构建写出的统计与标签文件一致。"""
+import os
+import sys
+import json
+import math
+import bisect
+import random
+import tempfile
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core import dataset_stats
+from core.dataset_stats import (StatsCollector, IMGSZ_CANDIDATES, MIN_BOX_PX, MAX_BOXES_BIN, PX_BINS, REL_BINS,
+                                STATS_NAME, summary_lines)
+from core.dataset_builder import build_yolo_dataset
+from fixtures import make_labelme, CLASSES
+
+def bin_of(bins, v):
+    return bisect.bisect_right(bins, v) - 1
+
+names = ["a", "b", "c"]
+splits = ["train", "val", "test"]
+rnd = random.Random(1)
+# 降低合并阈值，覆盖多次分批合并
+dataset_stats._FLUSH_BOXES = 97
+col = StatsCollector(names, splits)
+images = []
+for _ in range(400):
+    split = rnd.choice(splits)
+    h, w = rnd.choice([(480, 640), (1080, 1920), (3000, 4000), (100, 100)])
+    n = rnd.choice([0, 0, 1, 3, 7, 60])
+    cls = np.array([rnd.randrange(3) for _ in range(n)], dtype=np.int32)
+    boxes = np.array([[rnd.random(), rnd.random(), rnd.random() ** 3, rnd.random() ** 3] for _ in range(n)]).reshape(-1, 4)
+    col.add(split, (h, w), cls, boxes)
+    images.append((split, h, w, cls, boxes))
+res = col.result()
+
+exp_images = {s: 0 for s in splits}
+exp_empty = {s: 0 for s in splits}
+exp_cls = {s: {n: 0 for n in names} for s in splits}
+per_image = [0] * (MAX_BOXES_BIN + 1)
+px = [0] * (len(PX_BINS) - 1)
+rel_hist = [0] * (len(REL_BINS) - 1)
+coco = [0, 0, 0]
+tiny = [0] * len(IMGSZ_CANDIDATES)
+for split, h, w, cls, boxes in images:
+    exp_images[split] += 1
+    exp_empty[split] += int(len(cls) == 0)
+    per_image[min(len(cls), MAX_BOXES_BIN)] += 1
+    for c, (_, _, bw, bh) in zip(cls.tolist(), boxes.tolist()):
+        exp_cls[split][names[c]] += 1
+        area = bw * w * bh * h
+        side = math.sqrt(area)
+        rel = side / max(w, h)
+        px[bin_of(PX_BINS, side)] += 1
+        rel_hist[bin_of(REL_BINS, rel)] += 1
+        coco[0 if area < 32 ** 2 else 1 if area < 96 ** 2 else 2] += 1
+        for i, c_sz in enumerate(IMGSZ_CANDIDATES):
+            tiny[i] += int(rel * c_sz < MIN_BOX_PX)
+total = sum(coco)
+assert res["images"] == exp_images and res["empty_images"] == exp_empty
+assert res["class_counts_by_split"] == exp_cls
+assert res["class_counts"] == {n: sum(exp_cls[s][n] for s in splits) for n in names}
+assert res["boxes"] == total and res["boxes_per_image"]["hist"] == per_image
+assert math.isclose(res["boxes_per_image"]["mean"], sum(i * c for i, c in enumerate(per_image)) / len(images))
+assert res["box_size_px"]["hist"] == px and res["box_size_rel"]["hist"] == rel_hist
+assert res["coco_sizes"] == {"small": coco[0], "medium": coco[1], "large": coco[2]}
+assert math.isclose(res["small_ratio"], coco[0] / total)
+assert res["tiny_ratio_at_imgsz"] == {str(c): t / total for c, t in zip(IMGSZ_CANDIDATES, tiny)}
+assert res["box_size_px"]["bins"][-1] is None
+json.dumps(res)
+
+# 建议 imgsz：小目标占比达标的最小候选；不超过原图长边中位数
+def single(shape, rel_side, n=100):
+    c = StatsCollector(["a"], ["train"])
+    for _ in range(n):
+        side = rel_side * max(shape)
+        c.add("train", shape, np.zeros(1, np.int32), np.array([[0.5, 0.5, side / shape[1], side / shape[0]]]))
+    return c.recommend_imgsz()
+assert single((3000, 4000), 0.1) == 640     # 缩放到 640 时边长 64 px，不是小目标
+assert single((3000, 4000), 0.009) == 960   # 640/800/960 下分别为 5.8/7.2/8.6 px
+assert single((3000, 4000), 0.001) == 1536  # 所有候选都不达标，取不超过上限的最大候选
+assert single((600, 800), 0.001) == 800     # 上限为原图长边的中位数 800
+assert StatsCollector(["a"], ["train"]).recommend_imgsz() == 640
+
+dataset_stats._FLUSH_BOXES = 1 << 16
+with tempfile.TemporaryDirectory() as tmp:
+    src, out = os.path.join(tmp, "src"), os.path.join(tmp, "out")
+    classes = make_labelme(src, n=40)
+    build_yolo_dataset(src, classes, (7, 2, 1), True, out, size_check="off", log_callback=lambda *_: None)
+    with open(os.path.join(out, STATS_NAME), encoding="utf-8") as f:
+        stats = json.load(f)
+    counts = {n: 0 for n in CLASSES}
+    n_boxes = 0
+    for dp, _, fs in os.walk(os.path.join(out, "labels")):
+        for name in fs:
+            with open(os.path.join(dp, name), encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        counts[CLASSES[int(line.split()[0])]] += 1
+                        n_boxes += 1
+    assert stats["class_counts"] == counts and stats["boxes"] == n_boxes
+    assert sum(stats["images"].values()) == 40
+    assert len(summary_lines(stats)) >= 3
+
+print("ok")
@@ -0,0 +1,57 @@
+"""数据集仓库：正在使用的条目不会被淘汰、删除或 `prune --all` 清掉，`force` 与失效的使用标记除外。"""
+import io
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core import dataset_store
+from core.dataset_store import REMOVED, MISSING, IN_USE
+
+base = tempfile.mkdtemp()
+dataset_store.store_dir = lambda: base
+
+def make_entry(name, size):
+    root = dataset_store.acquire(os.path.join(base, "src", name), {"name": name})
+    with open(os.path.join(root, "data.bin"), "wb") as f:
+        f.write(b"\0" * size)
+    dataset_store.finalize(root)
+    return os.path.basename(root), root
+
+try:
+    busy_key, busy = make_entry("busy", 4096)
+    old_key, old = make_entry("old", 4096)
+    new_key, new = make_entry("new", 4096)
+    dataset_store.mark_in_use(busy)
+    assert dataset_store.in_use(busy) and not dataset_store.in_use(old)
+
+    # 已退出进程留下的标记视为失效
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    with open(os.path.join(old, dataset_store.IN_USE_MARK), "w", encoding="utf-8") as f:
+        json.dump({"pid": dead.pid}, f)
+    assert not dataset_store.in_use(old)
+
+    # 淘汰跳过正在使用的条目
+    evicted = dataset_store.evict(budget=5000, keep=[new_key])
+    assert [m["key"] for m in evicted] == [old_key] and os.path.isdir(busy)
+
+    assert dataset_store.remove(busy_key) == IN_USE and os.path.isdir(busy)
+    assert dataset_store.remove("nope") == MISSING
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        dataset_store.main(["prune", "--all"])
+    assert os.path.isdir(busy) and not os.path.isdir(new)
+    assert busy_key in out.getvalue() and "--force" in out.getvalue(), out.getvalue()
+
+    dataset_store.release(busy)
+    dataset_store.mark_in_use(busy)
+    assert dataset_store.remove(busy_key, force=True) == REMOVED and not os.path.isdir(busy)
+finally:
+    shutil.rmtree(base, ignore_errors=True)
+
+print("ok")
@@ -0,0 +1,53 @@
+"""重复图片索引：按汉明距离聚类（含传递合并），无法解码的图片不参与，完全相同的内容可识别。"""
+import os
+import sys
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.dup_index import find_clusters, exact_duplicates
+
+def flip(h, *bits):
+    for b in bits:
+        h ^= 1 << b
+    return h
+
+def brute(hashes, distance):
+    """两两比较并做传递闭包，作为对照。"""
+    n = len(hashes)
+    parent = list(range(n))
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+    for i in range(n):
+        for j in range(i + 1, n):
+            if hashes[i] and hashes[j] and (hashes[i][1] == hashes[j][1] or bin(hashes[i][0] ^ hashes[j][0]).count("1") <= distance):
+                parent[find(i)] = find(j)
+    groups = {}
+    for i in range(n):
+        if hashes[i]:
+            groups.setdefault(find(i), []).append(i)
+    return sorted((g for g in groups.values() if len(g) > 1), key=lambda g: g[0])
+
+base = 0x0123456789ABCDEF
+hashes = [
+    (base, "d0"),
+    (flip(base, 1, 2, 3), "d1"),          # 距 0 为 3
+    (flip(base, 1, 2, 3, 40, 41, 42), "d2"),  # 距 1 为 3、距 0 为 6：经 1 传递合并
+    (0xFFFF0000FFFF0000, "d3"),
+    None,
+    (0x0F0F0F0F0F0F0F0F, "d0"),           # 与 0 内容相同
+    (0xFFFF0000FFFF0000, "d4"),           # 与 3 哈希相同
+]
+clusters = find_clusters(hashes, distance=4)
+assert clusters == [[0, 1, 2, 5], [3, 6]], clusters
+assert exact_duplicates(clusters[0], hashes) == [5]
+assert find_clusters(hashes, distance=0) == [[0, 5], [3, 6]]
+assert find_clusters([None, (1, "a")]) == []
+
+rng = random.Random(0)
+for distance in (0, 2, 4, 8):
+    seeds = [rng.getrandbits(64) for _ in range(40)]
+    hashes = [(flip(rng.choice(seeds), *rng.sample(range(64), rng.randint(0, 6))), f"h{i}") for i in range(300)]
+    assert find_clusters(hashes, distance) == brute(hashes, distance), distance
+
+print("ok")
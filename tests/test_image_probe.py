@@ -0,0 +1,104 @@
+"""图片尺寸探测：JPEG/PNG/BMP/WebP 只读文件头得到的尺寸与 Pillow 一致，JPEG 按 EXIF 方向交换宽高；
+compare_size 区分一致、等比缩放、旋转与不一致；ProbeCache 对未变化的文件命中缓存。"""
+import os
+import sys
+import tempfile
+from PIL import Image
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core import image_probe
+from core.image_probe import (probe_size, probe_sizes, compare_size, ProbeCache,
+                              SIZE_OK, SIZE_SCALED, SIZE_ROTATED, SIZE_MISMATCH)
+from core.image_resize import image_size
+
+SIZES = [(1, 1), (17, 9), (640, 480), (479, 1283), (4000, 3)]
+
+def save(path, size, mode="RGB", **kw):
+    Image.new(mode, size, (10, 200, 30) if mode == "RGB" else (10, 200, 30, 100)).save(path, **kw)
+
+with tempfile.TemporaryDirectory() as tmp:
+    p = lambda name: os.path.join(tmp, name)
+    cases = []
+    for w, h in SIZES:
+        tag = f"{w}x{h}"
+        cases += [
+            (p(f"{tag}.jpg"), (w, h), "RGB", {}),
+            (p(f"{tag}_prog.jpg"), (w, h), "RGB", {"progressive": True}),
+            (p(f"{tag}.png"), (w, h), "RGB", {}),
+            (p(f"{tag}_rgba.png"), (w, h), "RGBA", {}),
+            (p(f"{tag}.bmp"), (w, h), "RGB", {}),
+            (p(f"{tag}_lossy.webp"), (w, h), "RGB", {"lossless": False}),
+            (p(f"{tag}_lossless.webp"), (w, h), "RGB", {"lossless": True}),
+            (p(f"{tag}_alpha.webp"), (w, h), "RGBA", {"lossless": False}),
+        ]
+    for path, size, mode, kw in cases:
+        save(path, size, mode, **kw)
+        # 直接检查文件头解析，不经过 Pillow 回退
+        assert tuple(image_probe._header_size(path)) == size, (path, image_probe._header_size(path))
+        assert probe_size(path) == size, path
+
+    # 带 EXIF 的 WebP 走 VP8X 扩展头
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    save(p("exif.webp"), (300, 200), exif=exif)
+    assert tuple(image_probe._header_size(p("exif.webp"))) == (300, 200)
+
+    # JPEG EXIF 方向 1~8：5~8 交换宽高，与 Pillow 摆正后的尺寸一致
+    for orientation in range(1, 9):
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        exif[0x010F] = "camera"
+        path = p(f"o{orientation}.jpg")
+        save(path, (400, 250), exif=exif)
+        expect = (250, 400) if orientation >= 5 else (400, 250)
+        assert probe_size(path) == expect == image_size(path), (orientation, probe_size(path))
+
+    # 大端 (MM) EXIF：手工构造只含方向标签的 APP1 段
+    tiff = b"MM\x00*" + (8).to_bytes(4, "big") + (1).to_bytes(2, "big") \
+        + bytes.fromhex("0112") + (3).to_bytes(2, "big") + (1).to_bytes(4, "big") + (6).to_bytes(2, "big") + b"\x00\x00" \
+        + b"\x00\x00\x00\x00"
+    app1 = b"Exif\x00\x00" + tiff
+    save(p("plain.jpg"), (400, 250))
+    with open(p("plain.jpg"), "rb") as f:
+        data = f.read()
+    with open(p("mm.jpg"), "wb") as f:
+        f.write(data[:2] + b"\xff\xe1" + (len(app1) + 2).to_bytes(2, "big") + app1 + data[2:])
+    assert probe_size(p("mm.jpg")) == (250, 400) == image_size(p("mm.jpg"))
+
+    # 其他格式回退到 Pillow；非图片与缺失文件返回 None
+    Image.new("P", (33, 44)).save(p("a.gif"))
+    assert image_probe._header_size(p("a.gif")) is None and probe_size(p("a.gif")) == (33, 44)
+    with open(p("not_image.jpg"), "wb") as f:
+        f.write(os.urandom(256))
+    assert probe_size(p("not_image.jpg")) is None
+    with open(p("truncated.jpg"), "wb") as f:
+        f.write(data[:20])
+    assert probe_size(p("truncated.jpg")) is None
+    assert probe_size(p("missing.png")) is None
+
+    # 批量探测保持输入顺序，串行与线程池一致
+    paths = [c[0] for c in cases] + [p("missing.png")]
+    expect = [c[1] for c in cases] + [None]
+    assert probe_sizes(paths, workers=1) == expect
+    assert probe_sizes(paths, workers=8) == expect
+
+    # ProbeCache：签名未变时命中缓存，文件改动后重新探测
+    old = 1_000_000_000 * 10**9
+    for path in paths[:-1]:
+        os.utime(path, ns=(old, old))
+    cache = ProbeCache(tmp, use_cache=False)
+    assert probe_sizes(paths, cache, workers=4) == expect
+    assert cache.hits == 0
+    assert probe_sizes(paths, cache, workers=4) == expect
+    assert cache.hits == len(paths) - 1
+    save(paths[0], (12, 34))
+    os.utime(paths[0], ns=(old + 10**9, old + 10**9))
+    assert cache.size(paths[0]) == (12, 34)
+
+assert compare_size((640, 480), (640, 480)) == SIZE_OK
+assert compare_size((640, 480), (1280, 960)) == SIZE_SCALED
+assert compare_size((1920, 1080), (1280, 721)) == SIZE_SCALED
+assert compare_size((640, 480), (480, 640)) == SIZE_ROTATED
+assert compare_size((1920, 1080), (540, 960)) == SIZE_ROTATED
+assert compare_size((640, 480), (640, 640)) == SIZE_MISMATCH
+assert compare_size((0, 0), (640, 480)) == SIZE_MISMATCH
+print("ok")
@@ -0,0 +1,79 @@
+"""训练分辨率预缩放：输出尺寸与 ultralytics 的缩放规则一致，按 EXIF 摆正后缩放，小图不缩放；
+构建时记录原图尺寸，`original_sizes` 可取回。"""
+import os
+import sys
+import json
+import math
+import tempfile
+from PIL import Image
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.image_resize import target_size, resize_image, image_size, original_sizes
+from core.dataset_builder import build_yolo_dataset
+
+def ultralytics_size(w, h, imgsz):
+    r = imgsz / max(h, w)
+    return (min(math.ceil(w * r), imgsz), min(math.ceil(h * r), imgsz)) if r < 1 else None
+
+for w, h in [(1920, 1080), (1080, 1920), (641, 640), (640, 640), (333, 200), (4000, 3), (3, 4000), (1001, 999)]:
+    for imgsz in (320, 640, 1280):
+        assert target_size(w, h, imgsz) == ultralytics_size(w, h, imgsz), (w, h, imgsz)
+
+def save(path, size, orientation=1, mode="RGB"):
+    img = Image.new(mode, size, (200, 30, 30) if mode == "RGB" else (200, 30, 30, 128))
+    # 左上角标记，用于确认摆正方向
+    img.paste((0, 0, 255) if mode == "RGB" else (0, 0, 255, 255), (0, 0, size[0] // 4, size[1] // 4))
+    exif = Image.Exif()
+    if orientation != 1:
+        exif[0x0112] = orientation
+    if path.endswith(".jpg"):
+        img.save(path, exif=exif)
+    else:
+        img.save(path)
+
+with tempfile.TemporaryDirectory() as tmp:
+    p = lambda name: os.path.join(tmp, name)
+
+    save(p("big.jpg"), (1920, 1080))
+    assert resize_image(p("big.jpg"), p("out.jpg"), 640) == (1920, 1080)
+    with Image.open(p("out.jpg")) as im:
+        assert im.size == (640, 360) and im.format == "JPEG"
+    assert not os.path.exists(p("out.jpg.tmp"))
+
+    save(p("alpha.png"), (800, 1000), mode="RGBA")
+    assert resize_image(p("alpha.png"), p("alpha_out.png"), 640) == (800, 1000)
+    with Image.open(p("alpha_out.png")) as im:
+        assert im.size == (512, 640) and im.format == "PNG" and im.mode == "RGBA"
+
+    # EXIF 方向 6：存储为 1000x600，摆正后为 600x1000
+    save(p("rot.jpg"), (1000, 600), orientation=6)
+    assert image_size(p("rot.jpg")) == (600, 1000)
+    assert resize_image(p("rot.jpg"), p("rot_out.jpg"), 640) == (600, 1000)
+    with Image.open(p("rot_out.jpg")) as im:
+        assert im.size == (384, 640) and im.getexif().get(0x0112, 1) == 1
+        # 原图左上角的标记摆正后位于右上角
+        assert im.getpixel((im.size[0] - 5, 5))[2] > 200 and im.getpixel((5, 5))[2] < 100
+
+    save(p("small.jpg"), (320, 240))
+    assert resize_image(p("small.jpg"), p("small_out.jpg"), 640) is None and not os.path.exists(p("small_out.jpg"))
+
+    # 构建：长边超过 imgsz 的图片缩放并记录原图尺寸，小图原样落盘
+    src, out = p("src"), p("out")
+    os.makedirs(src)
+    sizes = {"a": (1920, 1080), "b": (1000, 1600), "c": (400, 300)}
+    for stem, (w, h) in sizes.items():
+        save(os.path.join(src, stem + ".jpg"), (w, h))
+        with open(os.path.join(src, stem + ".json"), "w", encoding="utf-8") as f:
+            json.dump({"shapes": [{"label": "x", "points": [[10, 10], [w / 2, h / 2]], "shape_type": "rectangle"}],
+                       "imagePath": stem + ".jpg", "imageData": None, "imageWidth": w, "imageHeight": h}, f)
+    with open(p("classes.txt"), "w", encoding="utf-8") as f:
+        f.write("x")
+    build_yolo_dataset(src, p("classes.txt"), (1, 0, 0), True, out, imgsz=640, log_callback=lambda *_: None)
+    orig = original_sizes(out)
+    assert sorted(orig.values()) == sorted([sizes["a"], sizes["b"]]), orig
+    for rel, (w, h) in orig.items():
+        with Image.open(os.path.join(out, rel)) as im:
+            assert im.size == target_size(w, h, 640), (rel, im.size)
+    with Image.open(os.path.join(out, "images", "train", "c.jpg")) as im:
+        assert im.size == sizes["c"]
+
+print("ok")
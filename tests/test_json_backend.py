@@ -0,0 +1,79 @@
+"""JSON 解析后端：各后端结果一致；惰性模式只把顶层 imageData 置为 null，其余字段与完整解析相同。"""
+import os
+import sys
+import json
+import base64
+import random
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core import json_backend
+from core.json_backend import loads, load_file, strip_image_data, set_backend, available_backends
+
+rnd = random.Random(0)
+image_data = base64.b64encode(rnd.randbytes(30000)).decode("ascii")
+
+def labelme(**extra):
+    data = {"version": "5.0", "flags": {}, "shapes": [
+        {"label": "划痕", "points": [[1.5, 2.25], [300.125, 400.0000001]], "shape_type": "rectangle", "flags": {}},
+        {"label": 'q"uo\\te', "points": [[0, 0], [1e-7, 3.141592653589793]], "shape_type": "polygon"},
+    ], "imagePath": "img.jpg", "imageData": image_data, "imageHeight": 480, "imageWidth": 640}
+    data.update(extra)
+    return data
+
+def expect_lazy(data):
+    out = json.loads(json.dumps(data))
+    if "imageData" in out:
+        out["imageData"] = None
+    return out
+
+cases = [
+    labelme(),
+    labelme(imageData=None),
+    {k: v for k, v in labelme().items() if k != "imageData"},
+    # imageData 出现在最前或标签名、其他字段的值中
+    dict([("imageData", image_data)] + [(k, v) for k, v in labelme().items() if k != "imageData"]),
+    labelme(imagePath='"imageData": "x"', shapes=[{"label": "imageData", "points": []}]),
+    # 嵌套对象中的同名键先于顶层出现：不能被误替换
+    labelme(flags={"imageData": "nested"}),
+    labelme(flags={"imageData": "nested"}, imageData=""),
+]
+dumps = [
+    lambda d: json.dumps(d, ensure_ascii=False).encode("utf-8"),
+    lambda d: json.dumps(d, ensure_ascii=True, indent=2).encode("utf-8"),
+    lambda d: json.dumps(d, separators=(",", ":")).encode("utf-8"),
+    lambda d: json.dumps(d, indent="\t", ensure_ascii=False, separators=(" ,", " :\r\n ")).encode("utf-8"),
+]
+
+for backend in available_backends():
+    set_backend(backend)
+    assert json_backend.backend_name() == backend
+    for data in cases:
+        for dump in dumps:
+            raw = dump(data)
+            assert loads(raw) == json.loads(raw.decode("utf-8")), backend
+            assert loads(raw, lazy=True) == expect_lazy(data), (backend, raw[:200])
+set_backend("auto")
+
+# 能安全替换时只改写 imageData 的值，不做解码
+raw = json.dumps(labelme()).encode("utf-8")
+stripped = strip_image_data(raw)
+assert len(stripped) < len(raw) - 30000 and b'"imageData": null' in stripped
+# 值中含转义或不是字符串时原样返回
+for odd in (b'{"imageData": "a\\/b"}', b'{"imageData": 12}', b'{"x": "imageData"}'):
+    assert strip_image_data(odd) is odd
+
+with tempfile.TemporaryDirectory() as tmp:
+    p = os.path.join(tmp, "a.json")
+    with open(p, "wb") as f:
+        f.write(raw)
+    assert load_file(p) == labelme() and load_file(p, lazy=True) == expect_lazy(labelme())
+
+try:
+    set_backend("nope")
+except ValueError:
+    pass
+else:
+    raise AssertionError("unknown backend accepted")
+set_backend("auto")
+
+print("ok")
@@ -0,0 +1,36 @@
+"""K 折布局：每折验证列表为该折成员，训练列表为其余各折之和；切回普通构建时布局被清除。"""
+import os
+import sys
+import tempfile
+import yaml
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.kfold import write_folds, remove_folds, has_folds, list_name, KFOLD_DIR
+
+def read_list(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+members = [[f"images/train/f{i}_{j}.jpg" for j in range(i + 2)] for i in range(4)]
+with tempfile.TemporaryDirectory() as root:
+    paths = write_folds(root, members, ["a", "划痕"], "/mnt/d/ds")
+    assert len(paths) == 4 and has_folds(root)
+    for i, p in enumerate(paths):
+        val = read_list(os.path.join(root, list_name(i, "val")))
+        train = read_list(os.path.join(root, list_name(i, "train")))
+        assert val == ["./" + m for m in members[i]]
+        assert sorted(train + val) == sorted("./" + m for f in members for m in f)
+        with open(p, encoding="utf-8") as f:
+            cfg = yaml.safe_load(f)
+        assert cfg == {"path": "/mnt/d/ds", "train": list_name(i, "train"), "val": list_name(i, "val"),
+                       "test": "images/test", "names": ["a", "划痕"]}
+
+    # 折数减少时旧的列表文件不残留
+    write_folds(root, members[:2], ["a"], "/mnt/d/ds")
+    assert not os.path.exists(os.path.join(root, list_name(3, "val")))
+    assert sorted(os.listdir(os.path.join(root, KFOLD_DIR))) == ["fold_0", "fold_1"]
+
+    remove_folds(root)
+    assert not has_folds(root) and not os.path.exists(os.path.join(root, KFOLD_DIR))
+    assert not [n for n in os.listdir(root) if n.startswith("fold_")]
+
+print("ok")
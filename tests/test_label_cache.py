@@ -0,0 +1,68 @@
+"""合并标签缓存：写入后读回的类别、尺寸与标签与原数据一致，并与逐文件 .txt 标签的解析结果对应。"""
+import os
+import sys
+import tempfile
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.label_cache import LabelCache, write_label_cache, parse_yolo_text, LABEL_CACHE_NAME
+from core.dataset_builder import build_yolo_dataset
+from fixtures import make_labelme
+
+rng = np.random.default_rng(0)
+names = ["a", "b", "划痕"]
+images = [f"images/train/d{i % 3}/图{i}.jpg" for i in range(50)]
+shapes = [(int(rng.integers(10, 4000)), int(rng.integers(10, 4000))) for _ in images]
+labels = []
+for i in range(len(images)):
+    n = 0 if i % 7 == 0 else int(rng.integers(1, 6))
+    labels.append((rng.integers(0, 3, n).astype(np.int32), rng.random((n, 4)).astype(np.float32)))
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = write_label_cache(tmp, names, images, shapes, labels)
+    assert path == os.path.join(tmp, LABEL_CACHE_NAME) and not os.path.exists(path + ".tmp")
+    cache = LabelCache.open(tmp)
+    assert cache.names == names and cache.images == images and len(cache) == len(images)
+    assert cache.shapes.tolist() == [list(s) for s in shapes]
+    for i, (c, b) in enumerate(labels):
+        cc, bb = cache.labels(i)
+        assert cc.tolist() == c.tolist() and np.array_equal(bb, b)
+    assert cache.find(images[10]) == 10 and cache.find("missing.jpg") is None
+    cache.close()
+
+    # 空数据集也能写出并打开
+    empty = os.path.join(tmp, "empty")
+    os.makedirs(empty)
+    write_label_cache(empty, names, [], [], [])
+    cache = LabelCache.open(empty)
+    assert len(cache) == 0 and cache.cls.shape == (0,) and cache.boxes.shape == (0, 4)
+    cache.close()
+
+    # 缺失或损坏的缓存返回 None
+    assert LabelCache.open(os.path.join(tmp, "nowhere")) is None
+    bad = os.path.join(tmp, "bad")
+    os.makedirs(bad)
+    with open(os.path.join(bad, LABEL_CACHE_NAME), "wb") as f:
+        f.write(b"not a cache")
+    assert LabelCache.open(bad) is None
+
+    cls, boxes = parse_yolo_text("0 0.5 0.5 0.1 0.2\n2 0.25 0.75 0.5 0.5\n")
+    assert cls.tolist() == [0, 2] and boxes.dtype == np.float32 and boxes.shape == (2, 4)
+    cls, boxes = parse_yolo_text("")
+    assert cls.shape == (0,) and boxes.shape == (0, 4)
+
+    # 构建出的缓存与逐文件 .txt 标签一致
+    src = os.path.join(tmp, "src")
+    out = os.path.join(tmp, "out")
+    classes = make_labelme(src, n=30)
+    build_yolo_dataset(src, classes, (7, 2, 1), True, out, size_check="off", log_callback=lambda *_: None)
+    cache = LabelCache.open(out)
+    assert len(cache) == 30
+    for i, img in enumerate(cache.images):
+        txt = os.path.join(out, "labels", os.path.splitext(img.split("/", 1)[1])[0] + ".txt")
+        with open(txt, encoding="utf-8") as f:
+            c, b = parse_yolo_text(f.read())
+        cc, bb = cache.labels(i)
+        assert cc.tolist() == c.tolist() and np.allclose(bb, b, atol=1e-5)
+    cache.close()
+
+print("ok")
@@ -0,0 +1,64 @@
+"""标签倒排索引：按标签查文件、空白与损坏文件的识别，以及增量刷新只重新解析变化的文件。"""
+import os
+import sys
+import json
+import glob
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.label_index import LabelIndex
+from fixtures import make_labelme
+
+def age(paths, seconds=3600):
+    """把修改时间移到过去，避开“过近的修改时间不作为有效签名”的窗口。"""
+    for p in paths:
+        st = os.stat(p)
+        os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 10 ** 9))
+
+with tempfile.TemporaryDirectory() as tmp:
+    src = os.path.join(tmp, "src")
+    make_labelme(src, n=30)
+    with open(os.path.join(src, "blank.json"), "w", encoding="utf-8") as f:
+        json.dump({"shapes": [], "imageData": None}, f)
+    with open(os.path.join(src, "broken.json"), "w", encoding="utf-8") as f:
+        f.write("{not json")
+    files = sorted(glob.glob(os.path.join(src, "**", "*.json"), recursive=True))
+    age(files)
+
+    expect = {}
+    for p in files:
+        try:
+            with open(p, encoding="utf-8") as f:
+                shapes = json.load(f).get("shapes") or []
+        except ValueError:
+            continue
+        for s in shapes:
+            expect.setdefault(s.get("label", ""), set()).add(os.path.relpath(p, src).replace(os.sep, "/"))
+
+    db = os.path.join(tmp, "index.sqlite")
+    with LabelIndex(src, db_path=db) as index:
+        index.refresh(files, workers=4)
+        assert index.parsed == len(files) and index.file_count() == len(files)
+        for label, keys in expect.items():
+            assert index.files_with([label]) == keys, label
+        assert index.files_with(["划痕", "a"]) == expect["划痕"] | expect["a"]
+        assert index.files_with(["nope"]) == set() and index.files_with([]) == set()
+        assert index.unreadable_files() == {"broken.json"}
+        assert index.blank_files() == {"blank.json", "broken.json"}
+        assert {k: v[0] for k, v in index.label_counts().items()} == {k: len(v) for k, v in expect.items()}
+
+    # 重新打开：未变化的文件全部复用；修改一个、删除一个
+    changed = files[0]
+    with open(changed, encoding="utf-8") as f:
+        data = json.load(f)
+    data["shapes"] = [{"label": "新标签", "points": [[0, 0], [1, 1]]}]
+    with open(changed, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    age([changed], 1800)
+    os.remove(files[1])
+    with LabelIndex(src, db_path=db) as index:
+        index.refresh(files[:1] + files[2:])
+        assert (index.parsed, index.reused, index.removed) == (1, len(files) - 2, 1)
+        assert index.files_with(["新标签"]) == {index.key(changed)}
+        assert index.key(files[1]) not in set().union(*(index.files_with([l]) for l in expect))
+
+print("ok")
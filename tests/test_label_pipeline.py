@@ -0,0 +1,90 @@
+"""组合处理：run_pipeline 一次遍历执行多个操作，与依次调用 delete_labels / replace_labels / export_labels
+在同一份数据上得到相同的源目录、导出目录与统计（串行、线程池、字节预筛下均一致）。"""
+import os
+import io
+import sys
+import shutil
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.label_processor import LabelProcessor, parse_operations
+from fixtures import make_labelme
+
+def make_tree(root):
+    """标准数据之外加入损坏文件与不同子目录下的同名文件（导出到同一目录时相互覆盖）。"""
+    make_labelme(root, n=60)
+    os.remove(os.path.join(root, "classes.txt"))
+    with open(os.path.join(root, "d0", "broken.json"), "w", encoding="utf-8") as f:
+        f.write('{"shapes": [{"label": "a"')
+    dup = os.path.join(root, "d1", "dup")
+    os.makedirs(dup)
+    for ext in (".json", ".jpg"):
+        shutil.copy(os.path.join(root, "d0", "img3" + ext), os.path.join(dup, "img3" + ext))
+
+def snapshot(root):
+    out = {}
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            p = os.path.join(dirpath, name)
+            with open(p, "rb") as f:
+                out[os.path.relpath(p, root)] = f.read()
+    return out
+
+def run(base, fn, **kw):
+    src = os.path.join(base, "src")
+    make_tree(src)
+    proc = LabelProcessor(src, **kw)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert fn(proc, base)
+    rel = lambda p: os.path.relpath(p, src) if p else p
+    outputs = {}
+    for name in sorted(os.listdir(base)):
+        if name != "src":
+            outputs[name] = snapshot(os.path.join(base, name))
+    return {
+        "src": snapshot(src),
+        "out": outputs,
+        "modified": sorted(set(rel(p) for p in proc.modified_files)),
+        "deleted": [rel(p) for p in proc.deleted_files],
+        # 多个导出时组合处理按文件交错记录，只比较内容
+        "exported": sorted(tuple(rel(p) for p in e) for e in proc.exported_files),
+        "errors": sorted(set(rel(p) for p, _ in proc.error_files)),
+    }
+
+def sequential_1(proc, base):
+    return (proc.delete_labels(["a"]) and proc.replace_labels("b", "x")
+            and proc.export_labels(["x"], os.path.join(base, "out")))
+
+def sequential_2(proc, base):
+    # 导出在修改之前：导出的是修改前的内容
+    return (proc.export_labels(["划痕"], os.path.join(base, "out1")) and proc.replace_labels("划痕", "y")
+            and proc.export_labels(["y"], os.path.join(base, "out2")))
+
+cases = [
+    (sequential_1, "delete a; replace b=x; filter x; export {base}/out"),
+    (sequential_2, "filter 划痕; export {base}/out1; replace 划痕=y; export {base}/out2"),
+]
+for sequential, text in cases:
+    for kw in ({"workers": 1}, {"workers": 8}, {"workers": 4, "prefilter": True}):
+        with tempfile.TemporaryDirectory() as tmp:
+            # 字节预筛跳过不含目标标签的损坏文件，两种方式在相同设置下比较
+            expect = run(os.path.join(tmp, "seq"), sequential, **kw)
+            assert expect["modified"] and expect["exported"]
+            if not kw.get("prefilter"):
+                assert expect["errors"] == [os.path.join("d0", "broken.json")]
+            base = os.path.join(tmp, "pipe")
+            got = run(base, lambda proc, base: proc.run_pipeline(parse_operations(text.format(base=base))), **kw)
+            for key in expect:
+                assert got[key] == expect[key], (text, kw, key)
+
+# 删除后没有剩余标签的文件被删除，与 delete_labels 一致
+with tempfile.TemporaryDirectory() as tmp:
+    src = os.path.join(tmp, "src")
+    make_tree(src)
+    with contextlib.redirect_stdout(io.StringIO()):
+        proc = LabelProcessor(src)
+        assert proc.run_pipeline(parse_operations("replace a=b; delete b,划痕"))
+    assert len(proc.deleted_files) == 61 and not proc.modified_files
+    assert [name for _, _, files in os.walk(src) for name in files if name.endswith(".json")] == ["broken.json"]
+
+print("ok")
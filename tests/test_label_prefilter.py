@@ -0,0 +1,84 @@
+"""标签字节预筛：各种 JSON 写法的标签都能命中，其他标签不误报，大文件走 mmap，空标签不预筛；
+标签处理默认不预筛，开启后结果不变，只有不含目标标签的损坏文件不再计入错误。"""
+import os
+import sys
+import json
+import re
+import io
+import shutil
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.label_prefilter import LabelPrefilter, _MMAP_MIN
+from core.label_processor import LabelProcessor
+from fixtures import make_labelme
+
+def variants(label):
+    """标签所在文件的常见写法：ensure_ascii 开/关、十六进制大写转义、`\\/` 转义。"""
+    shapes = {"shapes": [{"label": label, "points": [[0, 0], [1, 1]]}], "imageData": None}
+    out = [json.dumps(shapes, ensure_ascii=False), json.dumps(shapes, ensure_ascii=True), json.dumps(shapes, indent=2)]
+    out.append(re.sub(r"\\u([0-9a-f]{4})", lambda m: "\\u" + m.group(1).upper(), out[1]))
+    out += [o.replace("/", "\\/") for o in out if "/" in label]
+    return out
+
+labels = ["划痕", "𝒳bad", 'q"uo\\te', "a/b", "tab\there", "plain"]
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "x.json")
+    for label in labels:
+        pf = LabelPrefilter([label])
+        assert pf.enabled
+        for text in variants(label):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            assert pf(path), (label, text)
+            for other in labels:
+                if other != label:
+                    assert not LabelPrefilter([other])(path), (other, text)
+
+    # 多个标签时任一命中即可
+    assert LabelPrefilter(["nope", "划痕"])(path) is False
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"shapes": [{"label": "划痕"}]}, f)
+    assert LabelPrefilter(["nope", "划痕"])(path)
+
+    # 大文件（带 imageData）用 mmap 查找，标签位于末尾
+    big = os.path.join(tmp, "big.json")
+    with open(big, "w", encoding="utf-8") as f:
+        f.write('{"imageData": "' + "A" * (_MMAP_MIN + 10) + '", "shapes": [{"label": "\\u5212\\u75d5"}]}')
+    assert LabelPrefilter(["划痕"])(big)
+    assert not LabelPrefilter(["plain"])(big)
+
+    # 空文件、缺失文件视为可能匹配，由后续解析报告
+    empty = os.path.join(tmp, "empty.json")
+    open(empty, "w").close()
+    assert LabelPrefilter(["划痕"])(empty)
+    assert LabelPrefilter(["划痕"])(os.path.join(tmp, "missing.json"))
+
+# 空标签无法按字节判断，不做预筛
+assert not LabelPrefilter([""]).enabled and LabelPrefilter([""])(__file__)
+assert not LabelPrefilter([]).enabled
+
+# 标签处理：默认关闭预筛；开启后删除结果相同，不含目标标签的损坏文件被跳过
+assert LabelProcessor(".").prefilter is False
+with tempfile.TemporaryDirectory() as tmp:
+    base = os.path.join(tmp, "base")
+    make_labelme(base, n=30)
+    with open(os.path.join(base, "d0", "broken.json"), "w", encoding="utf-8") as f:
+        f.write('{"shapes": [{"label": "a"')
+    with open(os.path.join(base, "d1", "broken_target.json"), "w", encoding="utf-8") as f:
+        f.write('{"shapes": [{"label": "划痕"')
+    results = {}
+    for prefilter in (False, True):
+        src = os.path.join(tmp, str(prefilter))
+        shutil.copytree(base, src)
+        proc = LabelProcessor(src, prefilter=prefilter)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert proc.delete_labels(["划痕"])
+        results[prefilter] = ([os.path.relpath(p, src) for p in proc.modified_files],
+                              [os.path.relpath(p, src) for p in proc.deleted_files],
+                              sorted(os.path.relpath(p, src) for p, _ in proc.error_files))
+    assert results[False][:2] == results[True][:2] and results[False][0]
+    assert results[False][2] == [os.path.join("d0", "broken.json"), os.path.join("d1", "broken_target.json")]
+    assert results[True][2] == [os.path.join("d1", "broken_target.json")]
+
+print("ok")
@@ -0,0 +1,80 @@
+"""标签批处理的线程池模式：workers=8 与串行执行在同一份数据上得到相同的文件、日志与统计。"""
+import os
+import io
+import sys
+import json
+import shutil
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.label_processor import LabelProcessor
+from fixtures import make_labelme
+
+def make_tree(root):
+    """在标准数据之外加入损坏、空白、缺图、同名（不同子目录）的文件，覆盖各类分支。"""
+    make_labelme(root, n=80)
+    os.remove(os.path.join(root, "classes.txt"))
+    with open(os.path.join(root, "d0", "broken.json"), "w", encoding="utf-8") as f:
+        f.write('{"shapes": [{"label": "a"')
+    with open(os.path.join(root, "d1", "blank.json"), "w", encoding="utf-8") as f:
+        json.dump({"shapes": [], "imageData": None}, f)
+    shutil.copy(os.path.join(root, "d0", "img0.jpg"), os.path.join(root, "d1", "blank.jpg"))
+    shutil.copy(os.path.join(root, "d0", "img0.jpg"), os.path.join(root, "d2", "orphan.jpg"))
+    os.remove(os.path.join(root, "d2", "img2.jpg"))
+    dup = os.path.join(root, "d1", "dup")
+    os.makedirs(dup)
+    for ext in (".json", ".jpg"):
+        shutil.copy(os.path.join(root, "d0", "img3" + ext), os.path.join(dup, "img3" + ext))
+
+def snapshot(root):
+    out = {}
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            p = os.path.join(dirpath, name)
+            with open(p, "rb") as f:
+                out[os.path.relpath(p, root)] = f.read()
+    return out
+
+def run(tmp, workers, op):
+    base = os.path.join(tmp, f"w{workers}")
+    src, out = os.path.join(base, "src"), os.path.join(base, "out")
+    make_tree(src)
+    logs = []
+    proc = LabelProcessor(src, workers=workers, log_callback=logs.append)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ok = op(proc, out)
+    rel = lambda p: os.path.relpath(p, src) if p else p
+    stats = {
+        "processed": proc.processed_files,
+        "modified": [rel(p) for p in proc.modified_files],
+        "deleted": [rel(p) for p in proc.deleted_files],
+        "exported": [tuple(rel(p) for p in e) if isinstance(e, tuple) else rel(e) for e in proc.exported_files],
+        "errors": [(rel(p), e) for p, e in proc.error_files],
+    }
+    logs = [l.replace(src, "<src>").replace(out, "<out>") for l in logs if "耗时" not in l]
+    return ok, snapshot(src), snapshot(out) if os.path.isdir(out) else {}, stats, logs
+
+ops = {
+    "delete": lambda p, out: p.delete_labels(["a"]),
+    "replace": lambda p, out: p.replace_labels("b", "划痕2"),
+    "export": lambda p, out: p.export_labels(["划痕"], out),
+    "blank": lambda p, out: p.export_blank_images(out),
+}
+for name, op in ops.items():
+    with tempfile.TemporaryDirectory() as tmp:
+        serial = run(tmp, 1, op)
+        parallel = run(tmp, 8, op)
+    assert serial[0] is True, name
+    assert serial[1] == parallel[1], f"{name}: source tree differs"
+    assert serial[2] == parallel[2], f"{name}: output tree differs"
+    assert serial[3] == parallel[3], f"{name}: stats differ"
+    assert serial[4] == parallel[4], f"{name}: logs differ"
+    stats = serial[3]
+    if name == "blank":
+        assert sorted(serial[2]) == ["blank.jpg", "orphan.jpg"], sorted(serial[2])
+    else:
+        # 损坏的 JSON 在两种模式下都计入错误文件
+        assert [p for p, _ in stats["errors"]] == [os.path.join("d0", "broken.json")], stats["errors"]
+        assert stats["modified"] or stats["exported"], name
+
+print("ok")
@@ -0,0 +1,72 @@
+"""图片落盘策略：各策略可用时按原样生效，失败（跨文件系统、权限、文件系统不支持）时回退为复制；
+已存在的目标（包括旧链接）先删除，不会通过链接改写源文件。"""
+import os
+import sys
+import errno
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core import materialize as mat
+from core.materialize import materialize
+from core.dataset_builder import build_yolo_dataset
+from fixtures import make_labelme
+
+def read(p):
+    with open(p, "rb") as f:
+        return f.read()
+
+def fail(*_, **__):
+    raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+with tempfile.TemporaryDirectory() as tmp:
+    src = os.path.join(tmp, "src.jpg")
+    with open(src, "wb") as f:
+        f.write(b"image-bytes")
+    dst = os.path.join(tmp, "dst.jpg")
+
+    assert materialize(src, dst, "copy") == "copy" and read(dst) == b"image-bytes"
+    assert not os.path.samefile(src, dst)
+    if hasattr(os, "link"):
+        assert materialize(src, dst, "hardlink") == "hardlink" and os.path.samefile(src, dst)
+    if os.name != "nt":
+        assert materialize(src, dst, "symlink") == "symlink"
+        assert os.path.islink(dst) and os.readlink(dst) == os.path.abspath(src)
+    # reflink 依赖文件系统，不支持时回退为复制且不留下空文件
+    mode = materialize(src, dst, "reflink")
+    assert mode in ("reflink", "copy") and not os.path.islink(dst) and read(dst) == b"image-bytes"
+
+    # 目标是指向源文件的旧链接时先删除再落盘，源文件内容不变
+    if os.name != "nt":
+        os.remove(dst)
+        os.symlink(src, dst)
+        assert materialize(src, dst, "copy") == "copy" and not os.path.islink(dst)
+        with open(dst, "wb") as f:
+            f.write(b"changed")
+        assert read(src) == b"image-bytes"
+
+    # 链接失败时回退为复制
+    real_link, real_symlink, real_reflink = os.link, os.symlink, mat._reflink
+    os.link = os.symlink = mat._reflink = fail
+    try:
+        for m in ("hardlink", "symlink", "reflink"):
+            assert materialize(src, dst, m) == "copy", m
+            assert not os.path.islink(dst) and not os.path.samefile(src, dst) and read(dst) == b"image-bytes"
+
+        # 构建时回退同样生效，并在汇总中报告实际使用的策略
+        ds_src, out = os.path.join(tmp, "ds"), os.path.join(tmp, "out")
+        classes = make_labelme(ds_src, n=12)
+        events = []
+        build_yolo_dataset(ds_src, classes, (7, 2, 1), True, out, link_mode="hardlink", size_check="off",
+                           log_callback=lambda *_: None, event_callback=events.append)
+        summary = [e for e in events if e.get("kind") == "done"][0]["summary"]
+        assert summary["link_modes"] == {"copy": 12}, summary
+    finally:
+        os.link, os.symlink, mat._reflink = real_link, real_symlink, real_reflink
+
+    try:
+        materialize(src, dst, "move")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown mode accepted")
+
+print("ok")
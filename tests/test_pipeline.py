@@ -0,0 +1,37 @@
+"""流水线：ordered_map 在串行、线程池与进程池下均按输入顺序产出，任务异常向调用方抛出。"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.pipeline import ordered_map, chunked, prefetch
+
+def square(x):
+    return x * x
+
+def fail_at_7(x):
+    if x == 7:
+        raise RuntimeError("boom")
+    return x
+
+if __name__ == "__main__":
+    items = list(range(200))
+    expect = [(i, i * i) for i in items]
+    assert list(ordered_map(square, iter(items), None, 4)) == expect
+    with ThreadPoolExecutor(4) as ex:
+        assert list(ordered_map(square, iter(items), ex, 8)) == expect
+        pairs = [{"v": i} for i in range(10)]
+        assert [r for _, r in ordered_map(square, pairs, ex, 3, arg=lambda d: d["v"])] == [i * i for i in range(10)]
+        try:
+            list(ordered_map(fail_at_7, items, ex, 4))
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("exception not propagated")
+    with ProcessPoolExecutor(2) as ex:
+        assert list(ordered_map(square, items, ex, 16)) == expect
+
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+    assert list(prefetch(iter(items), maxsize=4)) == items
+
+    print("ok")
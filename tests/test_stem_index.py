@@ -0,0 +1,84 @@
+"""同名文件索引：StemIndex 的查找结果与逐个扩展名检查文件是否存在的原实现一致；
+扩展名不区分大小写，多个候选时按文件名排序取第一个，缺失时返回 None。"""
+import io
+import os
+import sys
+import random
+import tempfile
+import contextlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.fs_scan import StemIndex, walk_files
+from core.label_processor import LabelProcessor
+
+EXTS = LabelProcessor.IMAGE_FORMATS
+
+def old_find_image_file(json_path):
+    """原 `LabelProcessor.find_image_file`：逐个扩展名检查文件是否存在。"""
+    json_dir = os.path.dirname(json_path)
+    json_name = os.path.splitext(os.path.basename(json_path))[0]
+    for ext in EXTS:
+        image_path = os.path.join(json_dir, json_name + ext)
+        if os.path.exists(image_path):
+            return image_path
+    return None
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+
+rnd = random.Random(0)
+with tempfile.TemporaryDirectory() as tmp:
+    stems = []
+    for i in range(300):
+        d = os.path.join(tmp, f"d{i % 4}", f"s{i % 3}")
+        stem = rnd.choice([f"img{i}", f"img.{i}", f"图片 {i}", f"x{i}.tar"])
+        touch(os.path.join(d, stem + ".json"))
+        kind = i % 5
+        if kind == 0:
+            touch(os.path.join(d, stem + rnd.choice(sorted(EXTS))))
+        elif kind == 1:
+            # 多个候选
+            for ext in rnd.sample(sorted(EXTS), 3):
+                touch(os.path.join(d, stem + ext))
+        elif kind == 2:
+            # 同名但不是图片
+            touch(os.path.join(d, stem + ".txt"))
+        elif kind == 3:
+            # 扩展名大写
+            touch(os.path.join(d, stem + rnd.choice([".JPG", ".Png", ".WEBP"])))
+        stems.append((d, stem, kind))
+
+    walked = StemIndex()
+    for root, files in walk_files(tmp, use_cache=False):
+        walked.add(root, files)
+    lazy = StemIndex()
+    for d, stem, kind in stems:
+        json_path = os.path.join(d, stem + ".json")
+        old = old_find_image_file(json_path)
+        new = walked.find(d, stem, EXTS)
+        assert lazy.find(d, stem, EXTS) == new, json_path
+        names = sorted(n for n in os.listdir(d) if os.path.splitext(n)[0] == stem
+                       and os.path.splitext(n)[1].lower() in EXTS)
+        if kind == 0:
+            assert new == old and new is not None, json_path
+        elif kind == 1:
+            # 原实现取决于集合的遍历顺序，现在固定取排序后的第一个
+            assert old in [os.path.join(d, n) for n in names] and new == os.path.join(d, names[0]), json_path
+        elif kind == 3:
+            assert new == os.path.join(d, names[0]), json_path
+        else:
+            assert new is None and old is None, json_path
+        assert walked.find(d, stem, (".json",)) == json_path
+    assert walked.find(os.path.join(tmp, "d0", "s0"), "missing", EXTS) is None
+    assert lazy.find(os.path.join(tmp, "no_such_dir"), "img0", EXTS) is None
+
+    # LabelProcessor 遍历后经同一索引查找
+    proc = LabelProcessor(tmp)
+    with contextlib.redirect_stdout(io.StringIO()):
+        json_files = proc.get_json_files()
+    assert sorted(json_files) == sorted(os.path.join(d, stem + ".json") for d, stem, _ in stems)
+    for json_path in json_files:
+        stem = os.path.splitext(os.path.basename(json_path))[0]
+        assert proc.find_image_file(json_path) == walked.find(os.path.dirname(json_path), stem, EXTS)
+
+print("ok")
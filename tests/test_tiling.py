@@ -0,0 +1,38 @@
+"""大图切片：网格覆盖整图并贴齐边缘，框裁剪按可见比例取舍，切片预测拼回原图后跨切片去重。"""
+import os
+import sys
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from core.tiling import tile_grid, clip_boxes, stitch_predictions, tile_name
+
+tiles = tile_grid(2000, 1000, 640, 0.2)
+assert tiles[:, 0].min() == 0 and tiles[:, 2].max() == 2000 and tiles[:, 3].max() == 1000
+assert ((tiles[:, 2] - tiles[:, 0]) == 640).all() and ((tiles[:, 3] - tiles[:, 1]) == 640).all()
+assert tile_grid(500, 300, 640).tolist() == [[0, 0, 500, 300]]
+
+# 整图 1000x1000 切成四块 500x500（无重叠）
+tiles = tile_grid(1000, 1000, 500, 0.0)
+assert tiles.tolist() == [[0, 0, 500, 500], [500, 0, 1000, 500], [0, 500, 500, 1000], [500, 500, 1000, 1000]]
+cls = np.array([0, 1])
+boxes = np.array([[0.25, 0.25, 0.1, 0.1],     # 完全位于第一块
+                  [0.48, 0.5, 0.2, 0.2]])    # 跨四块，左侧两块各占 0.3 面积，右侧两块各占 0.2
+out = clip_boxes(cls, boxes, 1000, 1000, tiles, min_visibility=0.3)
+assert out[0][0].tolist() == [0, 1] and np.allclose(out[0][1], [[0.5, 0.5, 0.2, 0.2], [0.88, 0.9, 0.24, 0.2]])
+assert out[1][0].tolist() == [] and out[3][0].tolist() == []
+assert out[2][0].tolist() == [1] and np.allclose(out[2][1][0], [0.88, 0.1, 0.24, 0.2])
+assert all(len(c) == 0 for c, _ in clip_boxes(np.zeros(0), np.zeros((0, 4)), 1000, 1000, tiles))
+
+# 切片预测平移回原图；重叠区域的同一目标只保留置信度高的一个
+a, b = tile_name("img", 0, 0, ".jpg"), tile_name("img", 400, 0, ".jpg")
+index = {a: ("img.jpg", 0, 0), b: ("img.jpg", 400, 0)}
+preds = {
+    a: (np.array([0]), np.array([[420, 10, 480, 60]]), np.array([0.9])),
+    b: (np.array([0, 0]), np.array([[21, 11, 81, 61], [200, 200, 250, 250]]), np.array([0.8, 0.7])),
+}
+merged = stitch_predictions(index, preds, iou=0.5)
+cls, xyxy, conf = merged["img.jpg"]
+assert cls.tolist() == [0, 0] and conf.tolist() == [0.9, 0.7]
+assert xyxy.tolist() == [[420, 10, 480, 60], [600, 200, 650, 250]]
+assert len(stitch_predictions(index, preds, iou=None)["img.jpg"][0]) == 3
+
+print("ok")
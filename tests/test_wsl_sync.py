@@ -0,0 +1,81 @@
+"""WSL 同步：symlink 模式构建的数据集按文件内容同步，第二次同步不发送任何文件；
+增量同步只发送变化的文件并删除远端多余文件，配置的 `path` 指向同步位置，远端大量 stderr 输出不会卡住同步。
+
+在 Linux 上直接以空的 `wsl_prefix` 执行（需要 bash、GNU find 与 tar）。
+"""
+import os
+import sys
+import yaml
+import signal
+import shutil
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from fixtures import make_labelme
+from core.dataset_builder import build_yolo_dataset
+from core.wsl_sync import stage_dataset
+
+if os.name == "nt":
+    print("skip: 需要在 Linux 上直接执行")
+    sys.exit(0)
+
+tmp = tempfile.mkdtemp()
+try:
+    src = os.path.join(tmp, "src")
+    classes = make_labelme(src, n=60)
+    out = os.path.join(tmp, "out")
+    build_yolo_dataset(src, classes, (7, 2, 1), True, out, link_mode="symlink", size_check="off",
+                       log_callback=lambda m: None)
+    images = [os.path.join(dp, f) for dp, _, fs in os.walk(os.path.join(out, "images")) for f in fs]
+    assert len(images) == 60 and any(os.path.islink(p) for p in images)
+
+    dest = os.path.join(tmp, "staged")
+    abs_dest, first = stage_dataset(out, dest, log_callback=lambda m: None, wsl_prefix=())
+    assert first["sent_files"] > 60
+    staged = [os.path.join(dp, f) for dp, _, fs in os.walk(os.path.join(abs_dest, "images")) for f in fs]
+    assert len(staged) == 60
+    for p in staged:
+        assert not os.path.islink(p), p
+        rel = os.path.relpath(p, abs_dest)
+        with open(p, "rb") as a, open(os.path.join(out, rel), "rb") as b:
+            assert a.read() == b.read(), rel
+
+    _, second = stage_dataset(out, dest, log_callback=lambda m: None, wsl_prefix=())
+    assert second["sent_files"] == 0 and second["sent_bytes"] == 0 and second["deleted_files"] == 0, second
+
+    # 早期同步遗留的远端链接会被替换为普通文件
+    victim = staged[0]
+    os.remove(victim)
+    os.symlink("/nonexistent/source.jpg", victim)
+    _, third = stage_dataset(out, dest, log_callback=lambda m: None, wsl_prefix=())
+    assert third["sent_files"] == 1 and not os.path.islink(victim), third
+
+    # 增量：修改一个标签、删除一个标签，只发送变化的文件并删除远端多余文件
+    labels = sorted(os.path.join(dp, f) for dp, _, fs in os.walk(os.path.join(out, "labels")) for f in fs)
+    changed, removed = labels[0], labels[1]
+    with open(changed, "a", encoding="utf-8") as f:
+        f.write("0 0.5 0.5 0.1 0.1\n")
+    st = os.stat(changed)
+    os.utime(changed, (st.st_atime, st.st_mtime + 5))
+    os.remove(removed)
+    _, delta = stage_dataset(out, dest, log_callback=lambda m: None, wsl_prefix=())
+    assert (delta["sent_files"], delta["deleted_files"]) == (1, 1), delta
+    with open(changed, "rb") as a, open(os.path.join(abs_dest, os.path.relpath(changed, out)), "rb") as b:
+        assert a.read() == b.read()
+    assert not os.path.exists(os.path.join(abs_dest, os.path.relpath(removed, out)))
+    with open(os.path.join(abs_dest, "dataset_config.yaml"), encoding="utf-8") as f:
+        assert yaml.safe_load(f)["path"] == abs_dest
+
+    # 远端在读取 tar 之前写出远超管道缓冲的 stderr：同步仍然完成（超时即视为死锁）
+    noisy = ("sh", "-c", 'head -c 1000000 /dev/zero | tr "\\0" x >&2; exec "$@"', "sh")
+    shutil.rmtree(abs_dest)
+    # 死锁时写入方阻塞在管道上，抛出异常也无法返回，直接以失败退出
+    signal.signal(signal.SIGALRM, lambda *_: (print("FAIL: stage_dataset deadlocked", flush=True), os._exit(1)))
+    signal.alarm(60)
+    _, noisy_stats = stage_dataset(out, dest, log_callback=lambda m: None, wsl_prefix=noisy)
+    signal.alarm(0)
+    assert noisy_stats["sent_files"] > 60 and noisy_stats["deleted_files"] == 0, noisy_stats
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+
+print("ok")
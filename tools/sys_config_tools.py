@@ -30,6 +30,28 @@ def get_wsl_config(yaml_path: str | None = None) -> dict:
     d = _load_sys_cfg()
     return d.get("wsl", {}) if isinstance(d, dict) else {}
 
+def get_dataset_config() -> dict:
+    d = _load_sys_cfg()
+    return d.get("dataset", {}) if isinstance(d, dict) else {}
+
+def get_cache_dir(name: str = "") -> str:
+    """
+    获取应用缓存目录（扫描缓存、预处理缓存等），不存在时自动创建。
+    优先使用配置 `dataset.cache_dir`；未配置时 Windows 使用 %LOCALAPPDATA%\\oneST\\cache，
+    其他平台使用 $XDG_CACHE_HOME/oneST 或 ~/.cache/oneST。
+    :param name: 子目录名，为空时返回缓存根目录
+    :return: 缓存目录的绝对路径
+    """
+    base = str(get_dataset_config().get("cache_dir") or "").strip()
+    if not base:
+        if os.name == "nt":
+            base = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), "oneST", "cache")
+        else:
+            base = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "oneST")
+    p = os.path.join(base, name) if name else base
+    os.makedirs(p, exist_ok=True)
+    return os.path.abspath(p)
+
 def get_resource_path(relative_path):
     """
     获取资源文件的实际路径（适配打包后的情况）。